@@ -1,6 +1,7 @@
 # backend/app.py
 import logging
 import traceback
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse, FileResponse
@@ -11,7 +12,9 @@ from routes.live_routes import router as live_router
 from routes.ats_routes import router as ats_router
 from routes.batch_routes import router as batch_router
 from routes.template_routes import router as template_router
-from utils.cache import get_cache_stats, clear_cache
+from utils.cache import get_cache_stats, clear_cache, get_reclaimer
+from utils.async_cache import aget_cache_stats
+from utils.response_cache import CACHE_HEADER
 
 # Configure logging
 logging.basicConfig(
@@ -20,7 +23,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="HireScope Backend", version="2.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size thread pools, then warm models in the background while serving /api/ready"""
+    from core.analysis_engine import get_analysis_engine
+    from core.warmup import get_warmup
+    from utils.thread_budget import apply_thread_budget, apply_request_limits
+    from utils.cache import start_cache_invalidation_listener, flush_cache_writes
+    from utils.async_cache import arefresh_versions, close_async_redis
+    from utils.cache_snapshot import save_cache_snapshot
+
+    # Split the cores between inference, OCR and request threads before any work runs
+    apply_thread_budget()
+    await apply_request_limits()
+    # Analysis worker processes (if configured) load their models in parallel
+    get_analysis_engine().start()
+    get_warmup().start()
+    # Drop L1 entries when another worker clears the cache
+    start_cache_invalidation_listener()
+    # Keys built on the event loop need current namespace versions from the start
+    await arefresh_versions()
+    yield
+    get_analysis_engine().shutdown()
+    flush_cache_writes()
+    await close_async_redis()
+    # The next start warms L1 from the entries that were hottest in this run
+    try:
+        save_cache_snapshot()
+    except Exception as e:
+        logger.warning(f"⚠️ Cache snapshot not saved: {e}")
+
+
+app = FastAPI(title="HireScope Backend", version="2.0.0", lifespan=lifespan)
 
 _STATIC_DIR = Path(__file__).resolve().parent / "static"
 _FAVICON_PATH = _STATIC_DIR / "favicon.svg"
@@ -52,6 +87,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read whether a response came from the response cache
+    expose_headers=[CACHE_HEADER],
 )
 
 if _STATIC_DIR.exists():
@@ -89,24 +126,49 @@ def root():
         "health": "/api/health"
     }
 
+# Probes are async so they answer even while every request thread is busy
 @app.get("/api/health")
-def health():
+async def health():
     """Basic health check endpoint"""
     return {"status": "ok", "version": "2.0.0"}
 
+@app.get("/api/ready")
+async def readiness():
+    """Readiness probe: 503 until warmup has loaded every required component"""
+    from core.warmup import get_warmup
+
+    status = get_warmup().status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.get("/api/health/detailed")
 def detailed_health():
-    """Detailed health check with cache stats"""
-    from core.keyword_match import get_embedding_model
+    """Detailed health check with cache stats. Reports state only, never loads anything."""
+    from core.model_registry import get_registry
+    from core.model_tiers import get_tier
+    from core.warmup import get_warmup
+    from core.embedding_cache import get_embedding_cache_stats
+    from core.embedding_scheduler import get_scheduler_stats
+    from utils.thread_budget import get_thread_budget_stats
+    from core.analysis_engine import get_analysis_engine
+    from utils.process_memory import process_memory
+    from utils.response_cache import get_response_cache_stats
     
     cache_stats = get_cache_stats()
-    model_loaded = get_embedding_model() is not None
+    model_loaded = get_registry().is_loaded(get_tier().model_name)
     
     return {
         "status": "healthy",
         "version": "2.0.0",
         "embedding_model_loaded": model_loaded,
+        "warmup": get_warmup().status(),
+        "models": get_registry().stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "embedding_scheduler": get_scheduler_stats(),
+        "thread_budget": get_thread_budget_stats(),
+        "analysis_engine": get_analysis_engine().stats(),
+        "process_memory": process_memory(),
         "cache": cache_stats,
+        "response_cache": get_response_cache_stats(),
         "features": {
             "caching": True,
             "lazy_loading": True,
@@ -120,18 +182,25 @@ def detailed_health():
     }
 
 @app.post("/api/admin/cache/clear")
-def clear_cache_endpoint(pattern: str = None):
+def clear_cache_endpoint(pattern: str = None, wait: float = 0):
     """
     Clear cache entries (admin endpoint).
     
-    - pattern: Optional pattern to match (e.g., "jd_keywords" to clear only JD keyword cache)
+    - pattern: Optional namespace to invalidate (e.g., "jd_keywords" to clear only JD keyword cache)
     - If no pattern provided, clears all cache
+    - wait: Seconds to wait for the background cleanup of the old keys, to report how many it removed
+    
+    Invalidation is immediate; the old keys are deleted from Redis in the background,
+    so with Redis keys_invalidated is null unless that cleanup finishes within wait.
     """
     try:
-        clear_cache(pattern)
+        invalidated = clear_cache(pattern, wait=min(wait, 60))
         return {
             "status": "success",
             "message": f"Cache cleared: {pattern or 'all'}",
+            "keys_invalidated": invalidated["keys_invalidated"],
+            "invalidated": invalidated,
+            "reclaim": get_reclaimer().stats(),
             "stats": get_cache_stats()
         }
     except Exception as e:
@@ -141,7 +210,12 @@ def clear_cache_endpoint(pattern: str = None):
             content={"status": "error", "message": str(e)}
         )
 
+@app.get("/api/admin/cache/reclaim")
+def cache_reclaim_endpoint():
+    """Progress of the background cleanup of invalidated keys (admin endpoint)"""
+    return get_reclaimer().stats()
+
 @app.get("/api/admin/cache/stats")
-def cache_stats_endpoint():
+async def cache_stats_endpoint():
     """Get cache statistics (admin endpoint)"""
-    return get_cache_stats()
+    return await aget_cache_stats()
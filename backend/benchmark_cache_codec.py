@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cache codec against pickle on realistic cache payloads,
+and key derivation against the old json.dumps + MD5 scheme.
+
+Usage:
+    python benchmark_cache_codec.py
+    python benchmark_cache_codec.py --repeat 2000
+"""
+import argparse
+import hashlib
+import json
+import pickle
+import timeit
+
+import numpy as np
+
+from core.skill_detection import SkillLevel
+from core.weighted_matching import RequirementType, WeightedKeyword
+from utils import cache_codec
+from utils.cache_codec import decode, encode, hash_arguments
+
+_SKILLS = ["python", "fastapi", "docker", "kubernetes", "postgresql", "redis", "aws", "terraform",
+           "react", "typescript", "pytorch", "spark", "airflow", "graphql", "ci/cd", "linux"]
+
+
+def payloads() -> dict:
+    rng = np.random.default_rng(0)
+    keywords = [f"{_SKILLS[i % len(_SKILLS)]}{i // len(_SKILLS) or ''}" for i in range(60)]
+    weighted = [
+        WeightedKeyword(k, list(RequirementType)[i % 4], [2.0, 1.0, 0.5, 1.0][i % 4], "requirements")
+        for i, k in enumerate(keywords)
+    ]
+    levels = {k: SkillLevel(k, "advanced", years=i % 8 or None, confidence=0.8) for i, k in enumerate(keywords[:30])}
+    analysis = {
+        "filename": "resume.pdf",
+        "similarity": 0.8123,
+        "keywords": {"matched": keywords[:35], "missing": keywords[35:]},
+        "section_scores": {s: float(rng.random()) for s in ("experience", "skills", "education", "projects")},
+        "suggestions": [{"title": f"Suggestion {i}", "detail": "Quantify impact with metrics. " * 6} for i in range(12)],
+        "skill_levels": {k: {"level": "advanced", "years": 3, "confidence": 0.8} for k in keywords[:30]},
+        "resume_text": "Experienced backend engineer building data platforms. " * 80,
+    }
+    return {
+        "jd_keywords (60 str)": keywords,
+        "weighted keywords (60 dataclasses)": weighted,
+        "skill levels (30 dataclasses)": levels,
+        "analysis result (nested dict)": analysis,
+        "embeddings (64x768 float32)": rng.standard_normal((64, 768)).astype(np.float32),
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-5 microseconds per call"""
+    return min(timeit.repeat(fn, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def bench_codecs(repeat: int):
+    print(f"{'payload':<38} {'codec':<16} {'bytes':>9} {'encode µs':>10} {'decode µs':>10}")
+    pickle_payloads = {}
+    for name, value in payloads().items():
+        rows = [("pickle", lambda v=value: pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads)]
+        if cache_codec.MSGPACK_AVAILABLE:
+            rows.append(("msgpack", lambda v=value: encode(v, codec="msgpack"), decode))
+        for codec, enc, dec in rows:
+            data = enc()
+            if codec == "pickle":
+                pickle_payloads[name] = data
+            label = codec + ("+zstd" if data[:3] == cache_codec.MAGIC and data[5] == cache_codec.COMPRESSION_ZSTD else "")
+            print(f"{name:<38} {label:<16} {len(data):>9} {_time(enc, repeat):>10.1f} {_time(lambda d=data: dec(d), repeat):>10.1f}")
+    print()
+
+
+def bench_keys(repeat: int):
+    def legacy_key(*args, **kwargs):
+        cache_str = json.dumps({"args": args, "kwargs": sorted(kwargs.items())}, sort_keys=True)
+        return hashlib.md5(cache_str.encode()).hexdigest()
+
+    print(f"{'key arguments':<38} {'json+md5 µs':>12} {'streamed µs':>12}")
+    for size in (4_000, 40_000, 400_000):
+        jd = ("We are hiring a senior engineer with Python, Kubernetes and AWS experience. " * (size // 76 + 1))[:size]
+        legacy = _time(lambda: legacy_key(jd, tier="accurate"), max(1, repeat // 10))
+        streamed = _time(lambda: hash_arguments((jd,), {"tier": "accurate"}), max(1, repeat // 10))
+        print(f"{f'JD text ({size // 1000}k chars)':<38} {legacy:>12.1f} {streamed:>12.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500, help="Calls per timing run")
+    args = parser.parse_args()
+
+    print(f"msgpack={'yes' if cache_codec.MSGPACK_AVAILABLE else 'no'} "
+          f"zstd={'yes' if cache_codec.ZSTD_AVAILABLE else 'no'} "
+          f"compress>={cache_codec.COMPRESS_MIN_BYTES}B\n")
+    bench_codecs(args.repeat)
+    bench_keys(args.repeat)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Build the precomputed taxonomy embedding artifact during Docker build
+"""
+import argparse
+import time
+
+from core.model_tiers import TIERS
+from core.taxonomy_embeddings import build_artifact, taxonomy_terms, TAXONOMY_ARTIFACT_DIR
+
+def build(models, directory):
+    """Embed every taxonomy term and anchor once per model"""
+    print(f"Taxonomy terms: {len(taxonomy_terms())}")
+    for model_name in models:
+        print(f"\n{'='*60}")
+        print(f"Embedding taxonomy with {model_name}...")
+        print(f"{'='*60}\n")
+        start = time.perf_counter()
+        path = build_artifact(model_name, directory)
+        print(f"✅ Wrote {path} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", nargs="+", default=sorted({t.model_name for t in TIERS.values()}))
+    parser.add_argument("--output-dir", default=TAXONOMY_ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("BUILDING TAXONOMY EMBEDDINGS")
+    print("="*60 + "\n")
+
+    build(args.models, args.output_dir)
+
+    print("\n" + "="*60)
+    print("✅ TAXONOMY EMBEDDINGS READY!")
+    print("="*60 + "\n")
@@ -0,0 +1,299 @@
+# backend/core/analysis_engine.py
+"""
+Execution engine for whole analysis jobs.
+
+Keyword extraction, skill detection, scoring and insights are pure-Python CPU
+work, so one server process can only use one core for them however many
+requests are in flight. With HIRESCOPE_ANALYSIS_WORKERS > 0, jobs run in a
+pool of worker processes instead:
+
+  - each worker loads the models, spaCy, taxonomy and RAG index once, in
+    the pool initializer, before it accepts work
+  - bytes/ndarray arguments above a size threshold travel through
+    multiprocessing.shared_memory instead of being pickled down the pipe
+  - workers are replaced after HIRESCOPE_ANALYSIS_MAX_TASKS_PER_CHILD jobs to
+    bound memory growth
+  - a worker crash breaks the whole pool, so every job in flight on it
+    fails with AnalysisWorkerCrashed; the pool is rebuilt for the next request
+
+With 0 workers (the default) jobs run on the engine's own thread pool in the
+server process, sized by the thread budget's analysis_threads, so they never
+hold the event loop's shared request threads.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_WORKERS = int(os.getenv("HIRESCOPE_ANALYSIS_WORKERS", "0"))
+ANALYSIS_MAX_TASKS_PER_CHILD = int(os.getenv("HIRESCOPE_ANALYSIS_MAX_TASKS_PER_CHILD", "200"))
+# fork is unsafe once the server has model/scheduler threads running
+ANALYSIS_START_METHOD = os.getenv("HIRESCOPE_ANALYSIS_START_METHOD", "spawn")
+ANALYSIS_PRELOAD_TIERS = [t for t in os.getenv("HIRESCOPE_ANALYSIS_PRELOAD_TIERS", "accurate,fast").split(",") if t]
+SHARED_MEMORY_THRESHOLD = int(os.getenv("HIRESCOPE_ANALYSIS_SHM_THRESHOLD", str(256 * 1024)))
+
+
+class AnalysisWorkerCrashed(RuntimeError):
+    """A worker process died while running the job"""
+
+
+class _SharedArg:
+    """Picklable handle to a bytes/ndarray argument parked in shared memory"""
+    __slots__ = ("name", "kind", "shape", "dtype", "size")
+
+    def __init__(self, name: str, kind: str, size: int, shape=None, dtype=None):
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return (self.name, self.kind, self.size, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.name, self.kind, self.size, self.shape, self.dtype = state
+
+    def load(self):
+        """Copy the value out of shared memory (runs in the worker)"""
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            if self.kind == "bytes":
+                return bytes(shm.buf[:self.size])
+            return np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf).copy()
+        finally:
+            shm.close()
+
+
+def _share(value, blocks: List[shared_memory.SharedMemory]):
+    """Move a large bytes/ndarray value into shared memory; leave anything else as is"""
+    if isinstance(value, (bytes, bytearray)) and len(value) >= SHARED_MEMORY_THRESHOLD:
+        shm = shared_memory.SharedMemory(create=True, size=len(value))
+        shm.buf[:len(value)] = value
+        blocks.append(shm)
+        return _SharedArg(shm.name, "bytes", len(value))
+    if isinstance(value, np.ndarray) and value.nbytes >= SHARED_MEMORY_THRESHOLD:
+        shm = shared_memory.SharedMemory(create=True, size=value.nbytes)
+        np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+        blocks.append(shm)
+        return _SharedArg(shm.name, "ndarray", value.nbytes, value.shape, value.dtype.str)
+    return value
+
+
+def _unshare(value):
+    return value.load() if isinstance(value, _SharedArg) else value
+
+
+def _release(blocks: Sequence[shared_memory.SharedMemory]):
+    for shm in blocks:
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ---------------------------------------------------------------- worker side
+def _init_worker(inference_threads: int, preload_tiers: Sequence[str]):
+    """Pool initializer: size thread pools and load every model before taking jobs"""
+    os.environ["HIRESCOPE_INFERENCE_THREADS"] = str(inference_threads)
+    # One job at a time per worker: concurrent OCR and cross-request batching don't apply
+    os.environ["HIRESCOPE_OCR_WORKERS"] = "1"
+
+    from core import embedding_scheduler
+    from utils.thread_budget import apply_thread_budget
+    from core.model_tiers import get_tier, get_tier_model
+    from core.rag_engine import get_rag_engine
+    from core.taxonomy_embeddings import get_taxonomy_embeddings
+    from core.keyword_match import get_stopwords
+    import core.pipeline  # noqa: F401
+
+    embedding_scheduler.EMBEDDING_BATCHING_ENABLED = False
+    apply_thread_budget()
+    start = time.perf_counter()
+    get_stopwords()  # loads the shared spaCy pipeline
+    for tier in preload_tiers:
+        try:
+            get_tier_model(tier)
+            get_taxonomy_embeddings(get_tier(tier).model_name)
+            get_rag_engine(tier)
+        except Exception as e:
+            logger.warning(f"⚠️ Analysis worker {os.getpid()} could not preload '{tier}' tier: {e}")
+    logger.info(f"✅ Analysis worker {os.getpid()} ready in {time.perf_counter() - start:.1f}s")
+
+
+def _run_job(fn: Callable, args: tuple, kwargs: dict):
+    args = tuple(_unshare(a) for a in args)
+    kwargs = {k: _unshare(v) for k, v in kwargs.items()}
+    return fn(*args, **kwargs)
+
+
+def _noop():
+    return os.getpid()
+
+
+# ---------------------------------------------------------------- server side
+class AnalysisEngine:
+    """Runs analysis jobs in-process (workers=0) or on a recycled process pool"""
+
+    def __init__(self, workers: int = 0, max_tasks_per_child: int = 200,
+                 start_method: str = "spawn", preload_tiers: Sequence[str] = ()):
+        self.workers = max(0, workers)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.start_method = start_method
+        self.preload_tiers = list(preload_tiers)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "crashes": 0,
+            "pool_starts": 0,
+            "in_flight": 0,
+            "shared_memory_bytes": 0,
+        }
+
+    @property
+    def mode(self) -> str:
+        return "process" if self.workers else "thread"
+
+    def _inference_threads_per_worker(self) -> int:
+        from utils.thread_budget import get_thread_budget
+        return max(1, get_thread_budget().process_cores // self.workers)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                kwargs = {}
+                if self.start_method != "fork" and self.max_tasks_per_child:
+                    # Recycling workers is not supported with the fork start method
+                    kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self._inference_threads_per_worker(), self.preload_tiers),
+                    **kwargs,
+                )
+                self._stats["pool_starts"] += 1
+                logger.info(f"🔄 Starting analysis pool with {self.workers} worker(s) ({self.start_method})")
+            return self._pool
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                from utils.thread_budget import get_thread_budget
+                self._threads = ThreadPoolExecutor(
+                    max_workers=get_thread_budget().analysis_threads,
+                    thread_name_prefix="hirescope-analysis",
+                )
+            return self._threads
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self._stats["crashes"] += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """Spawn the workers now so their model loading overlaps with startup"""
+        if not self.workers:
+            return
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(_noop)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            threads, self._threads = self._threads, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if threads is not None:
+            threads.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) as one job; fn must be a module-level function"""
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["in_flight"] += 1
+        try:
+            if not self.workers:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._get_threads(), functools.partial(fn, *args, **kwargs))
+            else:
+                result = await self._run_in_pool(fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+        with self._lock:
+            self._stats["completed"] += 1
+        return result
+
+    async def _run_in_pool(self, fn: Callable, args: tuple, kwargs: dict):
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            shared_args = tuple(_share(a, blocks) for a in args)
+            shared_kwargs = {k: _share(v, blocks) for k, v in kwargs.items()}
+            with self._lock:
+                self._stats["shared_memory_bytes"] += sum(b.size for b in blocks)
+            pool = self._get_pool()
+            try:
+                return await asyncio.wrap_future(pool.submit(_run_job, fn, shared_args, shared_kwargs))
+            except BrokenProcessPool as e:
+                logger.error(f"❌ Analysis worker crashed, restarting pool: {e}")
+                self._discard_pool(pool)
+                raise AnalysisWorkerCrashed("Analysis worker crashed while processing the request") from e
+        finally:
+            _release(blocks)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            running = self._pool is not None
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "start_method": self.start_method,
+            "pool_running": running,
+            **stats,
+        }
+
+
+# Singleton instance
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_analysis_engine() -> AnalysisEngine:
+    """Get or create the process-wide analysis engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AnalysisEngine(
+                    workers=ANALYSIS_WORKERS,
+                    max_tasks_per_child=ANALYSIS_MAX_TASKS_PER_CHILD,
+                    start_method=ANALYSIS_START_METHOD,
+                    preload_tiers=ANALYSIS_PRELOAD_TIERS,
+                )
+    return _engine
@@ -0,0 +1,238 @@
+# backend/core/embedding_backends.py
+"""
+Selectable inference backends for sentence embeddings.
+
+HIRESCOPE_EMBEDDING_BACKEND picks the backend for the whole deployment:
+  - torch      : PyTorch SentenceTransformer (default)
+  - onnx       : the same transformer exported to ONNX, run by onnxruntime
+  - onnx-int8  : the ONNX export with dynamic int8 weight quantization
+
+The ONNX encoder reuses the model's own tokenizer, pooling mode and max
+sequence length, so callers can treat it exactly like a SentenceTransformer.
+The export happens once per model and is reused by every later process.
+"""
+
+import inspect
+import json
+import logging
+import os
+import shutil
+import time
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+EMBEDDING_BACKEND = os.getenv("HIRESCOPE_EMBEDDING_BACKEND", "torch").lower()
+ONNX_EXPORT_DIR = os.getenv(
+    "HIRESCOPE_ONNX_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "hirescope", "onnx"),
+)
+# Token cap for sentence and chunk encodes. Resume sentences rarely exceed ~60
+# tokens, so longer ones are cut and documents are chunked to this size; job
+# descriptions and full-text encodes keep the model's own limit. 0 disables it.
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("HIRESCOPE_MAX_SEQ_LENGTH", "256"))
+ONNX_EXPORT_VERSION = 1
+ONNX_OPSET = 14
+
+if EMBEDDING_BACKEND not in EMBEDDING_BACKENDS:
+    logger.warning(f"⚠️ Unknown embedding backend '{EMBEDDING_BACKEND}', falling back to torch")
+    EMBEDDING_BACKEND = "torch"
+
+
+def _export_dir(name: str) -> str:
+    return os.path.join(ONNX_EXPORT_DIR, name.replace("/", "__"))
+
+
+def _read_manifest(directory: str):
+    try:
+        with open(os.path.join(directory, "encoder.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("export_version") != ONNX_EXPORT_VERSION:
+        return None
+    return manifest
+
+
+def _usable_export(directory: str, quantize: bool) -> bool:
+    manifest = _read_manifest(directory)
+    return manifest is not None and (manifest.get("quantized") or not quantize)
+
+
+def export_onnx(name: str, directory: str = None, quantize: bool = True) -> str:
+    """
+    Export a sentence-transformer model to ONNX (and optionally int8).
+
+    Writes model.onnx, model.int8.onnx, the tokenizer files and an
+    encoder.json manifest describing pooling/normalization. The export is
+    built in a temporary directory and renamed into place, so concurrent
+    processes never see a half-written export. Processes exporting the same
+    model take turns on a file lock, and the later ones reuse the result.
+    """
+    from core.embedding_cache import _FileLock
+
+    directory = directory or _export_dir(name)
+    os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+    with _FileLock(f"{directory}.lock"):
+        if _usable_export(directory, quantize):
+            logger.info(f"✅ ONNX export of '{name}' already done by another process ({directory})")
+            return directory
+        return _export_onnx(name, directory, quantize)
+
+
+def _export_onnx(name: str, directory: str, quantize: bool) -> str:
+    import torch
+    from core.model_registry import _load_sentence_transformer
+
+    st_model = _load_sentence_transformer(name)
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    pooling_mode = "mean"
+    normalize = False
+    for module in st_model:
+        config = getattr(module, "get_config_dict", lambda: {})()
+        if config.get("pooling_mode_cls_token"):
+            pooling_mode = "cls"
+        if type(module).__name__ == "Normalize":
+            normalize = True
+
+    sample = tokenizer(["HireScope export sample"], return_tensors="pt")
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in sample]
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if token_type_ids is not None:
+                inputs["token_type_ids"] = token_type_ids
+            return self.model(**inputs).last_hidden_state
+
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    fp32_path = os.path.join(tmp_dir, "model.onnx")
+
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles dynamic_axes
+    export_kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    start = time.perf_counter()
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapper(transformer),
+            tuple(sample[k] for k in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={**{k: {0: "batch", 1: "sequence"} for k in input_names},
+                          "last_hidden_state": {0: "batch", 1: "sequence"}},
+            opset_version=ONNX_OPSET,
+            **export_kwargs,
+        )
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, os.path.join(tmp_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(tmp_dir)
+    with open(os.path.join(tmp_dir, "encoder.json"), "w") as f:
+        json.dump({
+            "export_version": ONNX_EXPORT_VERSION,
+            "model": name,
+            "input_names": input_names,
+            "pooling_mode": pooling_mode,
+            "normalize": normalize,
+            "max_seq_length": st_model.max_seq_length,
+            "dim": st_model.get_sentence_embedding_dimension(),
+            "quantized": quantize,
+        }, f, indent=2)
+
+    if os.path.exists(directory):
+        # An outdated export (checked under the lock): move it aside first,
+        # so the new one appears with a single rename
+        old_dir = f"{directory}.old-{os.getpid()}"
+        os.rename(directory, old_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    try:
+        os.rename(tmp_dir, directory)
+    except OSError:
+        # Without file locks (Windows) another process may have finished first; use theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info(f"✅ Exported '{name}' to ONNX in {time.perf_counter() - start:.1f}s ({directory})")
+    return directory
+
+
+class OnnxSentenceEncoder:
+    """onnxruntime-backed encoder exposing the SentenceTransformer methods we use"""
+
+    def __init__(self, directory: str, quantized: bool = False, intra_op_threads: int = 0):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        manifest = _read_manifest(directory)
+        if manifest is None:
+            raise ValueError(f"No usable ONNX export in {directory}")
+        model_file = "model.int8.onnx" if quantized else "model.onnx"
+        model_path = os.path.join(directory, model_file)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.input_names = manifest["input_names"]
+        self.pooling_mode = manifest["pooling_mode"]
+        self.normalize = manifest["normalize"]
+        self.max_seq_length = manifest["max_seq_length"]
+        self.dim = manifest["dim"]
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.load_source = "onnx-export"
+        self.weight_bytes = os.path.getsize(model_path)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        features = self.tokenizer(
+            texts, padding=True, truncation=True,
+            max_length=self.max_seq_length, return_tensors="np",
+        )
+        feeds = {k: features[k].astype(np.int64) for k in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+        if self.pooling_mode == "cls":
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = features["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / (np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        # Sort by length so each batch pads as little as possible
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            out[idx] = self._encode_batch([texts[i] for i in idx])
+        return out[0] if single else out
+
+
+def load_onnx_encoder(name: str, quantized: bool = False, intra_op_threads: int = 0) -> OnnxSentenceEncoder:
+    """Load the ONNX encoder for a model, exporting it first if needed"""
+    directory = _export_dir(name)
+    manifest = _read_manifest(directory)
+    if manifest is None or (quantized and not manifest.get("quantized")):
+        logger.info(f"🔄 No ONNX export for '{name}' yet, exporting (one-time)...")
+        export_onnx(name, directory, quantize=True)
+    return OnnxSentenceEncoder(directory, quantized=quantized, intra_op_threads=intra_op_threads)
@@ -0,0 +1,354 @@
+# backend/core/embedding_cache.py
+"""
+Content-addressed, memory-mapped embedding cache.
+
+Vectors live in an append-only file of fixed-size rows that is read through
+np.memmap; a sidecar index file maps text hashes to row numbers. Each cache is
+tagged with the model that produced it, so a model (or format) change never
+serves vectors from a different embedding space. Rows evicted by the LRU
+policy become dead space and are reclaimed by compaction.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+_KEY_BYTES = 16
+_INDEX_DTYPE = np.dtype([("key", f"V{_KEY_BYTES}"), ("row", "<u4")])
+
+EMBEDDING_CACHE_ENABLED = os.getenv("HIRESCOPE_EMBEDDING_CACHE", "1") != "0"
+EMBEDDING_CACHE_DIR = os.getenv(
+    "HIRESCOPE_EMBEDDING_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "hirescope", "embeddings"),
+)
+EMBEDDING_CACHE_DTYPE = os.getenv("HIRESCOPE_EMBEDDING_CACHE_DTYPE", "float16")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("HIRESCOPE_EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+
+def text_key(text: str) -> bytes:
+    """Fixed-size content hash used as the cache key"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=_KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    hash -> vector store for one model tag.
+
+    Lookups return float32 copies regardless of the on-disk dtype. All methods
+    are thread-safe; appends are additionally serialized across processes with
+    an advisory file lock so several workers can share one cache directory.
+    """
+
+    def __init__(self, directory: str, tag: str, dtype: str = "float16",
+                 max_entries: int = 200000):
+        self.directory = directory
+        self.tag = tag
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        safe_tag = "".join(c if c.isalnum() or c in "-_.@" else "_" for c in tag)
+        base = os.path.join(directory, safe_tag)
+        self._meta_path = base + ".meta.json"
+        self._vec_path = base + ".vec"
+        self._idx_path = base + ".idx"
+        self._lock_path = base + ".lock"
+
+        self._lock = threading.RLock()
+        self._index: "OrderedDict[bytes, int]" = OrderedDict()
+        self._dim: Optional[int] = None
+        self._mmap: Optional[np.memmap] = None
+        self._mapped_rows = 0
+        self._vec_file = None
+        self._idx_file = None
+        self._dead_rows = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "compactions": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------ files
+    def _file_lock(self):
+        return _FileLock(self._lock_path)
+
+    def _row_bytes(self) -> int:
+        return self._dim * self.dtype.itemsize
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _meta_matches(self, meta: Optional[dict]) -> bool:
+        return (meta is not None and meta.get("format") == CACHE_FORMAT_VERSION
+                and meta.get("tag") == self.tag and meta.get("dtype") == self.dtype.name)
+
+    def _write_meta(self):
+        meta = {
+            "format": CACHE_FORMAT_VERSION,
+            "tag": self.tag,
+            "dim": self._dim,
+            "dtype": self.dtype.name,
+        }
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path)
+
+    def _reset_files(self):
+        for path in (self._meta_path, self._vec_path, self._idx_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _close_files(self):
+        for handle in (self._vec_file, self._idx_file):
+            if handle is not None:
+                handle.close()
+        self._vec_file = self._idx_file = None
+        self._mmap = None
+        self._mapped_rows = 0
+
+    def _load(self):
+        """(Re)build the in-memory index from disk, discarding mismatched caches"""
+        self._close_files()
+        self._index.clear()
+        self._dead_rows = 0
+        self._dim = None
+
+        meta = self._read_meta()
+        if meta is None:
+            return
+        if not self._meta_matches(meta):
+            logger.info(f"Discarding embedding cache for '{self.tag}' (version/tag mismatch)")
+            with self._file_lock():
+                self._reset_files()
+            return
+
+        self._dim = int(meta["dim"])
+        try:
+            rows_on_disk = os.path.getsize(self._vec_path) // self._row_bytes()
+            records = np.fromfile(self._idx_path, dtype=_INDEX_DTYPE)
+        except OSError:
+            rows_on_disk, records = 0, np.zeros(0, dtype=_INDEX_DTYPE)
+
+        for key, row in zip(records["key"], records["row"]):
+            if row < rows_on_disk:
+                key = bytes(key)
+                self._index.pop(key, None)
+                self._index[key] = int(row)
+        self._dead_rows = max(0, rows_on_disk - len(self._index))
+        while len(self._index) > self.max_entries:
+            self._index.popitem(last=False)
+            self._dead_rows += 1
+        self._open_append_handles()
+
+    def _open_append_handles(self):
+        self._vec_file = open(self._vec_path, "ab")
+        self._idx_file = open(self._idx_path, "ab")
+
+    def _stale_handles(self) -> bool:
+        """True if another process compacted/replaced the files under us"""
+        try:
+            return os.fstat(self._vec_file.fileno()).st_ino != os.stat(self._vec_path).st_ino
+        except OSError:
+            return True
+
+    def _ensure_mapped(self, row: int):
+        if row < self._mapped_rows:
+            return
+        self._vec_file.flush()
+        rows = os.path.getsize(self._vec_path) // self._row_bytes()
+        self._mmap = np.memmap(self._vec_path, dtype=self.dtype, mode="r", shape=(rows, self._dim))
+        self._mapped_rows = rows
+
+    # ------------------------------------------------------------------ API
+    def get_many(self, texts: Sequence[str]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        """Return (vectors, missing_positions); vectors[i] is None for misses"""
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: List[int] = []
+        with self._lock:
+            # Rows in the index are only valid for the file they were read
+            # from: reload if another process compacted it since
+            if self._vec_file is not None and self._stale_handles():
+                self._load()
+            for i, text in enumerate(texts):
+                row = self._index.get(text_key(text))
+                if row is None:
+                    missing.append(i)
+                    continue
+                try:
+                    self._ensure_mapped(row)
+                    vectors[i] = np.asarray(self._mmap[row], dtype=np.float32)
+                    self._index.move_to_end(text_key(text))
+                except (OSError, ValueError, IndexError):
+                    missing.append(i)
+            self._stats["hits"] += len(texts) - len(missing)
+            self._stats["misses"] += len(missing)
+        return vectors, missing
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray):
+        """Append vectors for texts that are not cached yet"""
+        if len(texts) == 0:
+            return
+        vectors = np.asarray(vectors)
+        with self._lock:
+            if self._dim is None:
+                with self._file_lock():
+                    # Another worker may have created the files since we loaded
+                    created = not self._meta_matches(self._read_meta())
+                    if created:
+                        self._dim = int(vectors.shape[1])
+                        self._reset_files()
+                        self._write_meta()
+                if created:
+                    self._open_append_handles()
+                else:
+                    self._load()
+                    if self._dim is None:
+                        return
+            if vectors.shape[1] != self._dim:
+                logger.warning(f"Embedding cache '{self.tag}' dim mismatch, skipping write")
+                return
+
+            pending = OrderedDict()
+            for text, vec in zip(texts, vectors):
+                key = text_key(text)
+                if key not in self._index:
+                    pending[key] = vec
+            if not pending:
+                return
+
+            with self._file_lock():
+                if self._stale_handles():
+                    self._load()
+                    if self._dim is None:
+                        return
+                first_row = os.path.getsize(self._vec_path) // self._row_bytes()
+                block = np.stack(list(pending.values())).astype(self.dtype)
+                records = np.zeros(len(pending), dtype=_INDEX_DTYPE)
+                records["key"] = [np.void(k) for k in pending.keys()]
+                records["row"] = np.arange(first_row, first_row + len(pending), dtype=np.uint32)
+                self._vec_file.write(block.tobytes())
+                self._vec_file.flush()
+                self._idx_file.write(records.tobytes())
+                self._idx_file.flush()
+
+            for offset, key in enumerate(pending.keys()):
+                self._index[key] = first_row + offset
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+                self._dead_rows += 1
+                self._stats["evictions"] += 1
+            if self._dead_rows > max(len(self._index), 1024):
+                self._compact()
+
+    def _compact(self):
+        """Rewrite live rows (in LRU order) into fresh files and drop dead space"""
+        with self._file_lock():
+            if self._stale_handles():
+                self._load()
+                return
+            self._ensure_mapped(max(self._index.values(), default=0))
+            keys = list(self._index.keys())
+            rows = np.fromiter(self._index.values(), dtype=np.int64, count=len(keys))
+            live = np.asarray(self._mmap[rows]) if len(rows) else np.zeros((0, self._dim), self.dtype)
+            records = np.zeros(len(keys), dtype=_INDEX_DTYPE)
+            records["key"] = [np.void(k) for k in keys]
+            records["row"] = np.arange(len(keys), dtype=np.uint32)
+
+            live.astype(self.dtype).tofile(self._vec_path + ".tmp")
+            records.tofile(self._idx_path + ".tmp")
+            self._close_files()
+            os.replace(self._vec_path + ".tmp", self._vec_path)
+            os.replace(self._idx_path + ".tmp", self._idx_path)
+
+            self._index = OrderedDict((k, i) for i, k in enumerate(keys))
+            self._dead_rows = 0
+            self._open_append_handles()
+        self._stats["compactions"] += 1
+        logger.info(f"Compacted embedding cache '{self.tag}' to {len(keys)} rows")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            try:
+                file_bytes = os.path.getsize(self._vec_path)
+            except OSError:
+                file_bytes = 0
+            return {
+                "tag": self.tag,
+                "entries": len(self._index),
+                "dead_rows": self._dead_rows,
+                "file_bytes": file_bytes,
+                "dtype": self.dtype.name,
+                **self._stats,
+            }
+
+
+class _FileLock:
+    """Advisory inter-process lock (no-op where fcntl is unavailable)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(tag: str) -> Optional[EmbeddingCache]:
+    """Get the cache for a model tag, or None if the cache is disabled/unusable"""
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    cache = _caches.get(tag)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(tag)
+            if cache is None:
+                try:
+                    cache = EmbeddingCache(
+                        EMBEDDING_CACHE_DIR, tag,
+                        dtype=EMBEDDING_CACHE_DTYPE,
+                        max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+                    )
+                except OSError as e:
+                    logger.warning(f"⚠️ Embedding cache unavailable, encoding without it: {e}")
+                    return None
+                _caches[tag] = cache
+    return cache
+
+
+def get_embedding_cache_stats() -> Dict:
+    """Stats for every embedding cache opened in this process"""
+    return {
+        "enabled": EMBEDDING_CACHE_ENABLED,
+        "directory": EMBEDDING_CACHE_DIR,
+        "caches": [cache.stats() for cache in list(_caches.values())],
+    }
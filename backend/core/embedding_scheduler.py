@@ -0,0 +1,199 @@
+# backend/core/embedding_scheduler.py
+"""
+Cross-request micro-batching for sentence-transformer inference.
+
+Concurrent handlers each submit their own small list of texts. A single
+scheduler thread per model collects requests for up to `max_wait_ms` (or
+until `max_batch_size` texts are queued), sorts the texts by length so each
+batch pads to similar sequence lengths, encodes them in as few model calls as
+possible and fans the rows back out to each caller's future.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCHING_ENABLED = os.getenv("HIRESCOPE_EMBEDDING_BATCHING", "1") != "0"
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("HIRESCOPE_EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("HIRESCOPE_EMBEDDING_MAX_WAIT_MS", "5"))
+
+# Upper bounds of the batch-size histogram buckets
+_HISTOGRAM_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _histogram_bucket(size: int) -> str:
+    for bound in _HISTOGRAM_BOUNDS:
+        if size <= bound:
+            return f"le_{bound}"
+    return "inf"
+
+
+class _EncodeRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingScheduler:
+    """
+    Coalesces encode requests from many threads into length-bucketed batches.
+
+    `encode_fn` takes a list of texts and returns an (n, dim) array; it is only
+    ever called from the scheduler thread.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], name: str = "",
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue: "queue.Queue[_EncodeRequest]" = None
+        self._thread = None
+        self._stats = {
+            "requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+            "batch_size_histogram": {},
+            "requests_per_cycle_histogram": {},
+        }
+
+    def _ensure_started(self):
+        # Threads don't survive fork(), so each process starts its own worker
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(
+                target=self._run, name=f"embedding-scheduler-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for encoding; the future resolves to an (n, dim) array"""
+        self._ensure_started()
+        request = _EncodeRequest(list(texts))
+        self._queue.put(request)
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["texts"] += len(request.texts)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queue.qsize())
+        return request.future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking helper for synchronous callers"""
+        return self.submit(texts).result()
+
+    def _collect(self) -> List[_EncodeRequest]:
+        """Block for one request, then gather more until the batch is full or the wait expires"""
+        requests = [self._queue.get()]
+        pending = len(requests[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while pending < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            requests.append(request)
+            pending += len(request.texts)
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            started = time.perf_counter()
+            try:
+                self._process(requests)
+            except Exception as e:
+                logger.error(f"Embedding batch failed ({self.name}): {e}")
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+            with self._lock:
+                bucket = _histogram_bucket(len(requests))
+                hist = self._stats["requests_per_cycle_histogram"]
+                hist[bucket] = hist.get(bucket, 0) + 1
+                self._stats["total_wait_ms"] += sum(
+                    (started - r.enqueued_at) * 1000.0 for r in requests
+                )
+
+    def _process(self, requests: List[_EncodeRequest]):
+        # Flatten, then order by length so each batch pads to a similar size
+        flat = [(ri, ti, text) for ri, r in enumerate(requests) for ti, text in enumerate(r.texts)]
+        flat.sort(key=lambda item: len(item[2]))
+        outputs: List[List[np.ndarray]] = [[None] * len(r.texts) for r in requests]
+
+        for start in range(0, len(flat), self.max_batch_size):
+            chunk = flat[start:start + self.max_batch_size]
+            vectors = self.encode_fn([text for _, _, text in chunk])
+            for (ri, ti, _), vec in zip(chunk, vectors):
+                outputs[ri][ti] = vec
+            with self._lock:
+                self._stats["batches"] += 1
+                bucket = _histogram_bucket(len(chunk))
+                hist = self._stats["batch_size_histogram"]
+                hist[bucket] = hist.get(bucket, 0) + 1
+
+        for request, rows in zip(requests, outputs):
+            request.future.set_result(np.stack(rows) if rows else np.zeros((0, 0), dtype=np.float32))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                "name": self.name,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                **{k: (dict(v) if isinstance(v, dict) else v) for k, v in self._stats.items()},
+            }
+        requests = stats["requests"] or 1
+        stats["avg_wait_ms"] = round(stats.pop("total_wait_ms") / requests, 3)
+        return stats
+
+
+_schedulers: Dict[str, EmbeddingScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(tag: str, encode_fn: Callable[[List[str]], np.ndarray]):
+    """Get the scheduler for a model tag, or None when batching is disabled"""
+    if not EMBEDDING_BATCHING_ENABLED:
+        return None
+    scheduler = _schedulers.get(tag)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(tag)
+            if scheduler is None:
+                scheduler = EmbeddingScheduler(
+                    encode_fn, name=tag,
+                    max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+                    max_wait_ms=EMBEDDING_MAX_WAIT_MS,
+                )
+                _schedulers[tag] = scheduler
+    return scheduler
+
+
+def get_scheduler_stats() -> Dict:
+    """Queue depth and batch-size histograms for every scheduler in this process"""
+    return {
+        "enabled": EMBEDDING_BATCHING_ENABLED,
+        "schedulers": [s.stats() for s in list(_schedulers.values())],
+    }
@@ -1,57 +1,165 @@
 # backend/core/embedding_store.py
-from sentence_transformers import SentenceTransformer
+import os
 import numpy as np
-import threading
-import time
 import logging
+from core.model_registry import get_registry, DEFAULT_MODEL
+from core.embedding_cache import get_embedding_cache
+from core.embedding_scheduler import get_scheduler
+from core.embedding_backends import EMBEDDING_BACKEND, EMBEDDING_MAX_SEQ_LENGTH
 
 logger = logging.getLogger(__name__)
 
-_MODEL = None
-_MODEL_LOCK = threading.Lock()
+# How a whole-document vector is built:
+#   pooled  - weighted mean of the sentence embeddings we already computed (no extra encode)
+#   chunked - encode chunks of the text sized to the sentence token cap and pool them
+#   full    - legacy single encode of the raw text (truncated by the model)
+DOC_EMBEDDING_STRATEGIES = ("pooled", "chunked", "full")
+DOC_EMBEDDING_STRATEGY = os.getenv("HIRESCOPE_DOC_EMBEDDING_STRATEGY", "pooled").lower()
+# Rough words-per-token ratio for English WordPiece/BPE vocabularies
+_WORDS_PER_TOKEN = 0.75
+_CHUNK_OVERLAP_WORDS = 24
 
-def get_model(name: str = "all-mpnet-base-v2", max_retries: int = 3):
+def get_model(name: str = DEFAULT_MODEL):
     """
-    Get or load the sentence transformer model with retry logic.
-    
+    Get the shared sentence transformer model.
+
+    Loading (with retries) is handled by the process-wide model registry, so
+    every caller in the process shares one instance per model name.
+
     Args:
         name: Model name from HuggingFace
-        max_retries: Maximum number of retry attempts for network issues
-    
+
     Returns:
         SentenceTransformer model instance
     """
-    global _MODEL
-    if _MODEL is None:
-        with _MODEL_LOCK:
-            if _MODEL is None:
-                for attempt in range(max_retries):
-                    try:
-                        logger.info(f"Loading model '{name}' (attempt {attempt + 1}/{max_retries})...")
-                        _MODEL = SentenceTransformer(name)
-                        logger.info(f"Model '{name}' loaded successfully")
-                        break
-                    except Exception as e:
-                        logger.error(f"Failed to load model (attempt {attempt + 1}/{max_retries}): {e}")
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                            logger.info(f"Retrying in {wait_time} seconds...")
-                            time.sleep(wait_time)
-                        else:
-                            logger.error("All retry attempts failed")
-                            raise Exception(
-                                f"Failed to load model '{name}' after {max_retries} attempts. "
-                                "This may be due to network issues or cache permission problems. "
-                                "Please check the logs and try again."
-                            ) from e
-    return _MODEL
+    return get_registry().get(name)
 
-def embed_texts(texts, model=None):
-    model = model or get_model()
+def model_tag(name: str) -> str:
+    """Identifies the embedding space a model produces (used to tag caches)"""
+    parts = [name]
+    if EMBEDDING_BACKEND != "torch":
+        # ONNX/int8 vectors drift slightly from PyTorch; keep their caches separate
+        parts.append(EMBEDDING_BACKEND)
+    return "@".join(parts)
+
+def _encode(model, texts):
     vecs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
     # Normalize rows
     norms = np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-10
     return (vecs / norms).astype(np.float32)
 
+class _EmbedJob:
+    """Cache lookup for one embed call; only `to_encode` still needs the model"""
+
+    def __init__(self, texts, model):
+        self.texts = list(texts)
+        self.model = model
+        name = get_registry().name_of(model)
+        self.tag = model_tag(name) if name else None
+        self.cache = get_embedding_cache(self.tag) if self.tag else None
+        if self.cache is not None:
+            self.vectors, self.missing = self.cache.get_many(self.texts)
+        else:
+            self.vectors, self.missing = [None] * len(self.texts), list(range(len(self.texts)))
+        # Encode each distinct missing text once
+        self.to_encode = list(dict.fromkeys(self.texts[i] for i in self.missing))
+
+    def scheduler(self):
+        if self.tag is None:
+            return None
+        return get_scheduler(self.tag, lambda texts: _encode(self.model, texts))
+
+    def finish(self, encoded):
+        if self.to_encode:
+            if self.cache is not None:
+                self.cache.put_many(self.to_encode, encoded)
+                # Round-trip through the storage dtype so hits and misses agree exactly
+                encoded = encoded.astype(self.cache.dtype).astype(np.float32)
+            by_text = dict(zip(self.to_encode, encoded))
+            for i in self.missing:
+                self.vectors[i] = by_text[self.texts[i]]
+        return np.stack(self.vectors).astype(np.float32)
+
+def embed_texts(texts, model=None):
+    """
+    Encode texts into L2-normalized float32 rows.
+
+    Vectors are looked up in the persistent embedding cache first; only the
+    misses are encoded, coalesced with other in-flight requests by the
+    embedding scheduler, and then written back.
+    """
+    model = model or get_model()
+    job = _EmbedJob(texts, model)
+    if not job.texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    encoded = None
+    if job.to_encode:
+        scheduler = job.scheduler()
+        encoded = scheduler.encode(job.to_encode) if scheduler else _encode(model, job.to_encode)
+    return job.finish(encoded)
+
+def _seq_cap(model) -> int:
+    """Token limit for sentence and chunk encodes (never above the model's own)"""
+    if EMBEDDING_MAX_SEQ_LENGTH:
+        return min(model.max_seq_length, EMBEDDING_MAX_SEQ_LENGTH)
+    return model.max_seq_length
+
+def _cap_words(text: str, limit: int) -> str:
+    words = text.split()
+    return " ".join(words[:limit]) if len(words) > limit else text
+
 def embed_sentences(sentences, model=None):
-    return embed_texts(sentences, model=model)
+    """
+    embed_texts for resume sentences, each cut to the sentence token cap.
+
+    The cap is applied to the text rather than to the shared model, so job
+    descriptions and full-text encodes still see the model's whole window.
+    """
+    model = model or get_model()
+    limit = max(16, int(_seq_cap(model) * _WORDS_PER_TOKEN))
+    return embed_texts([_cap_words(s, limit) for s in sentences], model=model)
+
+def pool_embeddings(vectors, weights=None):
+    """Weighted mean of normalized rows, re-normalized to unit length"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    weights = np.ones(len(vectors), dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+    pooled = (vectors * weights[:, None]).sum(axis=0) / max(float(weights.sum()), 1e-10)
+    return (pooled / (np.linalg.norm(pooled) + 1e-10)).astype(np.float32)
+
+def chunk_text(text: str, model) -> list:
+    """Split text into overlapping word windows that fit the sentence token cap"""
+    words = text.split()
+    size = max(16, int(_seq_cap(model) * _WORDS_PER_TOKEN))
+    step = max(1, size - _CHUNK_OVERLAP_WORDS)
+    return [" ".join(words[i:i + size]) for i in range(0, max(len(words) - _CHUNK_OVERLAP_WORDS, 1), step)]
+
+def _word_weights(texts):
+    # Longer sentences carry more of the document; cap so one run-on line can't dominate
+    return [min(max(len(t.split()), 1), 64) for t in texts]
+
+def _doc_strategy(strategy, sentence_embeddings):
+    strategy = (strategy or DOC_EMBEDDING_STRATEGY).lower()
+    if strategy not in DOC_EMBEDDING_STRATEGIES:
+        logger.warning(f"Unknown document embedding strategy '{strategy}', using pooled")
+        strategy = "pooled"
+    if strategy == "pooled" and (sentence_embeddings is None or len(sentence_embeddings) == 0):
+        strategy = "chunked"
+    return strategy
+
+def embed_document(text, sentences=None, sentence_embeddings=None, model=None, strategy=None):
+    """
+    Whole-document embedding that covers the entire text.
+
+    With the default "pooled" strategy this reuses the sentence embeddings the
+    caller already has and costs no model call at all; without them it falls
+    back to "chunked" encoding.
+    """
+    model = model or get_model()
+    strategy = _doc_strategy(strategy, sentence_embeddings)
+    if strategy == "pooled":
+        weights = _word_weights(sentences) if sentences else None
+        return pool_embeddings(sentence_embeddings, weights)
+    if strategy == "chunked":
+        chunks = chunk_text(text, model)
+        return pool_embeddings(embed_texts(chunks, model=model), _word_weights(chunks))
+    return embed_texts([text], model=model)[0]
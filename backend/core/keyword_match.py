@@ -4,50 +4,27 @@ import logging
 from collections import Counter
 import numpy as np
 from typing import List, Dict, Set, Optional
-from sentence_transformers import SentenceTransformer
 from utils.cache import cached, get_cache_stats
+from core.model_tiers import get_tier, get_tier_model, DEFAULT_TIER
+from core.preprocess import get_nlp
+from core.taxonomy_embeddings import embed_terms
 
 logger = logging.getLogger(__name__)
 
-# Singleton pattern for lazy model loading with better error handling
-_model = None
-_model_loading = False
-
-def get_embedding_model() -> Optional[SentenceTransformer]:
+def get_embedding_model(tier: str = DEFAULT_TIER):
     """
-    Lazy load embedding model with singleton pattern and error handling.
-    Returns None if model fails to load (allows graceful degradation).
+    Get the shared embedding model for a tier from the process-wide registry.
+    Concurrent callers wait for an in-flight load instead of getting None.
+    Returns None only if the model fails to load (allows graceful degradation).
     """
-    global _model, _model_loading
-    
-    if _model is not None:
-        return _model
-    
-    if _model_loading:
-        logger.warning("Model already loading, waiting...")
-        return None
-    
     try:
-        _model_loading = True
-        logger.info("🔄 Loading embedding model (all-mpnet-base-v2)...")
-        _model = SentenceTransformer('all-mpnet-base-v2')
-        logger.info("✅ Embedding model loaded successfully")
-        return _model
+        return get_tier_model(tier)
     except Exception as e:
         logger.error(f"❌ Failed to load embedding model: {e}")
         return None
-    finally:
-        _model_loading = False
 
-# Enhanced stopwords list
-STOPWORDS = set()
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    STOPWORDS = set([w.text.lower() for w in nlp.Defaults.stop_words])
-except Exception:
-    # fallback minimal stopwords
-    STOPWORDS = {"and","or","the","a","an","to","in","for","on","with"}
+# fallback minimal stopwords when spaCy is unavailable
+FALLBACK_STOPWORDS = {"and","or","the","a","an","to","in","for","on","with"}
 
 # Additional common non-keywords to filter out
 COMMON_WORDS = {
@@ -114,8 +91,16 @@ COMMON_WORDS = {
     "write", "writing", "read", "reading", "analyze", "analyzed"
 }
 
-# Merge with spaCy stopwords
-ALL_STOPWORDS = STOPWORDS.union(COMMON_WORDS)
+_all_stopwords = None
+
+def get_stopwords() -> set:
+    """spaCy's stopwords (enhanced list) merged with COMMON_WORDS, built on first use"""
+    global _all_stopwords
+    if _all_stopwords is None:
+        nlp = get_nlp()
+        stopwords = set(w.lower() for w in nlp.Defaults.stop_words) if nlp else FALLBACK_STOPWORDS
+        _all_stopwords = stopwords.union(COMMON_WORDS)
+    return _all_stopwords
 
 # Technical keywords patterns that should be kept even if they're short
 TECHNICAL_PATTERNS = {
@@ -267,6 +252,14 @@ COMPOUND_TERMS = {
     'configuration management', 'container orchestration',
 }
 
+# Semantic anchors for filtering ambiguous JD terms (more specific technical anchors)
+TECH_ANCHORS = [
+    "python java programming", "docker kubernetes cloud",
+    "react angular vue framework", "postgresql mysql database",
+    "tensorflow pytorch machine learning", "aws azure gcp platform",
+    "git jenkins devops", "api rest graphql", "agile scrum methodology"
+]
+
 def extract_candidate_phrases(text: str) -> List[str]:
     """Extract clean technical keywords and short compound terms"""
     candidates = []
@@ -279,9 +272,10 @@ def extract_candidate_phrases(text: str) -> List[str]:
     
     # 2. Extract individual technical keywords
     tokens = re.findall(r'\b[a-zA-Z0-9\+\-\#\.]{2,}\b', text_lower)
+    all_stopwords = get_stopwords()
     for token in tokens:
         # Skip stopwords
-        if token in ALL_STOPWORDS or token.isdigit():
+        if token in all_stopwords or token.isdigit():
             continue
         
         # Keep if it's a known technical keyword
@@ -305,7 +299,7 @@ def extract_candidate_phrases(text: str) -> List[str]:
             candidates.append(token)
     
     # 3. Extract selective bigrams (only if both words are tech-related)
-    words = [w for w in tokens if w not in ALL_STOPWORDS and not w.isdigit()]
+    words = [w for w in tokens if w not in all_stopwords and not w.isdigit()]
     for i in range(len(words)-1):
         bigram = f"{words[i]} {words[i+1]}"
         # Only keep if not already in compound terms and both words look technical
@@ -324,11 +318,12 @@ def extract_candidate_phrases(text: str) -> List[str]:
     
     return unique_candidates
 
-@cached(prefix="jd_keywords", ttl=3600)  # Cache for 1 hour
-def simple_keywords_from_jd(jd_text: str) -> list:
+# Fresh for an hour; for a day after that, served at once while refreshed in the background
+@cached(prefix="jd_keywords", ttl=86400, soft_ttl=3600)
+def simple_keywords_from_jd(jd_text: str, tier: str = DEFAULT_TIER) -> list:
     """
     Extract clean technical keywords (not long phrases).
-    Results are cached for better performance on repeated JDs.
+    Results are cached per JD and model tier for better performance on repeated JDs.
     """
     logger.debug(f"Extracting keywords from JD (length: {len(jd_text)} chars)")
     
@@ -340,7 +335,8 @@ def simple_keywords_from_jd(jd_text: str) -> list:
         return []
     
     # Use semantic filtering only for ambiguous terms
-    model = get_embedding_model()
+    model_name = get_tier(tier).model_name
+    model = get_embedding_model(tier)
     
     # Separate known technical terms from ambiguous ones
     known_technical = []
@@ -366,16 +362,9 @@ def simple_keywords_from_jd(jd_text: str) -> list:
     # Semantic filtering for ambiguous terms (only if model loaded)
     if ambiguous and model is not None:
         try:
-            # Use more specific technical anchors
-            tech_anchors = [
-                "python java programming", "docker kubernetes cloud",
-                "react angular vue framework", "postgresql mysql database",
-                "tensorflow pytorch machine learning", "aws azure gcp platform",
-                "git jenkins devops", "api rest graphql", "agile scrum methodology"
-            ]
-            
-            anchor_embeddings = model.encode(tech_anchors, convert_to_numpy=True)
-            ambiguous_embeddings = model.encode(ambiguous, convert_to_numpy=True)
+            # Anchors come precomputed from the taxonomy artifact when available
+            anchor_embeddings = embed_terms(TECH_ANCHORS, model, model_name)
+            ambiguous_embeddings = embed_terms(ambiguous, model, model_name)
             
             for idx, candidate in enumerate(ambiguous):
                 candidate_emb = ambiguous_embeddings[idx].reshape(1, -1)
@@ -422,7 +411,7 @@ def simple_keywords_from_jd(jd_text: str) -> list:
     logger.info(f"✅ Extracted {len(final_keywords)} keywords from JD")
     return final_keywords[:35]
 
-def compute_keyword_match(resume_text: str, jd_text: str) -> dict:
+def compute_keyword_match(resume_text: str, jd_text: str, tier: str = DEFAULT_TIER) -> dict:
     """
     Compute keyword match using hybrid approach:
     - Exact matching for known technical terms (fast)
@@ -433,7 +422,7 @@ def compute_keyword_match(resume_text: str, jd_text: str) -> dict:
     logger.debug("Computing keyword match...")
     
     # Extract keywords from job description (cached)
-    jd_keywords = simple_keywords_from_jd(jd_text)
+    jd_keywords = simple_keywords_from_jd(jd_text, tier=tier)
     
     # Extract candidate phrases from resume
     resume_candidates = extract_candidate_phrases(resume_text)
@@ -484,7 +473,8 @@ def compute_keyword_match(resume_text: str, jd_text: str) -> dict:
             missing.append(jd_keyword)
     
     # Second pass: Semantic matching for missing keywords (slower, only if needed)
-    model = get_embedding_model()
+    model_name = get_tier(tier).model_name
+    model = get_embedding_model(tier)
     
     if missing and len(missing) < len(jd_keywords) * 0.7 and model is not None:
         try:
@@ -494,8 +484,8 @@ def compute_keyword_match(resume_text: str, jd_text: str) -> dict:
             if semantic_missing and resume_candidates_set:
                 logger.debug(f"Attempting semantic matching for {len(semantic_missing)} keywords")
                 
-                jd_embeddings = model.encode(semantic_missing, convert_to_numpy=True)
-                resume_embeddings = model.encode(list(resume_candidates_set), convert_to_numpy=True)
+                jd_embeddings = embed_terms(semantic_missing, model, model_name)
+                resume_embeddings = embed_terms(list(resume_candidates_set), model, model_name)
                 
                 semantic_matches = []
                 for idx, jd_keyword in enumerate(semantic_missing):
@@ -0,0 +1,99 @@
+# backend/core/model_bundle.py
+"""
+Offline model bundles.
+
+A bundle is a sentence-transformer saved to a plain directory at image build
+time: safetensors weights (memory-mapped on load, so no unpickling), the
+fast tokenizer's prebuilt tokenizer.json, the pooling/normalize module
+configs and a bundle.json manifest. Loading one skips everything
+SentenceTransformer(name) does to resolve a name through the Hugging Face
+cache: no hub lookups, no retries, no network at all.
+
+build_model_bundles.py writes the bundles; the model registry prefers a
+bundle over the hub whenever one exists for the requested model.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_BUNDLE_VERSION = 1
+MODEL_BUNDLE_DIR = os.getenv(
+    "HIRESCOPE_MODEL_BUNDLE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts", "models"),
+)
+MODEL_BUNDLES_ENABLED = os.getenv("HIRESCOPE_MODEL_BUNDLES", "1") != "0"
+
+
+def bundle_path(name: str, directory: str = MODEL_BUNDLE_DIR) -> str:
+    return os.path.join(directory, name.replace("/", "__"))
+
+
+def read_manifest(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, "bundle.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MODEL_BUNDLE_VERSION:
+        return None
+    return manifest
+
+
+def build_bundle(name: str, directory: str = MODEL_BUNDLE_DIR) -> str:
+    """Save a model (downloading it if needed) as an offline bundle"""
+    import sentence_transformers
+    from core.model_registry import _load_sentence_transformer
+
+    path = bundle_path(name, directory)
+    model = _load_sentence_transformer(name, use_bundle=False)
+
+    # Build next to the final location and rename, so readers never see a partial bundle
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    model.save(tmp_path, create_model_card=False, safe_serialization=True)
+    if not os.path.exists(os.path.join(tmp_path, "tokenizer.json")):
+        raise ValueError(f"'{name}' has no fast tokenizer; it can't be bundled")
+    with open(os.path.join(tmp_path, "bundle.json"), "w") as f:
+        json.dump({
+            "version": MODEL_BUNDLE_VERSION,
+            "model": name,
+            "dim": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+            "sentence_transformers": sentence_transformers.__version__,
+            "created_at": time.time(),
+        }, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    os.rename(tmp_path, path)
+    return path
+
+
+def load_bundle(name: str, directory: str = MODEL_BUNDLE_DIR):
+    """Load a model from its bundle; None when there is no usable bundle"""
+    if not MODEL_BUNDLES_ENABLED:
+        return None
+    path = bundle_path(name, directory)
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("model") != name:
+        return None
+
+    from sentence_transformers import SentenceTransformer
+
+    start = time.perf_counter()
+    try:
+        model = SentenceTransformer(path, device="cpu", local_files_only=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Model bundle for '{name}' is unusable, falling back to the hub: {e}")
+        return None
+    if model.get_sentence_embedding_dimension() != manifest.get("dim"):
+        logger.warning(f"⚠️ Model bundle for '{name}' has the wrong dimension, falling back to the hub")
+        return None
+    logger.info(f"✅ Model '{name}' loaded from bundle in {time.perf_counter() - start:.2f}s")
+    return model
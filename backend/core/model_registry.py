@@ -0,0 +1,230 @@
+# backend/core/model_registry.py
+"""
+Process-wide registry for sentence-transformer models.
+
+Every embedding call site (embedding_store, keyword_match, rag_engine and the
+ATS routes) goes through this registry so each model name is loaded exactly
+once per process, no matter how many callers ask for it concurrently.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-mpnet-base-v2"
+FAST_MODEL = "all-MiniLM-L6-v2"
+# Never reach out to the Hugging Face hub; load from bundles or the local cache only
+MODEL_OFFLINE = os.getenv("HIRESCOPE_MODEL_OFFLINE", "0") == "1"
+
+
+def _process_rss_bytes() -> int:
+    """Current resident set size of this process (0 if it can't be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        try:
+            import resource
+            # ru_maxrss is a high-water mark in KB on Linux; good enough as a fallback
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except Exception:
+            return 0
+
+
+def _model_param_bytes(model: Any) -> int:
+    """Bytes held by a model's parameters and buffers."""
+    if hasattr(model, "weight_bytes"):
+        return model.weight_bytes
+    total = 0
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    except Exception:
+        pass
+    return total
+
+
+def _load_sentence_transformer(name: str, max_retries: int = 3, use_bundle: bool = True):
+    """
+    Load a SentenceTransformer, from its offline bundle when one exists,
+    otherwise from the hub with exponential backoff on network issues.
+    """
+    from sentence_transformers import SentenceTransformer
+    from core.model_bundle import load_bundle
+
+    if use_bundle:
+        model = load_bundle(name)
+        if model is not None:
+            model.load_source = "bundle"
+            return model
+
+    if MODEL_OFFLINE:
+        # Strict offline: only what is already in the local Hugging Face cache
+        logger.info(f"🔄 Loading model '{name}' from the local cache (offline)...")
+        model = SentenceTransformer(name, device="cpu", local_files_only=True)
+        model.load_source = "hf-cache"
+        return model
+
+    for attempt in range(max_retries):
+        try:
+            logger.info(f"🔄 Loading model '{name}' (attempt {attempt + 1}/{max_retries})...")
+            model = SentenceTransformer(name)
+            model.load_source = "hub"
+            return model
+        except Exception as e:
+            logger.error(f"Failed to load model '{name}' (attempt {attempt + 1}/{max_retries}): {e}")
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
+                logger.info(f"Retrying in {wait_time} seconds...")
+                time.sleep(wait_time)
+            else:
+                raise Exception(
+                    f"Failed to load model '{name}' after {max_retries} attempts. "
+                    "This may be due to network issues or cache permission problems. "
+                    "Please check the logs and try again."
+                ) from e
+
+
+def load_embedding_model(name: str):
+    """Load a model with the deployment's configured inference backend."""
+    from core.embedding_backends import EMBEDDING_BACKEND
+    from utils.thread_budget import apply_torch_threads, get_thread_budget
+
+    if EMBEDDING_BACKEND.startswith("onnx"):
+        from core.embedding_backends import load_onnx_encoder
+        model = load_onnx_encoder(
+            name, quantized=EMBEDDING_BACKEND == "onnx-int8",
+            intra_op_threads=get_thread_budget().inference_threads,
+        )
+    else:
+        model = _load_sentence_transformer(name)
+        apply_torch_threads()
+    return model
+
+
+class ModelRegistry:
+    """
+    Holds one instance per model name.
+
+    The first caller for a name becomes the loader; everyone else waits on the
+    same "loading" future instead of getting None or triggering a second load.
+    A failed load is forgotten so the next caller can retry.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_embedding_model):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._info: Dict[str, Dict[str, Any]] = {}
+
+    def _claim(self, name: str):
+        """Return (future, is_loader) for a model name."""
+        with self._lock:
+            future = self._futures.get(name)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._futures[name] = future
+            self._info[name] = {"state": "loading", "started_at": time.time()}
+            return future, True
+
+    def _load_into(self, name: str, future: Future):
+        rss_before = _process_rss_bytes()
+        start = time.perf_counter()
+        try:
+            model = self._loader(name)
+        except BaseException as e:
+            with self._lock:
+                self._futures.pop(name, None)
+                self._info[name] = {"state": "failed", "error": str(e)}
+            future.set_exception(e)
+            return
+
+        load_seconds = time.perf_counter() - start
+        source = getattr(model, "load_source", "unknown")
+        with self._lock:
+            self._info[name] = {
+                "state": "loaded",
+                "backend": getattr(model, "backend", "torch"),
+                "source": source,
+                "load_seconds": round(load_seconds, 3),
+                "param_bytes": _model_param_bytes(model),
+                "rss_delta_bytes": max(0, _process_rss_bytes() - rss_before),
+            }
+        logger.info(f"✅ Model '{name}' loaded in {load_seconds:.2f}s ({source})")
+        future.set_result(model)
+
+    def _ensure_loading(self, name: str, background: bool = False) -> Future:
+        future, is_loader = self._claim(name)
+        if is_loader:
+            if background:
+                threading.Thread(
+                    target=self._load_into, args=(name, future),
+                    name=f"model-load-{name}", daemon=True
+                ).start()
+            else:
+                self._load_into(name, future)
+        return future
+
+    def get(self, name: str = DEFAULT_MODEL, timeout: Optional[float] = None):
+        """Return the model, loading it (or waiting for the in-flight load) if needed."""
+        return self._ensure_loading(name).result(timeout=timeout)
+
+    async def get_async(self, name: str = DEFAULT_MODEL):
+        """Awaitable variant of get(); the load itself runs on a background thread."""
+        return await asyncio.wrap_future(self._ensure_loading(name, background=True))
+
+    def preload(self, name: str = DEFAULT_MODEL) -> Future:
+        """Start loading a model in the background and return its loading future."""
+        return self._ensure_loading(name, background=True)
+
+    def peek(self, name: str = DEFAULT_MODEL):
+        """Return the model only if it is already loaded. Never triggers a load."""
+        with self._lock:
+            future = self._futures.get(name)
+        if future is not None and future.done() and future.exception() is None:
+            return future.result()
+        return None
+
+    def is_loaded(self, name: str = DEFAULT_MODEL) -> bool:
+        return self.peek(name) is not None
+
+    def name_of(self, model: Any) -> Optional[str]:
+        """Reverse lookup: which registered name does this instance belong to."""
+        with self._lock:
+            futures = list(self._futures.items())
+        for name, future in futures:
+            if future.done() and future.exception() is None and future.result() is model:
+                return name
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model state, load time and resident memory."""
+        with self._lock:
+            models = {name: dict(info) for name, info in self._info.items()}
+        return {
+            "models": models,
+            "total_param_bytes": sum(m.get("param_bytes", 0) for m in models.values()),
+            "process_rss_bytes": _process_rss_bytes(),
+        }
+
+
+# Singleton instance
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> ModelRegistry:
+    """Get or create the process-wide model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,55 @@
+# backend/core/model_tiers.py
+"""
+Model tiers: named (model, dimension) pairs a request runs on end to end.
+
+Routes pick a tier and pass it down to scoring, keyword matching, RAG and
+heatmap generation. Everything downstream derives its model (and therefore
+its embedding caches and taxonomy artifact) from the tier, so vectors from
+different models are never compared with each other.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from core.model_registry import get_registry, DEFAULT_MODEL, FAST_MODEL
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """An embedding model a request can run on"""
+    name: str
+    model_name: str
+    dim: int
+    description: str = ""
+
+
+TIERS: Dict[str, ModelTier] = {
+    "accurate": ModelTier("accurate", DEFAULT_MODEL, 768, "Full reports (all-mpnet-base-v2)"),
+    "fast": ModelTier("fast", FAST_MODEL, 384, "Live editing and ATS checks (all-MiniLM-L6-v2)"),
+}
+DEFAULT_TIER = "accurate"
+
+
+def get_tier(tier: Optional[Union[str, ModelTier]] = None) -> ModelTier:
+    """Resolve a tier name (or None for the default); raises ValueError if unknown"""
+    if isinstance(tier, ModelTier):
+        return tier
+    name = (tier or DEFAULT_TIER).lower()
+    if name not in TIERS:
+        raise ValueError(f"Unknown model tier '{tier}'. Available: {', '.join(TIERS)}")
+    return TIERS[name]
+
+
+def get_tier_model(tier: Optional[Union[str, ModelTier]] = None):
+    """Shared model instance for a tier (loads through the model registry)"""
+    return get_registry().get(get_tier(tier).model_name)
+
+
+async def get_tier_model_async(tier: Optional[Union[str, ModelTier]] = None):
+    return await get_registry().get_async(get_tier(tier).model_name)
+
+
+def tier_info(tier: Optional[Union[str, ModelTier]] = None) -> Dict:
+    """What a response reports about the tier that produced it"""
+    tier = get_tier(tier)
+    return {"name": tier.name, "model": tier.model_name, "dim": tier.dim}
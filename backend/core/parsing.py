@@ -1,17 +1,11 @@
 # backend/core/parsing.py
 import io
 import logging
+import os
 
-from PyPDF2 import PdfReader
-from docx import Document
-from pdf2image import convert_from_bytes
-from pdf2image.exceptions import (
-    PDFInfoNotInstalledError,
-    PDFPageCountError,
-    PDFSyntaxError,
-)
-import pytesseract
-from pytesseract import TesseractNotFoundError
+# PDF/DOCX/OCR libraries are imported inside the functions that use them,
+# so importing this module (and the app) stays cheap
+from utils.thread_budget import get_thread_budget, ocr_semaphore
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +19,8 @@ def extract_text_from_file(content_bytes: bytes, filename: str):
         raise ValueError("Unsupported file type. Supported: .pdf, .docx")
 
 def extract_text_pdf(content_bytes: bytes):
+    from PyPDF2 import PdfReader
+
     reader = PdfReader(io.BytesIO(content_bytes))
     pages_text = []
     for i, page in enumerate(reader.pages):
@@ -37,6 +33,12 @@ def extract_text_pdf(content_bytes: bytes):
     metadata = {"pages": len(pages_text), "file_type": "pdf"}
     # if extracted text is very short -> try OCR fallback
     if len(full_text) < 80:
+        from pdf2image.exceptions import (
+            PDFInfoNotInstalledError,
+            PDFPageCountError,
+            PDFSyntaxError,
+        )
+        from pytesseract import TesseractNotFoundError
         try:
             ocr_text = ocr_pdf(content_bytes)
             if ocr_text and ocr_text.strip():
@@ -48,14 +50,28 @@ def extract_text_pdf(content_bytes: bytes):
             logger.exception("Unexpected OCR error: %s", ocr_error)
     return full_text, pages_text, metadata
 
+def _tesseract_env():
+    """Environment for Tesseract subprocesses, capped to the OCR thread budget"""
+    # OMP_THREAD_LIMIT can't go in our own environment: torch's OpenMP would honour it too
+    return {**os.environ, "OMP_THREAD_LIMIT": str(get_thread_budget().ocr_threads)}
+
 def ocr_pdf(content_bytes: bytes):
+    import pytesseract
+    from pdf2image import convert_from_bytes
+
     images = convert_from_bytes(content_bytes, dpi=300)
+    # pytesseract hands its module-level environ to every subprocess it spawns
+    pytesseract.pytesseract.environ = _tesseract_env()
     texts = []
     for img in images:
-        texts.append(pytesseract.image_to_string(img))
+        # One page per slot so concurrent uploads queue instead of oversubscribing cores
+        with ocr_semaphore():
+            texts.append(pytesseract.image_to_string(img))
     return "\n".join(texts)
 
 def extract_text_docx(content_bytes: bytes):
+    from docx import Document
+
     doc = Document(io.BytesIO(content_bytes))
     paras = [p.text for p in doc.paragraphs if p.text and p.text.strip()!='']
     full_text = "\n".join(paras)
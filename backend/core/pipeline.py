@@ -0,0 +1,286 @@
+# backend/core/pipeline.py
+"""
+Resume analysis pipelines, independent of FastAPI.
+
+The upload and live routes used to run these steps inline. Here they are plain
+synchronous functions that take bytes/strings and return JSON-ready dicts, so
+the analysis engine can run them on a worker thread or in a separate process.
+"""
+
+import logging
+import traceback
+from functools import partial
+from typing import Any, Dict
+
+from core.parsing import extract_text_from_file
+from core.preprocess import segment_text, sentence_split_with_offsets
+from core.embedding_store import embed_texts, embed_sentences, embed_document
+from core.model_tiers import get_tier, get_tier_model, tier_info
+from core.keyword_match import compute_keyword_match, simple_keywords_from_jd
+from core.scoring import compute_scores_with_role
+from core.insights import generate_insight, generate_advanced_suggestions
+from core.rag_engine import get_rag_engine
+from core.skill_detection import detect_all_skill_levels, get_skill_level_summary
+from core.weighted_matching import extract_weighted_keywords, compute_weighted_match_score
+from utils.common import hash_bytes
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change here alters analysis output for the same input
+PIPELINE_VERSION = 1
+
+
+class ParsingError(Exception):
+    """The uploaded file could not be turned into text"""
+
+
+def _skill_levels_payload(skill_levels) -> Dict[str, Dict[str, Any]]:
+    return {
+        skill: {
+            'level': info.level,
+            'years': info.years,
+            'confidence': info.confidence
+        } for skill, info in skill_levels.items()
+    } if skill_levels else {}
+
+
+def _weighted_match(resume_text: str, job_description: str, tier_name: str, skill_levels) -> Dict:
+    weighted_keywords = extract_weighted_keywords(
+        job_description, partial(simple_keywords_from_jd, tier=tier_name)
+    )
+    return compute_weighted_match_score(
+        resume_text,
+        weighted_keywords,
+        skill_levels={sl.skill: sl for sl in skill_levels.values()} if skill_levels else None
+    )
+
+
+def _blend_weighted_score(scores: Dict, weighted_match: Dict):
+    if weighted_match and 'overall_score' in weighted_match:
+        # Blend weighted keyword score with existing composite
+        scores['weighted_keyword_score'] = weighted_match['overall_score']
+        scores['composite'] = (
+            scores['composite'] * 0.7 +  # Keep 70% of original
+            weighted_match['overall_score'] * 0.3  # Add 30% weighted match
+        )
+
+
+def analyze_resume(content: bytes, filename: str, job_description: str = None,
+                   tier: str = "accurate") -> Dict[str, Any]:
+    """Full analysis behind /api/resume/upload"""
+    model_tier = get_tier(tier)
+
+    # 1) Extract text
+    logger.info("Extracting text from file...")
+    try:
+        raw_text, pages, metadata = extract_text_from_file(content, filename)
+        logger.info(f"Text extracted successfully. Length: {len(raw_text)}")
+    except Exception as e:
+        logger.error(f"Parsing error: {e}")
+        logger.error(traceback.format_exc())
+        raise ParsingError(str(e)) from e
+
+    # 2) Segment and sentence-split (with offsets)
+    logger.info("Segmenting text...")
+    sections = segment_text(raw_text)
+    sentences_with_offsets = sentence_split_with_offsets(raw_text)  # list of dicts: {sent, start, end}
+    sentences = [s["sentence"] for s in sentences_with_offsets]
+    logger.info(f"Found {len(sentences)} sentences")
+
+    # 3) Embeddings
+    logger.info(f"Loading embedding model ({model_tier.name} tier)...")
+    model = get_tier_model(model_tier)  # ensures model is loaded once
+    logger.info("Computing embeddings...")
+    sentence_embeddings = embed_sentences(sentences, model=model)
+    # Pooled from the sentence vectors: covers the whole resume, no extra encode
+    doc_embedding = embed_document(raw_text, sentences, sentence_embeddings, model=model)
+    logger.info("Embeddings computed successfully")
+
+    # 4) Keyword match (basic)
+    logger.info("Computing keyword match...")
+    keyword_stats = compute_keyword_match(raw_text, job_description or "", tier=model_tier.name)
+
+    # 4b) Skill level detection
+    logger.info("Detecting skill levels...")
+    skill_levels = {}
+    skill_summary = {}
+    if job_description and keyword_stats.get('matches'):
+        try:
+            skill_levels = detect_all_skill_levels(raw_text, keyword_stats['matches'])
+            skill_summary = get_skill_level_summary(skill_levels)
+            logger.info(f"✅ Skill levels detected: {len(skill_levels)} skills analyzed")
+        except Exception as e:
+            logger.warning(f"Skill detection failed: {e}")
+
+    # 4c) Weighted keyword matching
+    logger.info("Computing weighted keyword match...")
+    weighted_match = {}
+    if job_description:
+        try:
+            weighted_match = _weighted_match(raw_text, job_description, model_tier.name, skill_levels)
+            logger.info(f"✅ Weighted match score: {weighted_match.get('overall_score', 0):.2%}")
+        except Exception as e:
+            logger.warning(f"Weighted matching failed: {e}")
+
+    # 5) Scoring
+    logger.info("Computing scores...")
+    scores = compute_scores_with_role(
+        raw_text,
+        keyword_stats,
+        doc_embedding,
+        sentence_embeddings,
+        job_description or "",
+        tier=model_tier
+    )
+    _blend_weighted_score(scores, weighted_match)
+
+    # 6) Heatmap (per-sentence similarity to JD)
+    logger.info("Generating heatmap...")
+    heatmap = []
+    if job_description:
+        jd_embedding = embed_texts([job_description], model=model)[0]
+        # cosine similarity via dot after normalization done in embedding functions
+        sims = (sentence_embeddings @ jd_embedding).tolist()
+        for s, sim in zip(sentences_with_offsets, sims):
+            heatmap.append({
+                "sentence": s["sentence"],
+                "score": float(sim),
+                "start": s["start"],
+                "end": s["end"]
+            })
+        # sort by score desc
+        heatmap = sorted(heatmap, key=lambda x: x["score"], reverse=True)[:80]
+
+    # 7) Insight generation
+    logger.info("Generating insights...")
+    insight = generate_insight(raw_text, job_description or "", scores)
+
+    # 8) Advanced AI suggestions (enhanced with multi-level recommendations)
+    logger.info("Generating advanced AI suggestions...")
+    try:
+        advanced_suggestions = generate_advanced_suggestions(
+            resume_text=raw_text,
+            jd_text=job_description or "",
+            scores=scores,
+            keyword_stats=keyword_stats,
+            skill_levels=skill_levels,
+            weighted_match=weighted_match
+        )
+    except Exception as e:
+        logger.warning(f"Advanced suggestions generation failed: {e}")
+        logger.error(traceback.format_exc())
+        advanced_suggestions = None
+
+    # 9) RAG-powered suggestions (contextual tips from knowledge base)
+    logger.info("Generating RAG suggestions...")
+    try:
+        rag_engine = get_rag_engine(model_tier)
+        rag_suggestions = rag_engine.generate_suggestions(raw_text, job_description or "", scores)
+    except Exception as e:
+        logger.warning(f"RAG suggestions failed: {e}")
+        rag_suggestions = None
+
+    return {
+        "id": hash_bytes(content)[:12],
+        "metadata": metadata,
+        "sections": sections,
+        "scores": scores,
+        "keywords": keyword_stats,
+        "skill_levels": _skill_levels_payload(skill_levels),
+        "skill_summary": skill_summary,
+        "weighted_match": weighted_match,
+        "heatmap": heatmap,
+        "insight": insight,
+        "ai_suggestions": advanced_suggestions,  # New enhanced suggestions
+        "rag_suggestions": rag_suggestions,
+        "report_url": None,
+        "model_tier": tier_info(model_tier)
+    }
+
+
+def analyze_live(resume_text: str, job_description: str = "", tier: str = "fast") -> Dict[str, Any]:
+    """Lighter analysis behind /api/live/live-analyze"""
+    model_tier = get_tier(tier)
+
+    # Quick segmentation
+    sections = segment_text(resume_text)
+    sentences_with_offsets = sentence_split_with_offsets(resume_text)
+    sentences = [s["sentence"] for s in sentences_with_offsets]
+
+    # Embeddings (cached model)
+    model = get_tier_model(model_tier)
+    sentence_embeddings = embed_sentences(sentences, model=model)
+    # Pooled from the sentence vectors: covers the whole resume, no extra encode
+    doc_embedding = embed_document(resume_text, sentences, sentence_embeddings, model=model)
+
+    # Keyword analysis
+    keyword_stats = compute_keyword_match(resume_text, job_description or "", tier=model_tier.name)
+
+    # Skill level detection (lightweight for live)
+    skill_levels = {}
+    skill_summary = {}
+    if job_description and keyword_stats.get('matches'):
+        try:
+            skill_levels = detect_all_skill_levels(resume_text, keyword_stats['matches'][:10])  # Limit to top 10 for speed
+            skill_summary = get_skill_level_summary(skill_levels)
+        except Exception as e:
+            logger.warning(f"Live skill detection failed: {e}")
+
+    # Weighted matching (cached JD extraction for speed)
+    weighted_match = {}
+    if job_description:
+        try:
+            weighted_match = _weighted_match(resume_text, job_description, model_tier.name, skill_levels)
+        except Exception as e:
+            logger.warning(f"Live weighted matching failed: {e}")
+
+    # Scoring
+    scores = compute_scores_with_role(
+        resume_text,
+        keyword_stats,
+        doc_embedding,
+        sentence_embeddings,
+        job_description or "",
+        tier=model_tier
+    )
+    _blend_weighted_score(scores, weighted_match)
+
+    # Quick insight (no LLM for speed)
+    insight = generate_insight(resume_text, job_description or "", scores)
+
+    # Advanced AI suggestions for live feedback (lightweight mode)
+    # Only generate if JD is provided and scores are calculated
+    ai_suggestions_summary = None
+    if job_description and scores.get('composite', 0) < 0.7:
+        try:
+            # Generate quick suggestions focusing on top issues only
+            ai_suggestions = generate_advanced_suggestions(
+                resume_text=resume_text,
+                jd_text=job_description,
+                scores=scores,
+                keyword_stats=keyword_stats,
+                skill_levels=skill_levels,
+                weighted_match=weighted_match
+            )
+            # Return condensed version for live UI
+            ai_suggestions_summary = {
+                "quick_wins": ai_suggestions.get("quick_wins", [])[:3],
+                "critical_count": len(ai_suggestions.get("action_items", {}).get("critical", [])),
+                "overall_grade": ai_suggestions.get("summary", {}).get("overall_grade", "N/A"),
+                "estimated_time": ai_suggestions.get("summary", {}).get("estimated_time_to_improve", "N/A")
+            }
+        except Exception as e:
+            logger.warning(f"Live AI suggestions failed: {e}")
+
+    return {
+        "scores": scores,
+        "keywords": keyword_stats,
+        "skill_levels": _skill_levels_payload(skill_levels),
+        "skill_summary": skill_summary,
+        "weighted_match": weighted_match,
+        "insight": insight,
+        "ai_suggestions_summary": ai_suggestions_summary,  # Quick feedback for live editing
+        "word_count": len(resume_text.split()),
+        "sections": list(sections.keys()),
+        "model_tier": tier_info(model_tier)
+    }
@@ -1,12 +1,28 @@
 # backend/core/preprocess.py
 import re
-import spacy
+import threading
 
-# Use small English model; user must `python -m spacy download en_core_web_sm`
-try:
-    nlp = spacy.load("en_core_web_sm")
-except Exception:
-    nlp = None
+# spaCy (and the torch stack it pulls in through thinc) loads on first use, not at import
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """
+    Shared spaCy pipeline, loaded once on first use; None if unavailable.
+    Uses small English model; user must `python -m spacy download en_core_web_sm`
+    """
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        with _nlp_lock:
+            if not _nlp_loaded:
+                try:
+                    import spacy
+                    _nlp = spacy.load("en_core_web_sm")
+                except Exception:
+                    _nlp = None
+                _nlp_loaded = True
+    return _nlp
 
 HEADER_KEYWORDS = {
     "EXPERIENCE": "experience",
@@ -52,6 +68,7 @@ def sentence_split_with_offsets(text: str):
     Uses spaCy if available, else naive split on punctuation.
     """
     out = []
+    nlp = get_nlp()
     if nlp:
         doc = nlp(text)
         for sent in doc.sents:
@@ -4,11 +4,12 @@ RAG (Retrieval Augmented Generation) Engine for HireScope
 Provides context-aware resume improvement suggestions
 """
 
-from sentence_transformers import SentenceTransformer
 import numpy as np
 import json
 import os
 from typing import List, Dict
+from core.model_tiers import get_tier, get_tier_model
+from core.embedding_store import embed_texts
 
 class SimpleRAGEngine:
     """
@@ -16,9 +17,10 @@ class SimpleRAGEngine:
     Can be upgraded to use LangChain + LLMs later
     """
     
-    def __init__(self, knowledge_base_path="data/resume_tips.json"):
-        # Use the existing embedding model for consistency
-        self.model = SentenceTransformer('all-mpnet-base-v2')
+    def __init__(self, knowledge_base_path="data/resume_tips.json", tier=None):
+        # Share the process-wide embedding model instead of loading another copy
+        self.tier = get_tier(tier)
+        self.model = get_tier_model(self.tier)
         
         # Load or initialize knowledge base
         self.knowledge_base = self._load_knowledge_base(knowledge_base_path)
@@ -363,10 +365,8 @@ class SimpleRAGEngine:
     def _create_kb_embeddings(self):
         """Create embeddings for knowledge base entries"""
         texts = [f"{item['tip']} {item['context']}" for item in self.knowledge_base]
-        self.kb_embeddings = self.model.encode(texts, convert_to_numpy=True)
-        # Normalize
-        norms = np.linalg.norm(self.kb_embeddings, axis=1, keepdims=True) + 1e-10
-        self.kb_embeddings = self.kb_embeddings / norms
+        # Rows come back normalized (and cached across restarts)
+        self.kb_embeddings = embed_texts(texts, model=self.model)
     
     def get_relevant_tips(self, query: str, top_k: int = 5) -> List[Dict]:
         """
@@ -376,9 +376,7 @@ class SimpleRAGEngine:
             return []
         
         # Embed query
-        query_embedding = self.model.encode([query], convert_to_numpy=True)
-        query_norm = np.linalg.norm(query_embedding, axis=1, keepdims=True) + 1e-10
-        query_embedding = query_embedding / query_norm
+        query_embedding = embed_texts([query], model=self.model)
         
         # Calculate similarity
         similarities = (self.kb_embeddings @ query_embedding.T).flatten()
@@ -639,12 +637,12 @@ class SimpleRAGEngine:
             json.dump(self.knowledge_base, f, indent=2)
 
 
-# Singleton instance
-_rag_engine = None
+# One engine per model tier (knowledge-base embeddings are model specific)
+_rag_engines = {}
 
-def get_rag_engine():
-    """Get or create RAG engine singleton"""
-    global _rag_engine
-    if _rag_engine is None:
-        _rag_engine = SimpleRAGEngine()
-    return _rag_engine
+def get_rag_engine(tier=None):
+    """Get or create the RAG engine for a model tier"""
+    tier = get_tier(tier)
+    if tier.name not in _rag_engines:
+        _rag_engines[tier.name] = SimpleRAGEngine(tier=tier)
+    return _rag_engines[tier.name]
@@ -145,7 +145,7 @@ def semantic_score_from_doc_and_sentences(doc_embedding, sentence_embeddings, jd
     # clamp 0..1
     return float(max(0.0, min(1.0, topk_avg)))
 
-def compute_scores_with_role(raw_text, keyword_stats, doc_embedding, sentence_embeddings, jd_text=""):
+def compute_scores_with_role(raw_text, keyword_stats, doc_embedding, sentence_embeddings, jd_text="", tier=None):
     role = detect_role_from_jd(jd_text)
     weights = ROLE_WEIGHTS.get(role, ROLE_WEIGHTS["GENERAL"])
     # components
@@ -158,7 +158,9 @@ def compute_scores_with_role(raw_text, keyword_stats, doc_embedding, sentence_em
     semantic = 0.0
     if jd_text:
         from .embedding_store import embed_texts
-        jd_emb = embed_texts([jd_text])[0]
+        from .model_tiers import get_tier_model
+        # Must come from the same model as the resume embeddings
+        jd_emb = embed_texts([jd_text], model=get_tier_model(tier))[0]
         semantic = semantic_score_from_doc_and_sentences(doc_embedding, sentence_embeddings, jd_emb)
     # composite
     composite = (weights["structural"]*structural +
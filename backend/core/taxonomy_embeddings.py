@@ -0,0 +1,145 @@
+# backend/core/taxonomy_embeddings.py
+"""
+Precomputed embeddings for the skills taxonomy and semantic anchors.
+
+build_taxonomy_embeddings.py writes one artifact per model tag at image build
+time: a float32 .npy matrix of normalized vectors plus a JSON manifest with
+the term list. At runtime the matrix is opened with mmap, and keyword code
+looks vectors up here instead of calling model.encode for known terms.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_ARTIFACT_VERSION = 1
+TAXONOMY_ARTIFACT_DIR = os.getenv(
+    "HIRESCOPE_TAXONOMY_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts", "taxonomy"),
+)
+
+
+def taxonomy_terms() -> List[str]:
+    """Every taxonomy term and anchor the keyword code compares against"""
+    from core.keyword_match import (
+        TECHNICAL_KEYWORDS, KEEP_TECH_TERMS, TECHNICAL_PATTERNS, COMPOUND_TERMS, TECH_ANCHORS
+    )
+    terms = set(TECHNICAL_KEYWORDS) | set(KEEP_TECH_TERMS) | set(TECHNICAL_PATTERNS)
+    terms |= set(COMPOUND_TERMS) | set(TECH_ANCHORS)
+    return sorted(terms)
+
+
+def _terms_digest(terms: Sequence[str]) -> str:
+    return hashlib.sha256("\n".join(terms).encode("utf-8")).hexdigest()
+
+
+def _artifact_paths(directory: str, tag: str):
+    safe_tag = "".join(c if c.isalnum() or c in "-_.@" else "_" for c in tag)
+    base = os.path.join(directory, safe_tag)
+    return base + ".npy", base + ".json"
+
+
+def build_artifact(model_name: str, directory: str = TAXONOMY_ARTIFACT_DIR) -> str:
+    """Embed every taxonomy term with a model and write the versioned artifact"""
+    from core.embedding_store import get_model, embed_texts, model_tag
+
+    terms = taxonomy_terms()
+    vectors = embed_texts(terms, model=get_model(model_name))
+    tag = model_tag(model_name)
+    npy_path, json_path = _artifact_paths(directory, tag)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(npy_path, vectors.astype(np.float32))
+    with open(json_path, "w") as f:
+        json.dump({
+            "version": TAXONOMY_ARTIFACT_VERSION,
+            "model_tag": tag,
+            "dim": int(vectors.shape[1]),
+            "count": len(terms),
+            "terms_sha256": _terms_digest(terms),
+            "terms": terms,
+        }, f)
+    return npy_path
+
+
+class TaxonomyEmbeddings:
+    """Read-only, mmap-backed term -> vector table for one model tag"""
+
+    def __init__(self, vectors: np.ndarray, terms: List[str], tag: str):
+        self.vectors = vectors
+        self.tag = tag
+        self.index: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+
+    @classmethod
+    def load(cls, tag: str, directory: str = TAXONOMY_ARTIFACT_DIR) -> Optional["TaxonomyEmbeddings"]:
+        npy_path, json_path = _artifact_paths(directory, tag)
+        try:
+            with open(json_path) as f:
+                manifest = json.load(f)
+            vectors = np.load(npy_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        terms = manifest.get("terms", [])
+        if (manifest.get("version") != TAXONOMY_ARTIFACT_VERSION
+                or manifest.get("model_tag") != tag
+                or manifest.get("terms_sha256") != _terms_digest(taxonomy_terms())
+                or vectors.shape != (len(terms), manifest.get("dim"))):
+            logger.warning(f"⚠️ Taxonomy artifact for '{tag}' is stale, ignoring it (rebuild with build_taxonomy_embeddings.py)")
+            return None
+        return cls(vectors, terms, tag)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.index
+
+    def get(self, term: str) -> Optional[np.ndarray]:
+        row = self.index.get(term)
+        return None if row is None else np.asarray(self.vectors[row], dtype=np.float32)
+
+
+_artifacts: Dict[str, Optional[TaxonomyEmbeddings]] = {}
+_artifacts_lock = threading.Lock()
+
+def get_taxonomy_embeddings(model_name: str) -> Optional[TaxonomyEmbeddings]:
+    """Load (once) the artifact matching a model; None if it is missing or stale"""
+    from core.embedding_store import model_tag
+
+    tag = model_tag(model_name)
+    if tag not in _artifacts:
+        with _artifacts_lock:
+            if tag not in _artifacts:
+                artifact = TaxonomyEmbeddings.load(tag)
+                if artifact is not None:
+                    logger.info(f"✅ Taxonomy embeddings loaded for '{tag}' ({len(artifact.index)} terms)")
+                _artifacts[tag] = artifact
+    return _artifacts[tag]
+
+
+def embed_terms(terms: Sequence[str], model, model_name: str) -> np.ndarray:
+    """
+    Normalized vectors for terms: taxonomy terms come from the artifact,
+    anything else goes through embed_texts (and its cache) in one batch.
+    """
+    from core.embedding_store import embed_texts
+
+    terms = list(terms)
+    artifact = get_taxonomy_embeddings(model_name)
+    if artifact is None:
+        return embed_texts(terms, model=model)
+
+    vectors = [artifact.get(term) for term in terms]
+    missing = [i for i, vec in enumerate(vectors) if vec is None]
+    if missing:
+        encoded = embed_texts([terms[i] for i in missing], model=model)
+        for i, vec in zip(missing, encoded):
+            vectors[i] = vec
+    if not vectors:
+        return np.zeros((0, artifact.vectors.shape[1]), dtype=np.float32)
+    return np.stack(vectors).astype(np.float32)
@@ -0,0 +1,181 @@
+# backend/core/warmup.py
+"""
+Startup warmup of everything a first request would otherwise load.
+
+The app's lifespan hook starts the warmup on a background thread, so the
+server accepts connections immediately, and /api/ready reports 503 until
+every required component is loaded. serve.py runs the same warmup
+synchronously in its master before forking; the forked workers inherit the
+finished state and only load what the master skipped.
+
+Components, per model tier where it applies:
+  cache_snapshot hot cache entries saved by the previous run (utils.cache_snapshot)
+  spacy          spaCy pipelines used by preprocessing and keyword matching
+  model:<tier>   the tier's embedding model (required)
+  taxonomy:<tier> mmap'd taxonomy/anchor embeddings
+  rag:<tier>     RAG knowledge-base index
+Only models are required for readiness: everything else has a fallback,
+so its failure is reported but does not hold the server back.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TIERS = [t for t in os.getenv("HIRESCOPE_PRELOAD_TIERS", "accurate,fast").split(",") if t]
+
+
+def _restore_cache_snapshot():
+    from utils.cache_snapshot import restore_cache_snapshot
+    restore_cache_snapshot()
+
+
+def _load_spacy():
+    from core.preprocess import get_nlp
+    from core.keyword_match import get_stopwords
+    get_stopwords()
+    if get_nlp() is None:
+        raise RuntimeError("spaCy model 'en_core_web_sm' is not installed; using regex fallbacks")
+
+
+def _load_model(tier: str):
+    from core.model_tiers import get_tier_model
+    get_tier_model(tier)
+
+
+def _load_taxonomy(tier: str):
+    from core.model_tiers import get_tier
+    from core.taxonomy_embeddings import get_taxonomy_embeddings
+    if get_taxonomy_embeddings(get_tier(tier).model_name) is None:
+        raise RuntimeError("artifact missing or stale; terms will be encoded on demand")
+
+
+def _load_rag(tier: str):
+    from core.rag_engine import get_rag_engine
+    get_rag_engine(tier)
+
+
+class _Component:
+    __slots__ = ("name", "load", "required", "state", "seconds", "error")
+
+    def __init__(self, name: str, load: Callable[[], Any], required: bool):
+        self.name = name
+        self.load = load
+        self.required = required
+        self.state = "pending"
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        info = {"state": self.state, "required": self.required}
+        if self.seconds is not None:
+            info["seconds"] = round(self.seconds, 3)
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class Warmup:
+    """Loads components once, records per-component state and timing"""
+
+    def __init__(self, tiers: Sequence[str] = ()):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self.components: List[_Component] = [
+            _Component("cache_snapshot", _restore_cache_snapshot, required=False),
+            _Component("spacy", _load_spacy, required=False),
+        ]
+        for tier in tiers:
+            self.components += [
+                _Component(f"model:{tier}", lambda t=tier: _load_model(t), required=True),
+                _Component(f"taxonomy:{tier}", lambda t=tier: _load_taxonomy(t), required=False),
+                _Component(f"rag:{tier}", lambda t=tier: _load_rag(t), required=False),
+            ]
+
+    def run(self, before_fork: bool = False):
+        """
+        Load every component not loaded yet, in order. With before_fork,
+        skip anything that would leave threads the forked children can't use.
+        """
+        self._started_at = self._started_at or time.time()
+        for component in self.components:
+            if component.state == "ready":
+                continue
+            if before_fork and not self._fork_safe(component):
+                component.state = "pending"
+                continue
+            component.state = "loading"
+            start = time.perf_counter()
+            try:
+                component.load()
+                component.state = "ready"
+            except Exception as e:
+                component.state = "failed"
+                component.error = str(e)
+                log = logger.error if component.required else logger.warning
+                log(f"⚠️ Warmup of {component.name} failed: {e}")
+            component.seconds = time.perf_counter() - start
+            if before_fork and component.name.startswith("model:"):
+                # An OpenMP pool started by inference here (RAG index) would be
+                # unusable in the forked workers; they apply the real budget
+                import torch
+                torch.set_num_threads(1)
+        if not before_fork:
+            self._finished_at = time.time()
+            logger.info(f"✅ Warmup finished in {self._finished_at - self._started_at:.1f}s (ready={self.ready})")
+
+    @staticmethod
+    def _fork_safe(component: _Component) -> bool:
+        from core.embedding_backends import EMBEDDING_BACKEND
+        from utils.cache import CACHE_BACKEND
+        if component.name == "cache_snapshot":
+            # Restoring reads namespace versions, which opens the SQLite file;
+            # its handles must not cross fork(), so each worker restores its own
+            return CACHE_BACKEND != "disk"
+        # onnxruntime sessions start their thread pools when created
+        needs_model = component.name.startswith(("model:", "rag:"))
+        return not needs_model or EMBEDDING_BACKEND == "torch"
+
+    def start(self) -> threading.Thread:
+        """Run the warmup on a background thread (once per process)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+                self._thread.start()
+            return self._thread
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and all(c.state == "ready" for c in self.components if c.required)
+
+    @property
+    def finished(self) -> bool:
+        return self._finished_at is not None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "finished": self.finished,
+            "seconds": round((self._finished_at or time.time()) - self._started_at, 3) if self._started_at else None,
+            "components": {c.name: c.as_dict() for c in self.components},
+        }
+
+
+# Singleton instance
+_warmup = None
+_warmup_lock = threading.Lock()
+
+def get_warmup() -> Warmup:
+    """Get or create the process-wide warmup"""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = Warmup(WARMUP_TIERS)
+    return _warmup
@@ -6,9 +6,12 @@ import time
 from sentence_transformers import SentenceTransformer
 import spacy
 
-def download_sentence_transformer():
+# Models behind the "accurate" and "fast" tiers (core/model_tiers.py); this
+# script runs before the app code is copied in, so the list is repeated here
+MODEL_NAMES = ['all-mpnet-base-v2', 'all-MiniLM-L6-v2']
+
+def download_sentence_transformer(model_name='all-mpnet-base-v2'):
     """Download sentence-transformers model with retry logic"""
-    model_name = 'all-mpnet-base-v2'
     max_attempts = 3
     
     for attempt in range(max_attempts):
@@ -62,8 +65,9 @@ if __name__ == "__main__":
     print("DOWNLOADING AND VERIFYING MODELS")
     print("="*60 + "\n")
     
-    # Download sentence-transformers model
-    download_sentence_transformer()
+    # Download sentence-transformers models (bundled later by build_model_bundles.py)
+    for model_name in MODEL_NAMES:
+        download_sentence_transformer(model_name)
     
     # Verify spaCy model
     verify_spacy()
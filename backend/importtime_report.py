@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Import-time breakdown for the backend, from `python -X importtime`.
+
+Imports a module (the app by default) in a fresh interpreter and prints
+the slowest modules by cumulative time, the top-level packages by their
+own time, and any heavy library that got imported eagerly.
+
+Usage:
+    python importtime_report.py                # breakdown for `import app`
+    python importtime_report.py --top 40 --module routes.resume_routes
+    python importtime_report.py --json > importtime.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Libraries that must only load on first use of the stage that needs them
+HEAVY_MODULES = (
+    "torch", "sentence_transformers", "transformers", "spacy", "thinc",
+    "onnxruntime", "PyPDF2", "pdf2image", "pytesseract", "weasyprint", "docx",
+)
+
+def measure(module: str = "app") -> dict:
+    """Import `module` in a fresh interpreter and parse its -X importtime output"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000.0,
+            "cumulative_ms": int(cumulative_us) / 1000.0,
+        })
+
+    target = next((m for m in reversed(modules) if m["module"] == module), None)
+    by_package = defaultdict(float)
+    for m in modules:
+        by_package[m["module"].split(".")[0]] += m["self_ms"]
+    imported = {m["module"] for m in modules}
+    return {
+        "module": module,
+        "total_ms": target["cumulative_ms"] if target else sum(m["self_ms"] for m in modules),
+        "modules": modules,
+        "packages": dict(sorted(by_package.items(), key=lambda kv: -kv[1])),
+        "heavy_imported": [name for name in HEAVY_MODULES if name in imported],
+    }
+
+def print_report(report: dict, top: int):
+    print(f"\n{'='*60}")
+    print(f"import {report['module']}: {report['total_ms']:.0f}ms")
+    print(f"{'='*60}\n")
+
+    print(f"Slowest modules (cumulative):")
+    for m in sorted(report["modules"], key=lambda m: -m["cumulative_ms"])[:top]:
+        print(f"  {m['cumulative_ms']:9.1f}ms  {'  ' * m['depth']}{m['module']}")
+
+    print(f"\nTop-level packages (self time):")
+    for name, ms in list(report["packages"].items())[:top]:
+        print(f"  {ms:9.1f}ms  {name}")
+
+    if report["heavy_imported"]:
+        print(f"\n⚠️ Heavy libraries imported eagerly: {', '.join(report['heavy_imported'])}")
+    else:
+        print(f"\n✅ No heavy libraries imported at import time")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.module)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.top)
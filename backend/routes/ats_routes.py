@@ -7,20 +7,21 @@ from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import Dict, Any, List, Tuple
 import re
 from core.parsing import extract_text_from_file
-from sentence_transformers import util
+from core.model_tiers import get_tier_model, tier_info
+from core.embedding_store import embed_texts
+from utils.response_cache import (
+    acache_response, aget_cached_response, file_type_of, json_response, response_cache_key
+)
 
 router = APIRouter(prefix="/api/ats", tags=["ats-simulator"])
 
-# Load embedding model lazily
-_embedding_model = None
+
+# Section detection only needs coarse similarity, so it runs on the fast tier
+ATS_MODEL_TIER = "fast"
 
 def get_embedding_model():
-    """Lazy load the embedding model"""
-    global _embedding_model
-    if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-        _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-    return _embedding_model
+    """Get the small embedding model from the shared model registry"""
+    return get_tier_model(ATS_MODEL_TIER)
 
 
 def extract_urls_intelligently(text: str) -> Tuple[List[str], List[str]]:
@@ -141,15 +142,15 @@ def detect_sections_intelligently(text: str) -> List[str]:
             ]
             
             # Generate embeddings
-            reference_embeddings = model.encode(reference_sections, convert_to_tensor=True)
-            candidate_embeddings = model.encode(potential_sections, convert_to_tensor=True)
+            reference_embeddings = embed_texts(reference_sections, model=model)
+            candidate_embeddings = embed_texts(potential_sections, model=model)
             
             # Filter candidates based on similarity to reference sections
             valid_sections = []
             for i, candidate in enumerate(potential_sections):
                 # Calculate similarity to all reference sections
-                similarities = util.pytorch_cos_sim(candidate_embeddings[i], reference_embeddings)[0]
-                max_similarity = similarities.max().item()
+                similarities = reference_embeddings @ candidate_embeddings[i]
+                max_similarity = float(similarities.max())
                 
                 # If similar enough to any reference section (threshold 0.4), it's likely a section
                 if max_similarity > 0.4:
@@ -181,7 +182,7 @@ def deduplicate_sections_with_llm(found_headers: List[str]) -> List[str]:
         model = get_embedding_model()
         
         # Generate embeddings for all headers
-        embeddings = model.encode(found_headers, convert_to_tensor=True)
+        embeddings = embed_texts(found_headers, model=model)
         
         # Find similar pairs using cosine similarity
         unique_sections = []
@@ -198,7 +199,7 @@ def deduplicate_sections_with_llm(found_headers: List[str]) -> List[str]:
             # Find similar headers (similarity > 0.7 means they're likely the same section)
             for j in range(i + 1, len(found_headers)):
                 if j not in used_indices:
-                    similarity = util.pytorch_cos_sim(embeddings[i], embeddings[j]).item()
+                    similarity = float(embeddings[i] @ embeddings[j])
                     if similarity > 0.7:  # High similarity threshold
                         used_indices.add(j)
         
@@ -335,6 +336,7 @@ def analyze_ats_parsing(text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         "original_text": text,
         "ats_parsed_text": ats_text,
         "metadata": metadata,
+        "model_tier": tier_info(ATS_MODEL_TIER),
         "statistics": {
             "total_characters": len(text),
             "total_lines": len([l for l in lines if l.strip()]),  # Only non-empty lines
@@ -358,6 +360,13 @@ async def simulate_ats_parsing(file: UploadFile = File(...)):
     try:
         # Read file content
         content = await file.read()
+
+        cache_key = response_cache_key(
+            "ats", content=content, tier=ATS_MODEL_TIER, file_type=file_type_of(file.filename)
+        )
+        cached = await aget_cached_response("ats", cache_key)
+        if cached is not None:
+            return json_response(cached, hit=True)
         
         # Extract text
         text, pages, metadata = extract_text_from_file(content, file.filename)
@@ -370,8 +379,9 @@ async def simulate_ats_parsing(file: UploadFile = File(...)):
         
         # Analyze ATS compatibility
         analysis = analyze_ats_parsing(text, metadata)
+        await acache_response("ats", cache_key, analysis)
         
-        return analysis
+        return json_response(analysis, hit=False)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
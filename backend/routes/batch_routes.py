@@ -3,22 +3,113 @@ Batch Resume Analysis Routes
 Analyze multiple resumes against a single job description
 """
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from typing import List
+from typing import List, Union
 import io
+import logging
+import os
+import numpy as np
 from core.parsing import extract_text_from_file
-from core.preprocess import segment_text
 from core.keyword_match import compute_keyword_match
 from core.scoring import compute_scores_with_role
 from core.skill_detection import detect_all_skill_levels, get_skill_level_summary
-from core.embedding_store import embed_texts, get_model
+from core.embedding_store import embed_document
+from core.model_tiers import get_tier, get_tier_model, tier_info
+from core.analysis_engine import get_analysis_engine
+from core.pipeline import PIPELINE_VERSION
+from utils.cache import cached_batch_async
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/batch", tags=["batch"])
 
 
+BATCH_SCORE_TTL = int(os.getenv("HIRESCOPE_BATCH_SCORE_TTL", "86400"))
+
+
+def _score_resume(resume_text: str, job_description: str, model_tier, model) -> dict:
+    """Scores and summary of one resume against the job description"""
+    # Perform keyword matching
+    keyword_stats = compute_keyword_match(resume_text, job_description, tier=model_tier.name)
+    
+    # Detect skills
+    skill_levels = {}
+    if keyword_stats.get('matches'):
+        try:
+            skill_levels = detect_all_skill_levels(resume_text, keyword_stats['matches'])
+        except:
+            pass
+    
+    # Compute embeddings for scoring
+    doc_embedding = embed_document(resume_text, model=model)
+    
+    # Calculate scores (no sentence embeddings for batch: semantic
+    # score falls back to the whole-document embedding)
+    scores = compute_scores_with_role(
+        resume_text,
+        keyword_stats,
+        doc_embedding,
+        np.zeros((0, len(doc_embedding)), dtype=np.float32),
+        job_description,
+        tier=model_tier
+    )
+    
+    overall_score = scores.get('overall', 0)
+    
+    # Determine rank indicator
+    if overall_score >= 85:
+        rank = "Excellent"
+        rank_color = "green"
+    elif overall_score >= 70:
+        rank = "Good"
+        rank_color = "blue"
+    elif overall_score >= 50:
+        rank = "Fair"
+        rank_color = "yellow"
+    else:
+        rank = "Needs Improvement"
+        rank_color = "red"
+    
+    return {
+        "overall_score": round(overall_score, 1),
+        "keyword_score": round(scores.get('keyword_relevance', 0), 1),
+        "skills_count": len(skill_levels),
+        "word_count": len(resume_text.split()),
+        "rank": rank,
+        "rank_color": rank_color,
+        "top_skills": list(skill_levels.keys())[:5] if skill_levels else [],
+    }
+
+
+def score_batch(resume_texts: List[str], job_description: str, tier: str) -> List[Union[dict, Exception]]:
+    """_score_resume for each text, or the exception where it failed"""
+    model_tier = get_tier(tier)
+    model = get_tier_model(model_tier)  # Load embedding model once
+    scored = []
+    for resume_text in resume_texts:
+        try:
+            scored.append(_score_resume(resume_text, job_description, model_tier, model))
+        except Exception as e:
+            logger.warning(f"⚠️ Batch scoring failed for one resume: {e}")
+            scored.append(e)
+    return scored
+
+
+@cached_batch_async(prefix="batch_scores", ttl=BATCH_SCORE_TTL)
+async def score_resumes(resume_texts: List[str], job_description: str, tier: str, pipeline_version: int) -> List[Union[dict, Exception]]:
+    """
+    score_batch, cached per resume (failures aren't cached), so only the
+    resumes not seen with this job description, tier and pipeline version
+    are scored. The scoring is CPU-bound and runs on the analysis engine,
+    off the event loop.
+    """
+    return await get_analysis_engine().run(score_batch, resume_texts, job_description, tier)
+
+
 @router.post("/analyze")
 async def batch_analyze_resumes(
     resume_files: List[UploadFile] = File(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    tier: str = Form("accurate")
 ):
     """
     Analyze multiple resumes against a single job description
@@ -40,8 +131,13 @@ async def batch_analyze_resumes(
                 detail="Job description is required and must be at least 50 characters"
             )
         
+        try:
+            model_tier = get_tier(tier)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         results = []
-        model = get_model()  # Load embedding model once
+        extracted = []  # (position, filename, text) of the readable resumes
         
         for idx, file in enumerate(resume_files):
             try:
@@ -50,81 +146,44 @@ async def batch_analyze_resumes(
                 
                 # Extract text
                 resume_text, _, _ = extract_text_from_file(file_content, file.filename)
-                
-                if not resume_text or len(resume_text.strip()) < 100:
-                    results.append({
-                        "filename": file.filename,
-                        "status": "error",
-                        "error": "Could not extract text from resume or resume is too short",
-                        "overall_score": 0
-                    })
-                    continue
-                
-                # Perform keyword matching
-                keyword_stats = compute_keyword_match(resume_text, job_description)
-                
-                # Detect skills
-                skill_levels = {}
-                if keyword_stats.get('matches'):
-                    try:
-                        skill_levels = detect_all_skill_levels(resume_text, keyword_stats['matches'])
-                    except:
-                        pass
-                
-                # Compute embeddings for scoring
-                doc_embedding = embed_texts([resume_text], model=model)[0]
-                
-                # Calculate scores
-                sections = segment_text(resume_text)
-                scores = compute_scores_with_role(
-                    resume_text,
-                    keyword_stats,
-                    doc_embedding,
-                    [],  # We don't need sentence embeddings for batch
-                    sections,
-                    job_description
-                )
-                
-                overall_score = scores.get('overall', 0)
-                
-                # Extract key metrics
-                word_count = len(resume_text.split())
-                skills_count = len(skill_levels)
-                
-                # Determine rank indicator
-                if overall_score >= 85:
-                    rank = "Excellent"
-                    rank_color = "green"
-                elif overall_score >= 70:
-                    rank = "Good"
-                    rank_color = "blue"
-                elif overall_score >= 50:
-                    rank = "Fair"
-                    rank_color = "yellow"
-                else:
-                    rank = "Needs Improvement"
-                    rank_color = "red"
-                
+            except Exception as e:
                 results.append({
                     "filename": file.filename,
-                    "status": "success",
-                    "overall_score": round(overall_score, 1),
-                    "keyword_score": round(scores.get('keyword_relevance', 0), 1),
-                    "skills_count": skills_count,
-                    "word_count": word_count,
-                    "rank": rank,
-                    "rank_color": rank_color,
-                    "top_skills": list(skill_levels.keys())[:5] if skill_levels else [],
-                    "analysis_id": f"batch_{idx+1}"
+                    "status": "error",
+                    "error": f"Error processing file: {str(e)}",
+                    "overall_score": 0
                 })
+                continue
                 
-            except Exception as e:
+            if not resume_text or len(resume_text.strip()) < 100:
                 results.append({
                     "filename": file.filename,
                     "status": "error",
-                    "error": f"Error processing file: {str(e)}",
+                    "error": "Could not extract text from resume or resume is too short",
+                    "overall_score": 0
+                })
+                continue
+            extracted.append((idx, file.filename, resume_text))
+        
+        # One cache round trip for the whole batch; only unseen resumes are scored
+        scored = await score_resumes(
+            [text for _, _, text in extracted], job_description, model_tier.name, PIPELINE_VERSION
+        )
+        for (idx, filename, _), score in zip(extracted, scored):
+            if isinstance(score, Exception):
+                results.append({
+                    "filename": filename,
+                    "status": "error",
+                    "error": f"Error processing file: {str(score)}",
                     "overall_score": 0
                 })
+                continue
+            results.append({
+                "filename": filename,
+                "status": "success",
+                **score,
+                "analysis_id": f"batch_{idx+1}"
+            })
         
         # Sort results by overall score (highest first)
         results.sort(key=lambda x: x.get("overall_score", 0), reverse=True)
@@ -164,6 +223,7 @@ async def batch_analyze_resumes(
             "job_description_preview": job_description[:200] + "..." if len(job_description) > 200 else job_description,
             "results": results,
             "statistics": stats,
+            "model_tier": tier_info(model_tier),
             "message": f"Analyzed {len(successful_analyses)} resumes successfully"
         }
         
@@ -8,9 +8,6 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict
 import io
 
-# Import core modules
-from core.docx_generator import TemplateGenerator
-
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
 
@@ -92,6 +89,7 @@ async def generate_template(request: TemplateRequest):
     """
     try:
         # Initialize generator
+        from core.docx_generator import TemplateGenerator  # python-docx loads on first use
         generator = TemplateGenerator()
         
         # Generate DOCX
@@ -193,6 +191,7 @@ async def health_check():
 async def list_templates():
     """Get list of available template types with details"""
     try:
+        from core.docx_generator import TemplateGenerator  # python-docx loads on first use
         generator = TemplateGenerator()
         templates = generator.get_available_templates()
         return {
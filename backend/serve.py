@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Pre-fork server entry point.
+
+`uvicorn --workers N` starts N independent interpreters, and each one loads
+its own copy of the embedding models, spaCy, the taxonomy artifact and the
+RAG knowledge base. This script loads all of that once in a master process,
+freezes the GC so the collector never writes to those objects' pages, and
+then forks the workers. Copy-on-write keeps the read-only weights shared.
+
+The master never serves requests. It supervises the workers, restarts any
+that die, and periodically logs each worker's unique vs shared memory.
+
+Usage:
+    python serve.py --workers 4 --port 7860
+    python serve.py --workers 2 --memory-check 20   # print a memory report and exit
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("serve")
+
+DEFAULT_WORKERS = int(os.getenv("HIRESCOPE_WORKERS", "1"))
+DEFAULT_PRELOAD_TIERS = os.getenv("HIRESCOPE_PRELOAD_TIERS", "accurate,fast")
+MEMORY_REPORT_INTERVAL = float(os.getenv("HIRESCOPE_MEMORY_REPORT_INTERVAL", "300"))
+GRACEFUL_TIMEOUT = float(os.getenv("HIRESCOPE_GRACEFUL_TIMEOUT", "30"))
+# A worker that dies sooner than this after starting is restarted with a delay
+MIN_WORKER_LIFETIME = 5.0
+
+
+def load_app(target: str):
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "app")
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args):
+    """Body of a forked worker: serve the shared socket until told to stop"""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks the workers and keeps the configured number of them running"""
+
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> (slot, started_at)
+        self.stopping = False
+
+    def spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.args)
+            except BaseException:
+                logger.exception(f"Worker {slot} failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = (slot, time.monotonic())
+        logger.info(f"🔄 Started worker {slot} (pid {pid})")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot, started_at = self.workers.pop(pid, (None, time.monotonic()))
+            if slot is None or self.stopping:
+                continue
+            logger.error(f"❌ Worker {slot} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            if time.monotonic() - started_at < MIN_WORKER_LIFETIME:
+                time.sleep(1.0)
+            self.spawn(slot)
+
+    def report_memory(self) -> dict:
+        from utils.process_memory import memory_report, process_memory, format_bytes
+
+        report = memory_report(sorted(self.workers))
+        report["master"] = process_memory()
+        for proc in report["processes"]:
+            logger.info(
+                f"📊 Worker pid {proc['pid']}: rss={format_bytes(proc['rss_bytes'])} "
+                f"unique={format_bytes(proc.get('unique_bytes', 0))} "
+                f"shared={format_bytes(proc.get('shared_bytes', 0))} pss={format_bytes(proc['pss_bytes'])}"
+            )
+        logger.info(
+            f"📊 {len(report['processes'])} workers: total pss={format_bytes(report['total_pss_bytes'])}, "
+            f"unique={format_bytes(report['total_unique_bytes'])}, rss={format_bytes(report['total_rss_bytes'])}"
+        )
+        return report
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+
+        started = time.monotonic()
+        interval = self.args.memory_check or MEMORY_REPORT_INTERVAL
+        next_report = started + (interval if interval > 0 else float("inf"))
+        while not self.stopping:
+            self._reap()
+            if time.monotonic() >= next_report:
+                report = self.report_memory()
+                if self.args.memory_check:
+                    print(json.dumps(report, indent=2))
+                    self.stopping = True
+                    break
+                next_report = time.monotonic() + interval
+            time.sleep(0.5)
+        self.shutdown()
+        return 0
+
+    def shutdown(self):
+        logger.info(f"Stopping {len(self.workers)} worker(s)...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"⚠️ Worker pid {pid} did not stop in time, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-fork HireScope server")
+    parser.add_argument("--app", default="app:app", help="ASGI app as module:attribute")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--preload-tiers", default=DEFAULT_PRELOAD_TIERS,
+                        help="Comma-separated model tiers to warm up before forking")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--memory-check", type=float, default=0,
+                        help="Print a per-worker memory report after this many seconds, then exit")
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+
+    # The thread budget divides the cores between this many processes
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    os.environ["HIRESCOPE_PRELOAD_TIERS"] = args.preload_tiers
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    sock = bind_socket(args.host, args.port)
+    app = load_app(args.app)
+    # The same warmup the app's lifespan runs; workers inherit the loaded state
+    # and only warm whatever wasn't safe to load before fork
+    from core.warmup import get_warmup
+    get_warmup().run(before_fork=True)
+
+    # Move everything loaded so far out of the collector's reach, so GC passes
+    # in the workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"✅ Master ready ({gc.get_freeze_count()} objects frozen), forking {args.workers} worker(s) on {args.host}:{args.port}")
+
+    return Supervisor(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
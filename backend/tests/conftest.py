@@ -0,0 +1,17 @@
+# backend/tests/conftest.py
+import pytest
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic/time.time"""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,60 @@
+# backend/tests/test_analysis_engine.py
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from core.analysis_engine import AnalysisEngine, AnalysisWorkerCrashed
+
+
+def _describe(blob, array, label="x"):
+    return {"pid": os.getpid(), "blob": len(blob), "sum": float(array.sum()), "label": label}
+
+
+def _crash():
+    os._exit(3)
+
+
+@pytest.fixture
+def engine():
+    engine = AnalysisEngine(workers=1, max_tasks_per_child=1, start_method="spawn")
+    yield engine
+    engine.shutdown()
+
+
+def test_thread_mode_runs_in_process():
+    engine = AnalysisEngine(workers=0)
+    result = asyncio.run(engine.run(_describe, b"abc", np.ones(4), label="t"))
+    assert result == {"pid": os.getpid(), "blob": 3, "sum": 4.0, "label": "t"}
+    assert engine.stats()["completed"] == 1
+
+
+def test_large_args_use_shared_memory_and_workers_recycle(engine):
+    blob = os.urandom(512 * 1024)
+    array = np.arange(100_000, dtype=np.float64)
+
+    async def run_twice():
+        first = await engine.run(_describe, blob, array)
+        second = await engine.run(_describe, b"small", np.ones(2))
+        return first, second
+
+    first, second = asyncio.run(run_twice())
+
+    assert first["blob"] == len(blob) and first["sum"] == float(array.sum())
+    assert first["pid"] != os.getpid()
+    assert second["pid"] != first["pid"]  # max_tasks_per_child=1 replaced the worker
+    assert engine.stats()["shared_memory_bytes"] == len(blob) + array.nbytes
+
+
+def test_worker_crash_fails_only_that_job(engine):
+    async def crash_then_recover():
+        with pytest.raises(AnalysisWorkerCrashed):
+            await engine.run(_crash)
+        return await engine.run(_describe, b"ok", np.ones(1))
+
+    result = asyncio.run(crash_then_recover())
+
+    assert result["blob"] == 2
+    stats = engine.stats()
+    assert stats["crashes"] == 1 and stats["pool_starts"] == 2 and stats["failed"] == 1
@@ -12,3 +12,7 @@ def test_health():
 def test_upload_no_file():
     resp = client.post("/api/resume/upload", data={"job_description":"data scientist"})
     assert resp.status_code == 422  # file required
+
+def test_cors_exposes_the_cache_header():
+    resp = client.get("/", headers={"Origin": "https://hirescope-frontend.vercel.app"})
+    assert "X-HireScope-Cache" in resp.headers["access-control-expose-headers"]
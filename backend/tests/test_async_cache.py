@@ -0,0 +1,106 @@
+# backend/tests/test_async_cache.py
+import asyncio
+
+from utils import async_cache, cache
+from utils.cache_codec import encode
+from utils.memory_cache import MemoryCache
+
+
+class _FakeAsyncRedis:
+    """Just the asyncio commands the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+        self.calls = []
+
+    def pipeline(self, transaction=False):
+        return _FakeAsyncPipeline(self)
+
+    async def set(self, key, value, ex=None):
+        self.calls.append("set")
+        self.data[key] = value
+
+    async def hgetall(self, name):
+        self.calls.append("hgetall")
+        return {k.encode(): str(v).encode() for k, v in self.hashes.get(name, {}).items()}
+
+
+class _FakeAsyncPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.ops.append(lambda: self.redis.data.get(key))
+
+    def pttl(self, key):
+        self.ops.append(lambda: 30000 if key in self.redis.data else -2)
+
+    async def execute(self):
+        self.redis.calls.append("pipeline")
+        return [op() for op in self.ops]
+
+
+def _blocking_client():
+    raise AssertionError("synchronous Redis call on the event loop")
+
+
+def _setup(monkeypatch):
+    redis = _FakeAsyncRedis()
+    l1 = MemoryCache(max_bytes=1 << 20)
+    monkeypatch.setattr(async_cache, "get_async_redis_client", lambda: redis)
+    monkeypatch.setattr(cache, "get_redis_client", _blocking_client)
+    monkeypatch.setattr(async_cache, "get_memory_cache", lambda: l1)
+    monkeypatch.setattr(cache, "get_memory_cache", lambda: l1)
+    monkeypatch.setattr(cache, "CACHE_WRITE_BEHIND", False)
+    monkeypatch.setattr(cache, "_versions", {})
+    monkeypatch.setattr(cache, "_versions_loaded_at", None)
+    return redis, l1
+
+
+def test_cached_async_uses_only_the_async_client(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    calls = []
+
+    @cache.cached_async(prefix="test_async", ttl=60)
+    async def keywords(jd):
+        calls.append(jd)
+        return ["python"]
+
+    async def scenario():
+        assert await keywords("jd") == ["python"]
+        await asyncio.gather(*async_cache._refresh_tasks)
+        # Served from Redis once L1 forgets it
+        l1.clear()
+        assert await keywords("jd") == ["python"]
+
+    asyncio.run(scenario())
+
+    assert calls == ["jd"]
+    assert "set" in redis.calls and "hgetall" in redis.calls
+    assert l1.get(keywords.cache_key("jd")) == ["python"]
+
+
+def test_namespace_versions_refresh_in_the_background_on_the_loop(monkeypatch):
+    redis, _ = _setup(monkeypatch)
+    redis.hashes[cache.NAMESPACE_VERSIONS_KEY] = {"response": 3}
+
+    async def scenario():
+        # No blocking fetch: the key is built from the versions known so far
+        first = cache.namespaced_key("response", "x")
+        await asyncio.gather(*async_cache._refresh_tasks)
+        return first, cache.namespaced_key("response", "x")
+
+    first, refreshed = asyncio.run(scenario())
+
+    assert first == "response:v0.0:x"
+    assert refreshed == "response:v0.3:x"
+    redis.data[refreshed] = encode({"score": 1})
+    assert asyncio.run(async_cache.aget_from_cache(refreshed)) == {"score": 1}
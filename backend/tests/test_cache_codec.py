@@ -0,0 +1,85 @@
+# backend/tests/test_cache_codec.py
+import pickle
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from core.skill_detection import SkillLevel
+from core.weighted_matching import RequirementType, WeightedKeyword
+from utils import cache_codec
+from utils.cache_codec import CodecError, decode, encode, hash_arguments
+
+
+@dataclass
+class _Unregistered:
+    name: str
+
+
+def test_round_trips_arrays_dataclasses_and_containers():
+    value = {
+        "keywords": [WeightedKeyword("python", RequirementType.REQUIRED, 2.0, "requirements")],
+        "levels": {"python": SkillLevel("python", "expert", years=5, confidence=np.float32(0.5))},
+        "embeddings": np.arange(12, dtype=np.float32).reshape(3, 4),
+        "pair": (1, "a"),
+        "tags": {"x", "y"},
+        "score": np.float64(0.75),
+        "text": "résumé " * 2000,  # large enough to be compressed
+    }
+
+    payload = encode(value)
+    result = decode(payload)
+
+    assert payload[:3] == b"HSC"
+    if cache_codec.ZSTD_AVAILABLE and cache_codec.MSGPACK_AVAILABLE:
+        assert payload[5] == cache_codec.COMPRESSION_ZSTD
+    assert result["keywords"] == value["keywords"]
+    assert result["levels"]["python"] == SkillLevel("python", "expert", 5, 0.5)
+    np.testing.assert_array_equal(result["embeddings"], value["embeddings"])
+    assert result["embeddings"].dtype == np.float32
+    assert result["pair"] == (1, "a") and result["tags"] == {"x", "y"}
+    assert result["score"] == 0.75 and result["text"] == value["text"]
+
+
+@pytest.mark.skipif(not cache_codec.MSGPACK_AVAILABLE, reason="msgpack not installed")
+def test_refuses_untrusted_payloads_and_unregistered_types():
+    with pytest.raises(CodecError):
+        decode(pickle.dumps(["legacy"]))
+    with pytest.raises(CodecError):
+        decode(cache_codec.MAGIC + bytes((cache_codec.FORMAT_VERSION, cache_codec.CODEC_PICKLE, 0)) + pickle.dumps(1))
+    with pytest.raises(CodecError):
+        encode(_Unregistered("x"))
+
+
+def test_argument_hash_is_stable_and_type_aware():
+    jd = "Senior Python engineer. " * 10000
+    array = np.ones((2, 3), dtype=np.float32)
+
+    assert hash_arguments((jd,), {"tier": "fast"}) == hash_arguments((jd,), {"tier": "fast"})
+    assert hash_arguments((jd,), {"tier": "fast"}) != hash_arguments((jd,), {"tier": "accurate"})
+    assert hash_arguments((1,), {}) != hash_arguments(("1",), {}) != hash_arguments((True,), {})
+    assert hash_arguments((array,), {}) == hash_arguments((array.copy(),), {})
+    assert hash_arguments((array,), {}) != hash_arguments((array.astype(np.float64),), {})
+
+
+@pytest.mark.skipif(not cache_codec.ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_concurrent_round_trips_of_compressed_values():
+    values = [{"text": f"worker {i} " + "résumé line " * 3000, "n": i} for i in range(8)]
+    assert encode(values[0])[len(cache_codec.MAGIC) + 2] == cache_codec.COMPRESSION_ZSTD
+    errors = []
+
+    def round_trip(value):
+        try:
+            for _ in range(200):
+                assert decode(encode(value)) == value
+        except Exception as e:  # surfaced below; a crash would take the interpreter down
+            errors.append(e)
+
+    threads = [threading.Thread(target=round_trip, args=(value,)) for value in values]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
@@ -0,0 +1,92 @@
+# backend/tests/test_cache_snapshot.py
+import random
+
+from utils import cache, cache_snapshot
+from utils.hot_keys import HotKeys, SpaceSaving
+from utils.memory_cache import MemoryCache
+
+
+def test_space_saving_keeps_the_heavy_hitters():
+    rng = random.Random(0)
+    counter = SpaceSaving(capacity=20)
+    stream = [f"hot{i}" for i in range(5) for _ in range(200)] + [f"cold{i}" for i in range(2000)]
+    rng.shuffle(stream)
+    for item in stream:
+        counter.offer(item)
+
+    assert len(counter) == 20
+    top = counter.top(5)
+    assert sorted(item for item, _, _ in top) == [f"hot{i}" for i in range(5)]
+    # Counts never underestimate, and count - error never overestimates
+    assert all(count >= 200 >= count - error for _, count, error in top)
+
+
+def _setup(monkeypatch):
+    l1 = MemoryCache(max_bytes=1 << 20)
+    hot_keys = HotKeys(capacity=16)
+    for module in (cache, cache_snapshot):
+        monkeypatch.setattr(module, "get_memory_cache", lambda: l1)
+        monkeypatch.setattr(module, "get_hot_keys", lambda: hot_keys)
+    monkeypatch.setattr(cache, "REDIS_ENABLED", False)
+    monkeypatch.setattr(cache, "get_redis_client", lambda: None)
+    monkeypatch.setattr(cache, "get_disk_tier", lambda: None)
+    monkeypatch.setattr(cache, "_versions", {})
+    monkeypatch.setattr(cache, "_versions_loaded_at", None)
+    return l1, hot_keys
+
+
+def test_snapshot_restores_hot_entries_and_drops_stale_ones(tmp_path, monkeypatch):
+    l1, hot_keys = _setup(monkeypatch)
+    path = str(tmp_path / "hot.snapshot")
+    keys = {name: cache.generate_cache_key(name, "jd") for name in ("jd_keywords", "analysis", "cold")}
+    cache.set_in_cache(keys["jd_keywords"], ["python"], ttl=600)
+    cache.set_in_cache(keys["analysis"], {"score": 1}, ttl=600)
+    cache.set_in_cache(keys["cold"], random.Random(1).randbytes(5000), ttl=600)
+    cache.get_from_cache(keys["cold"])  # too large for the cap below
+    for _ in range(3):
+        cache.get_from_cache(keys["jd_keywords"])
+        cache.get_from_cache(keys["analysis"])
+
+    saved = cache_snapshot.save_cache_snapshot(path, max_bytes=1000)
+    assert saved["saved"] == 2 and saved["skipped"] == 1
+
+    # Restart: empty L1, and the analysis namespace was cleared meanwhile
+    l1.clear()
+    cache.clear_cache("analysis")
+    restored = cache_snapshot.restore_cache_snapshot(path)
+
+    assert restored["restored"] == 1 and restored["stale"] == 1
+    assert l1.peek(keys["jd_keywords"])[0] == ["python"]
+    assert 590 < l1.peek(keys["jd_keywords"])[1] <= 600
+
+
+def test_snapshot_from_another_pipeline_version_is_discarded(tmp_path, monkeypatch):
+    l1, _ = _setup(monkeypatch)
+    path = str(tmp_path / "hot.snapshot")
+    key = cache.generate_cache_key("jd_keywords", "jd")
+    cache.set_in_cache(key, ["python"], ttl=600)
+    cache.get_from_cache(key)
+    cache_snapshot.save_cache_snapshot(path)
+
+    l1.clear()
+    monkeypatch.setattr(cache_snapshot, "_pipeline_version", lambda: 999)
+    assert cache_snapshot.restore_cache_snapshot(path) == {"restored": 0, "reason": "pipeline version changed"}
+    assert len(l1) == 0
+
+
+def test_restored_entries_expire_from_l1_soon_with_a_shared_tier(tmp_path, monkeypatch):
+    l1, hot_keys = _setup(monkeypatch)
+    path = str(tmp_path / "hot.snapshot")
+    key = cache.generate_cache_key("jd_keywords", "jd")
+    cache.set_in_cache(key, ["python"], ttl=3600)
+    cache.get_from_cache(key)
+    cache_snapshot.save_cache_snapshot(path)
+
+    # Other workers may rewrite the key in Redis: keep the local copy brief
+    l1.clear()
+    monkeypatch.setattr(cache, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache, "_redis_unavailable", False)
+    monkeypatch.setattr(cache, "_redis_client", object())
+    assert cache_snapshot.restore_cache_snapshot(path)["restored"] == 1
+    assert l1.peek(key)[1] <= cache.L1_TTL
+
@@ -0,0 +1,347 @@
+# backend/tests/test_cache_tiers.py
+import json
+import threading
+import time
+from dataclasses import dataclass
+
+from utils import cache
+from utils.cache_codec import encode
+from utils.circuit_breaker import CircuitBreaker
+from utils.memory_cache import MemoryCache
+
+_get_redis_client = cache.get_redis_client
+
+
+class _FakeRedis:
+    """Just the commands the two-tier cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+        self.gets = 0
+        self.round_trips = 0
+        self.published = []
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+
+    def hincrby(self, name, field, amount):
+        fields = self.hashes.setdefault(name, {})
+        fields[field] = fields.get(field, 0) + amount
+        return fields[field]
+
+    def hgetall(self, name):
+        return {k.encode(): str(v).encode() for k, v in self.hashes.get(name, {}).items()}
+
+    def hkeys(self, name):
+        return [k.encode() for k in self.hashes.get(name, {})]
+
+    def scan_iter(self, match, count):
+        return [k.encode() for k in list(self.data) if k.startswith(match.rstrip("*"))]
+
+    def unlink(self, *keys):
+        return sum(self.data.pop(k.decode(), None) is not None for k in keys)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def get(self, key):
+        self.ops.append(lambda: self.redis.get(key))
+
+    def mget(self, keys):
+        self.ops.append(lambda: [self.redis.data.get(key) for key in keys])
+
+    def pttl(self, key):
+        self.ops.append(lambda: 30000 if key in self.redis.data else -2)
+
+    def setex(self, key, ttl, value):
+        self.ops.append(lambda: self.redis.setex(key, ttl, value))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        return [op() for op in self.ops]
+
+
+def _setup(monkeypatch):
+    redis = _FakeRedis()
+    l1 = MemoryCache(max_bytes=1 << 20)
+    monkeypatch.setattr(cache, "get_redis_client", lambda: redis)
+    monkeypatch.setattr(cache, "get_memory_cache", lambda: l1)
+    monkeypatch.setattr(cache, "CACHE_WRITE_BEHIND", False)
+    monkeypatch.setattr(cache, "_versions", {})
+    monkeypatch.setattr(cache, "_versions_loaded_at", None)
+    return redis, l1
+
+
+def _half_open_breaker(monkeypatch, redis):
+    """Hand out the fake client through the real get_redis_client, behind a half-open breaker"""
+    clock = [0.0]
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, clock=lambda: clock[0])
+    breaker.record_failure("refused")
+    clock[0] = 5
+    monkeypatch.setattr(cache, "get_redis_client", _get_redis_client)
+    monkeypatch.setattr(cache, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache, "_redis_unavailable", False)
+    monkeypatch.setattr(cache, "_redis_client", redis)
+    monkeypatch.setattr(cache, "_redis_connected", True)
+    monkeypatch.setattr(cache, "_redis_breaker", breaker)
+    assert breaker.state == "half_open"
+    return breaker
+
+
+@dataclass
+class _Unregistered:
+    n: int
+
+
+def test_l2_hits_are_served_from_l1_afterwards(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    redis.data["jd_keywords:abc"] = encode(["python", "sql"])
+
+    assert cache.get_from_cache("jd_keywords:abc") == ["python", "sql"]
+    assert cache.get_from_cache("jd_keywords:abc") == ["python", "sql"]
+
+    assert redis.gets == 1
+    assert l1.stats()["hits"] == 1
+
+
+def test_clear_bumps_the_namespace_version_and_broadcasts_it(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    old_key = cache.generate_cache_key("jd_keywords", "python")
+    other_key = cache.generate_cache_key("analysis", "python")
+    cache.set_in_cache(old_key, ["python"], ttl=600)
+    cache.set_in_cache(other_key, {"score": 1}, ttl=600)
+
+    result = cache.clear_cache("jd_keywords")
+
+    assert result == {"namespace": "jd_keywords", "version": 1, "shared": True, "l1_entries_dropped": 1,
+                      "keys_invalidated": None}
+    channel, message = redis.published[-1]
+    assert channel == cache.INVALIDATION_CHANNEL
+    assert json.loads(message)["pattern"] == "jd_keywords" and json.loads(message)["version"] == 1
+    # Old entries are unreachable at once; other namespaces are untouched
+    assert cache.generate_cache_key("jd_keywords", "python") != old_key
+    assert cache.get_from_cache(cache.generate_cache_key("jd_keywords", "python")) is None
+    assert cache.get_from_cache(other_key) == {"score": 1}
+    assert cache.get_reclaimer().wait(timeout=2)
+    assert old_key not in redis.data and other_key in redis.data
+
+    # Waiting reports how many old keys the reclaim run for this namespace removed
+    cache.set_in_cache(cache.generate_cache_key("jd_keywords", "python"), ["python"], ttl=600)
+    assert cache.clear_cache("jd_keywords", wait=2)["keys_invalidated"] == 1
+
+    # The same broadcast arriving from another worker moves it to the new version
+    cache._handle_invalidation(json.dumps({"pattern": None, "version": 4, "origin": "other:1"}).encode())
+    assert len(l1) == 0
+    assert cache.namespace_version("analysis") == "v4.0"
+
+
+def test_reclaimer_unlinks_only_superseded_keys(monkeypatch):
+    redis, _ = _setup(monkeypatch)
+    monkeypatch.setattr(cache, "RECLAIM_SCAN_COUNT", 2)
+    monkeypatch.setattr(cache, "RECLAIM_PAUSE_SECONDS", 0)
+    stale = [cache.generate_cache_key("jd_keywords", i) for i in range(5)]
+    for key in stale:
+        redis.data[key] = b"old"
+    redis.hincrby(cache.NAMESPACE_VERSIONS_KEY, "jd_keywords", 1)
+    cache._load_versions(force=True)
+    current = cache.generate_cache_key("jd_keywords", 0)
+    redis.data[current] = b"new"
+    redis.data["analysis:v0.0:x"] = b"other namespace"
+
+    reclaimer = cache._Reclaimer()
+    reclaimer._reclaim("jd_keywords")
+
+    assert sorted(redis.data) == sorted([current, "analysis:v0.0:x"])
+    assert reclaimer.stats()["last_run"]["reclaimed"] == 5
+    assert reclaimer.stats()["last_run"]["scanned"] == 6
+
+
+def test_distributed_fill_waits_for_the_worker_holding_the_lock(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    monkeypatch.setattr(cache, "FILL_LOCK_POLL_SECONDS", 0.01)
+    calls = []
+
+    @cache.cached(prefix="test_lock", ttl=60, distributed=True)
+    def keywords(jd):
+        calls.append(jd)
+        return ["computed here"]
+
+    key = keywords.cache_key("python")
+    redis.data[f"lock:{key}"] = "other-worker"
+
+    def other_worker_finishes():
+        time.sleep(0.05)
+        redis.data[key] = encode(["from other worker"])
+        del redis.data[f"lock:{key}"]
+
+    threading.Thread(target=other_worker_finishes).start()
+    assert keywords("python") == ["from other worker"]
+    assert calls == []
+
+    # Lock free and nothing cached: this worker takes the lock, computes and releases it
+    assert keywords("go") == ["computed here"]
+    assert calls == ["go"] and not [k for k in redis.data if k.startswith("lock:")]
+
+
+def test_stale_entries_are_served_while_one_refresh_runs(monkeypatch):
+    redis, _ = _setup(monkeypatch)
+    release = threading.Event()
+    calls = []
+
+    @cache.cached(prefix="test_swr", ttl=60, soft_ttl=0.05)
+    def keywords(jd):
+        calls.append(jd)
+        if len(calls) > 1:
+            release.wait(2)
+        return [f"v{len(calls)}"]
+
+    assert keywords("jd") == ["v1"]
+    time.sleep(0.06)
+    # Stale: every caller gets the old value at once; one refresh is queued
+    assert [keywords("jd") for _ in range(5)] == [["v1"]] * 5
+    release.set()
+    deadline = time.monotonic() + 2
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert calls == ["jd", "jd"]
+    assert keywords("jd") == ["v2"]
+    counts = cache.get_cache_stats()["stale_while_revalidate"]["prefixes"]["test_swr"]
+    assert counts["stale_served"] == 5 and counts["refreshes"] == 1
+    assert not [k for k in redis.data if k.startswith("lock:")]
+
+
+def test_a_refresh_done_by_another_worker_is_not_repeated(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    calls = []
+
+    @cache.cached(prefix="test_swr_shared", ttl=60, soft_ttl=30)
+    def keywords(jd):
+        calls.append(jd)
+        return ["recomputed"]
+
+    key = keywords.cache_key("jd")
+    # This worker's L1 still has the stale copy; another worker already
+    # stored a fresh one in Redis
+    l1.set(key, cache.SwrEntry(["old"], fresh_until=time.time() - 1))
+    redis.data[key] = encode(cache.SwrEntry(["fresh"], fresh_until=time.time() + 30))
+
+    assert keywords("jd") == ["old"]
+    deadline = time.monotonic() + 2
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert calls == []
+    assert keywords("jd") == ["fresh"]
+    counts = cache.get_cache_stats()["stale_while_revalidate"]["prefixes"]["test_swr_shared"]
+    assert counts["refreshes_skipped"] == 1 and counts["refreshes"] == 0
+
+
+def test_cached_batch_computes_only_the_missing_items(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    calls = []
+
+    @cache.cached_batch(prefix="test_batch", ttl=60)
+    def lengths(texts, scale=1):
+        calls.append(list(texts))
+        return [len(text) * scale for text in texts]
+
+    assert lengths(["a", "bb"], scale=2) == [2, 4]
+    # Other workers see the entries: only L1 is forgotten here
+    l1.clear()
+    redis.round_trips = 0
+    assert lengths(["bb", "ccc", "a", "ccc"], scale=2) == [4, 6, 2, 6]
+
+    # The repeated and cached items were not recomputed
+    assert calls == [["a", "bb"], ["ccc"]]
+    # One pipelined read for the three distinct keys, one pipelined write
+    assert redis.round_trips == 2
+    assert cache.get_many([lengths.cache_key("ccc", scale=2)]) == {lengths.cache_key("ccc", scale=2): 6}
+
+
+def test_cached_batch_does_not_cache_per_item_failures(monkeypatch):
+    _setup(monkeypatch)
+    calls = []
+
+    @cache.cached_batch(prefix="test_batch_errors", ttl=60)
+    def parse(texts):
+        calls.append(list(texts))
+        return [ValueError(f"bad {text}") if text.startswith("x") else text.upper() for text in texts]
+
+    first = parse(["ok", "xy"])
+    assert first[0] == "OK" and str(first[1]) == "bad xy"
+    # The failure is retried, the success is served from the cache
+    parse(["ok", "xy"])
+    assert calls == [["ok", "xy"], ["xy"]]
+
+
+def test_a_codec_error_leaves_the_half_open_probe_unclaimed(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    breaker = _half_open_breaker(monkeypatch, redis)
+
+    cache.set_in_cache("test_codec:k", _Unregistered(1), ttl=60)
+
+    assert l1.get("test_codec:k") == _Unregistered(1)
+    assert redis.data == {}
+    # No Redis call was made, so the next real call is still the probe
+    assert breaker.allow()
+
+
+def test_write_behind_leaves_the_probe_to_the_writer_thread(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    breaker = _half_open_breaker(monkeypatch, redis)
+    monkeypatch.setattr(cache, "CACHE_WRITE_BEHIND", True)
+    monkeypatch.setattr(cache, "_write_behind", None)
+
+    cache.set_in_cache("test_wb:a", {"n": 1}, ttl=60)
+    cache.set_many({"test_wb:b": 2, "test_wb:c": 3}, ttl=60)
+
+    assert cache.flush_cache_writes(timeout=2)
+    assert redis.data == {"test_wb:a": encode({"n": 1}), "test_wb:b": encode(2), "test_wb:c": encode(3)}
+    # The writer's pipeline was the probe, and it succeeded
+    assert breaker.state == "closed"
+    assert l1.get("test_wb:a") == {"n": 1}
+
+
+def test_invalidations_from_other_workers_clear_l1(monkeypatch):
+    redis, l1 = _setup(monkeypatch)
+    l1.set("test_inv:v0.0:a", 1)
+    l1.set("test_other:v0.0:b", 2)
+
+    cache._publish_invalidation(redis, "test_inv", 4)
+    channel, message = redis.published[-1]
+    assert channel == cache.INVALIDATION_CHANNEL
+
+    # A worker ignores its own messages: it already cleared its L1
+    cache._handle_invalidation(message)
+    assert l1.get("test_inv:v0.0:a") == 1
+
+    cache._handle_invalidation(json.dumps({**json.loads(message), "origin": "another-worker"}))
+    assert l1.get("test_inv:v0.0:a") is None
+    assert l1.get("test_other:v0.0:b") == 2
+    assert cache._versions["test_inv"] == 4
+
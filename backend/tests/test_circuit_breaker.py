@@ -0,0 +1,52 @@
+# backend/tests/test_circuit_breaker.py
+from utils.circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_threshold_and_half_opens_for_a_single_probe(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=5, clock=clock)
+
+    breaker.record_failure("refused")
+    assert breaker.allow()
+    breaker.record_failure("refused")
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 5
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+    assert breaker.stats()["rejected_calls"] == 2
+
+
+def test_failed_probes_back_off_exponentially_up_to_the_maximum(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, max_reset_timeout=15, clock=clock)
+    breaker.record_failure()
+
+    for expected_delay in (10, 15, 15):
+        clock.now += breaker.stats()["retry_delay_seconds"]
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.stats()["retry_delay_seconds"] == expected_delay
+        clock.now += expected_delay - 0.1
+        assert breaker.state == "open"
+        clock.now -= expected_delay - 0.1
+
+    breaker.record_success()
+    assert breaker.stats()["retry_delay_seconds"] == 5
+
+
+def test_an_abandoned_probe_is_given_up_after_the_reset_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 5
+    assert breaker.allow()  # this probe never reports back
+    clock.now = 9.9
+    assert not breaker.allow()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
@@ -0,0 +1,72 @@
+# backend/tests/test_disk_cache.py
+import multiprocessing
+
+from utils import cache
+from utils.disk_cache import DiskCache
+from utils.memory_cache import MemoryCache
+
+
+def test_ttl_expiry_and_compaction_to_the_byte_budget(tmp_path, clock):
+    clock.now = 1000.0
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=10_000, clock=clock)
+    disk.set_raw("short", b"x", ttl=10)
+    clock.now += 11
+    assert disk.get_raw("short") is None
+    assert disk.expire() == 1
+
+    for i in range(9):
+        clock.now += 100
+        disk.set_raw(f"k{i}", b"v" * 1000, ttl=3600)
+    # Reading k0 makes it recent, so it survives the next compaction
+    clock.now += 100
+    assert disk.get_raw("k0")[0] == b"v" * 1000
+    clock.now += 100
+    disk.set_raw("k9", b"v" * 1000, ttl=3600)
+
+    stats = disk.stats()
+    assert stats["bytes"] <= 9_000 and stats["evictions"] == 2
+    assert disk.get_raw("k0") is not None and disk.get_raw("k1") is None and disk.get_raw("k2") is None
+
+
+def _writer(path, worker):
+    disk = DiskCache(path, max_bytes=1 << 24)
+    for i in range(50):
+        disk.set_raw(f"w{worker}:{i}", str(i).encode(), ttl=60)
+    disk.incr_version("shared")
+    disk.close()
+
+
+def test_worker_processes_share_the_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path, max_bytes=1 << 24).close()
+    workers = [multiprocessing.get_context("fork").Process(target=_writer, args=(path, w)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(30)
+        assert p.exitcode == 0
+
+    disk = DiskCache(path, max_bytes=1 << 24)
+    assert len(disk) == 200 and disk.stats()["bytes"] == sum(len(f"w{w}:{i}") + len(str(i)) for w in range(4) for i in range(50))
+    assert disk.versions() == {"shared": 4}
+
+
+def test_disk_backend_behind_l1(tmp_path, monkeypatch):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=1 << 24)
+    l1 = MemoryCache(max_bytes=1 << 20)
+    monkeypatch.setattr(cache, "CACHE_BACKEND", "disk")
+    monkeypatch.setattr(cache, "get_disk_cache", lambda: disk)
+    monkeypatch.setattr(cache, "get_redis_client", lambda: None)
+    monkeypatch.setattr(cache, "get_memory_cache", lambda: l1)
+    monkeypatch.setattr(cache, "_versions", {})
+    monkeypatch.setattr(cache, "_versions_loaded_at", None)
+
+    key = cache.generate_cache_key("jd_keywords", "python")
+    cache.set_in_cache(key, ["python"], ttl=600)
+    l1.clear()  # as seen by another worker
+    assert cache.get_from_cache(key) == ["python"]
+
+    result = cache.clear_cache("jd_keywords")
+    assert result["version"] == 1 and result["disk_entries_deleted"] == 1 == result["keys_invalidated"]
+    assert disk.versions() == {"jd_keywords": 1} and len(disk) == 0
+    assert cache.get_cache_stats()["backend"] == "disk"
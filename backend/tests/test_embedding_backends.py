@@ -0,0 +1,33 @@
+# backend/tests/test_embedding_backends.py
+import json
+import os
+import threading
+import time
+
+from core import embedding_backends
+
+
+def test_concurrent_exports_of_one_model_run_once(tmp_path, monkeypatch):
+    directory = str(tmp_path / "model")
+    calls = []
+
+    def fake_export(name, directory, quantize):
+        calls.append(name)
+        time.sleep(0.1)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "encoder.json"), "w") as f:
+            json.dump({"export_version": embedding_backends.ONNX_EXPORT_VERSION, "quantized": quantize}, f)
+        return directory
+
+    monkeypatch.setattr(embedding_backends, "_export_onnx", fake_export)
+    threads = [
+        threading.Thread(target=embedding_backends.export_onnx, args=("model", directory)) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The others waited for the first export and reused it
+    assert calls == ["model"]
+    assert embedding_backends._usable_export(directory, quantize=True)
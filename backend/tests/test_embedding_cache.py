@@ -0,0 +1,75 @@
+# backend/tests/test_embedding_cache.py
+import numpy as np
+
+from core.embedding_cache import EmbeddingCache
+
+
+def _vectors(n, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def test_hits_survive_reopen(tmp_path):
+    texts = ["python developer", "led a team of five", "docker"]
+    vecs = _vectors(3)
+    cache = EmbeddingCache(str(tmp_path), "model-a", dtype="float32")
+    cache.put_many(texts, vecs)
+
+    reopened = EmbeddingCache(str(tmp_path), "model-a", dtype="float32")
+    found, missing = reopened.get_many(texts + ["unseen"])
+    assert missing == [3]
+    np.testing.assert_allclose(np.stack(found[:3]), vecs)
+
+
+def test_other_model_tag_never_shares_vectors(tmp_path):
+    EmbeddingCache(str(tmp_path), "model-a").put_many(["docker"], _vectors(1))
+    _, missing = EmbeddingCache(str(tmp_path), "model-b").get_many(["docker"])
+    assert missing == [0]
+
+
+def test_lru_eviction_and_compaction(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model-a", max_entries=4)
+    texts = [f"sentence {i}" for i in range(2000)]
+    vecs = _vectors(len(texts))
+    for i in range(0, len(texts), 100):
+        cache.put_many(texts[i:i + 100], vecs[i:i + 100])
+
+    stats = cache.stats()
+    assert stats["entries"] == 4
+    assert stats["compactions"] >= 1
+    found, missing = cache.get_many(texts[-4:])
+    assert missing == []
+    np.testing.assert_allclose(np.stack(found), vecs[-4:], atol=1e-3)
+
+
+def test_compaction_by_another_instance_is_picked_up(tmp_path):
+    first = EmbeddingCache(str(tmp_path), "model-a", dtype="float32", max_entries=4)
+    texts = ["alpha", "beta", "gamma"]
+    vecs = _vectors(3)
+    first.put_many(texts, vecs)
+
+    # Another worker on the same directory appends enough to compact the files
+    other = EmbeddingCache(str(tmp_path), "model-a", dtype="float32", max_entries=4)
+    fillers = [f"filler {i}" for i in range(1100)]
+    other.put_many(fillers, _vectors(len(fillers), seed=1))
+    assert other.stats()["compactions"] == 1
+
+    found, missing = first.get_many(texts)
+    # The rows moved: misses, never another text's vector
+    assert missing == [0, 1, 2]
+    assert found == [None, None, None]
+
+
+def test_cold_start_keeps_another_instances_new_files(tmp_path):
+    first = EmbeddingCache(str(tmp_path), "model-a", dtype="float32")
+    second = EmbeddingCache(str(tmp_path), "model-a", dtype="float32")
+    vecs = _vectors(2)
+    # Both started with no files; the second must not wipe the first's
+    first.put_many(["alpha"], vecs[:1])
+    second.put_many(["beta"], vecs[1:])
+
+    found, missing = EmbeddingCache(str(tmp_path), "model-a", dtype="float32").get_many(["alpha", "beta"])
+    assert missing == []
+    np.testing.assert_allclose(np.stack(found), vecs)
+
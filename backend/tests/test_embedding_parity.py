@@ -0,0 +1,64 @@
+# backend/tests/test_embedding_parity.py
+"""
+Cosine drift of the ONNX / int8 backends against PyTorch on a fixed corpus.
+
+Needs sentence-transformers, onnx and onnxruntime plus the model weights;
+skipped when any of them is unavailable.
+"""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from core.embedding_backends import export_onnx, OnnxSentenceEncoder
+from core.model_registry import FAST_MODEL
+
+PARITY_MODEL = os.getenv("HIRESCOPE_PARITY_MODEL", FAST_MODEL)
+
+CORPUS = [
+    "Senior Software Engineer with 6 years of Python and Django experience",
+    "Led a team of five engineers to migrate services to Kubernetes on AWS",
+    "Reduced API latency by 40% through caching and query optimization",
+    "Bachelor of Science in Computer Science, State University, 2018",
+    "machine learning",
+    "docker",
+    "Built ETL pipelines in Apache Airflow and Spark processing 2TB daily",
+    "Excellent communication skills and passion for mentoring junior developers",
+    "PostgreSQL, MongoDB, Redis",
+    "Designed REST and GraphQL APIs consumed by 3 mobile apps",
+    "python java programming",
+    "We're looking for an experienced ML Engineer with TensorFlow/PyTorch expertise",
+]
+
+
+def _normalized(vecs):
+    vecs = np.asarray(vecs, dtype=np.float32)
+    return vecs / (np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-10)
+
+
+@pytest.fixture(scope="module")
+def export_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("onnx") / PARITY_MODEL.replace("/", "__"))
+    try:
+        export_onnx(PARITY_MODEL, directory, quantize=True)
+    except Exception as e:  # model download / export unavailable in this environment
+        pytest.skip(f"ONNX export unavailable: {e}")
+    return directory
+
+
+@pytest.fixture(scope="module")
+def torch_vectors():
+    from sentence_transformers import SentenceTransformer
+    return _normalized(SentenceTransformer(PARITY_MODEL).encode(CORPUS, convert_to_numpy=True))
+
+
+@pytest.mark.parametrize("quantized,min_cosine", [(False, 0.999), (True, 0.97)])
+def test_onnx_matches_torch(export_dir, torch_vectors, quantized, min_cosine):
+    encoder = OnnxSentenceEncoder(export_dir, quantized=quantized)
+    onnx_vectors = _normalized(encoder.encode(CORPUS))
+    cosines = np.sum(onnx_vectors * torch_vectors, axis=1)
+    assert cosines.min() >= min_cosine, f"max drift {1 - cosines.min():.4f}"
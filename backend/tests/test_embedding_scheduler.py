@@ -0,0 +1,48 @@
+# backend/tests/test_embedding_scheduler.py
+import threading
+
+import numpy as np
+
+from core.embedding_scheduler import EmbeddingScheduler
+
+
+def test_concurrent_requests_are_coalesced_and_fanned_out():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    scheduler = EmbeddingScheduler(encode, name="fake", max_batch_size=64, max_wait_ms=50)
+    requests = [[f"text {i}" * (i + 1), "x"] for i in range(6)]
+    results = [None] * len(requests)
+
+    def worker(i):
+        results[i] = scheduler.encode(requests[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(requests))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for texts, rows in zip(requests, results):
+        assert rows[:, 0].tolist() == [len(t) for t in texts]
+    assert len(calls) < len(requests)
+    stats = scheduler.stats()
+    assert stats["requests"] == 6 and stats["texts"] == 12
+
+
+def test_batches_are_bounded_and_length_sorted():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    scheduler = EmbeddingScheduler(encode, name="fake", max_batch_size=4, max_wait_ms=0)
+    texts = ["a" * n for n in (9, 1, 7, 3, 5, 2, 8, 4, 6, 10)]
+    assert scheduler.encode(texts).shape == (10, 2)
+    assert all(len(batch) <= 4 for batch in calls)
+    lengths = [len(t) for batch in calls for t in batch]
+    assert lengths == sorted(lengths)
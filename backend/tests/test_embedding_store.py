@@ -0,0 +1,95 @@
+# backend/tests/test_embedding_store.py
+import zlib
+
+import numpy as np
+
+from core import embedding_store
+from core.embedding_store import chunk_text, embed_document, embed_sentences, embed_texts, pool_embeddings
+
+
+class _FakeModel:
+    """Deterministic vector per text; records what it was asked to encode"""
+
+    max_seq_length = 128
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.dim) for text in texts
+        ]).astype(np.float32)
+
+
+def _unit_rows(n, dim=8):
+    vecs = np.random.default_rng(0).standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _normalized(vec):
+    return vec / np.linalg.norm(vec)
+
+
+def test_pooling_is_the_normalized_mean_of_the_sentence_vectors():
+    vecs = _unit_rows(5)
+    expected = _normalized(vecs.mean(axis=0))
+    np.testing.assert_allclose(pool_embeddings(vecs), expected, atol=1e-6)
+
+    # Sentences of equal length weigh the same, and no model call is made
+    model = _FakeModel()
+    sentences = [f"sentence number {i} here" for i in range(5)]
+    doc = embed_document("ignored", sentences=sentences, sentence_embeddings=vecs, model=model)
+    np.testing.assert_allclose(doc, expected, atol=1e-6)
+    assert model.encoded == []
+
+
+def test_long_text_is_chunked_rather_than_truncated():
+    model = _FakeModel()
+    words = [f"w{i}" for i in range(300)]
+    chunks = chunk_text(" ".join(words), model)
+
+    limit = int(model.max_seq_length * 0.75)
+    assert len(chunks) > 1
+    assert all(len(chunk.split()) <= limit for chunk in chunks)
+    # Every word, including the last ones, reaches the model
+    assert set(" ".join(chunks).split()) == set(words)
+
+    doc = embed_document(" ".join(words), model=model, strategy="chunked")
+    assert model.encoded == chunks
+    assert np.isclose(np.linalg.norm(doc), 1.0)
+
+
+def test_without_sentence_embeddings_pooled_falls_back_to_chunks():
+    model = _FakeModel()
+    text = "Senior engineer with Python and Kubernetes experience. " * 40
+    chunks = chunk_text(text, model)
+
+    for missing in (None, np.zeros((0, model.dim), dtype=np.float32)):
+        model.encoded = []
+        doc = embed_document(text, sentence_embeddings=missing, model=model, strategy="pooled")
+        assert model.encoded == chunks
+
+    encoded = model.encode(chunks)
+    encoded = encoded / np.linalg.norm(encoded, axis=1, keepdims=True)
+    # Chunks weigh by word count, capped like sentences
+    weights = [min(len(chunk.split()), 64) for chunk in chunks]
+    np.testing.assert_allclose(doc, pool_embeddings(encoded, weights), atol=1e-6)
+
+
+def test_sequence_cap_applies_to_sentences_only(monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_MAX_SEQ_LENGTH", 64)
+    model = _FakeModel()
+    long_text = " ".join(f"w{i}" for i in range(100))
+
+    embed_sentences(["short sentence", long_text], model=model)
+    assert model.encoded == ["short sentence", " ".join(long_text.split()[:48])]
+
+    # Job descriptions and full-text encodes keep the model's whole window
+    model.encoded = []
+    embed_texts([long_text], model=model)
+    assert model.encoded == [long_text]
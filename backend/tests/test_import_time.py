@@ -0,0 +1,22 @@
+# backend/tests/test_import_time.py
+"""
+Startup budget: `import app` must stay cheap and must not pull in heavy libraries.
+
+HIRESCOPE_IMPORT_BUDGET_MS sets the time budget (default 3000ms, generous
+for slow CI machines; the heavy-library check is the strict one).
+"""
+import os
+
+from importtime_report import measure
+
+IMPORT_BUDGET_MS = float(os.getenv("HIRESCOPE_IMPORT_BUDGET_MS", "3000"))
+
+
+def test_app_import_is_within_budget_and_lazy():
+    report = measure("app")
+
+    assert report["heavy_imported"] == [], f"imported at app import: {report['heavy_imported']}"
+    assert report["total_ms"] <= IMPORT_BUDGET_MS, (
+        f"import app took {report['total_ms']:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms); "
+        "run importtime_report.py for the breakdown"
+    )
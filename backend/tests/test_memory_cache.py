@@ -0,0 +1,36 @@
+# backend/tests/test_memory_cache.py
+from utils.memory_cache import MemoryCache, entry_size
+
+
+def test_evicts_least_recently_used_entries_to_stay_within_the_byte_budget():
+    small = entry_size("a", "x" * 100)
+    cache = MemoryCache(max_bytes=3 * small, sweep_interval=1e9)
+    for key in "abc":
+        cache.set(key, "x" * 100)
+    cache.get("a")  # a is now the most recently used
+
+    cache.set("d", "x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert not cache.set("big", "x" * (4 * small))  # larger than the whole budget
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 1 and stats["rejected"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_ttl_expires_lazily_on_read_and_in_the_periodic_sweep(clock):
+    cache = MemoryCache(max_bytes=1 << 20, sweep_interval=10, clock=clock)
+    cache.set("short", 1, ttl=5)
+    cache.set("unread", 2, ttl=5)
+    cache.set("forever", 3)
+
+    clock.now = 6
+    assert cache.get("short") is None
+    assert len(cache) == 2  # "unread" is expired but not swept yet
+
+    clock.now = 11
+    cache.set("other", 4, ttl=60)  # triggers the sweep
+    assert len(cache) == 2 and cache.get("forever") == 3
+    assert cache.stats()["expirations"] == 2
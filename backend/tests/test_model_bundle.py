@@ -0,0 +1,45 @@
+# backend/tests/test_model_bundle.py
+"""
+Bundle round trip: build, load offline, compare embeddings.
+
+Needs sentence-transformers and the model weights; skipped without them.
+"""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from core.model_bundle import build_bundle, load_bundle, bundle_path
+from core.model_registry import FAST_MODEL, _load_sentence_transformer
+
+BUNDLE_MODEL = os.getenv("HIRESCOPE_PARITY_MODEL", FAST_MODEL)
+
+
+@pytest.fixture(scope="module")
+def hub_model():
+    try:
+        return _load_sentence_transformer(BUNDLE_MODEL, max_retries=1, use_bundle=False)
+    except Exception as e:
+        pytest.skip(f"model '{BUNDLE_MODEL}' unavailable: {e}")
+
+
+def test_bundle_loads_offline_and_matches(hub_model, tmp_path):
+    path = build_bundle(BUNDLE_MODEL, str(tmp_path))
+    assert path == bundle_path(BUNDLE_MODEL, str(tmp_path))
+    assert os.path.exists(os.path.join(path, "model.safetensors"))
+
+    bundled = load_bundle(BUNDLE_MODEL, str(tmp_path))
+
+    assert bundled is not None
+    sample = ["Led a team of five engineers to migrate services to Kubernetes"]
+    np.testing.assert_allclose(bundled.encode(sample), hub_model.encode(sample), atol=1e-5)
+
+
+def test_missing_or_mismatched_bundle_is_ignored(tmp_path):
+    assert load_bundle(BUNDLE_MODEL, str(tmp_path)) is None
+    os.makedirs(bundle_path("other-model", str(tmp_path)))
+    with open(os.path.join(bundle_path("other-model", str(tmp_path)), "bundle.json"), "w") as f:
+        f.write('{"version": 1, "model": "something-else", "dim": 8}')
+    assert load_bundle("other-model", str(tmp_path)) is None
@@ -0,0 +1,67 @@
+# backend/tests/test_model_registry.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.model_registry import ModelRegistry
+
+
+class _FakeModel:
+    def parameters(self):
+        return []
+
+    def buffers(self):
+        return []
+
+
+def _slow_loader(calls):
+    def loader(name):
+        calls.append(name)
+        time.sleep(0.05)
+        return _FakeModel()
+    return loader
+
+
+def test_concurrent_callers_share_one_load():
+    calls = []
+    registry = ModelRegistry(loader=_slow_loader(calls))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("m"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["m"]
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert registry.stats()["models"]["m"]["state"] == "loaded"
+
+
+def test_failed_load_is_retried_by_next_caller():
+    attempts = []
+
+    def flaky(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise RuntimeError("network down")
+        return _FakeModel()
+
+    registry = ModelRegistry(loader=flaky)
+    with pytest.raises(RuntimeError):
+        registry.get("m")
+    assert registry.stats()["models"]["m"]["state"] == "failed"
+    assert registry.get("m") is not None
+    assert len(attempts) == 2
+
+
+def test_peek_never_loads_and_async_get_waits():
+    calls = []
+    registry = ModelRegistry(loader=_slow_loader(calls))
+    assert registry.peek("m") is None
+    assert calls == []
+
+    model = asyncio.run(registry.get_async("m"))
+    assert registry.peek("m") is model
+    assert registry.name_of(model) == "m"
@@ -0,0 +1,44 @@
+# backend/tests/test_response_cache.py
+from fastapi.testclient import TestClient
+
+from app import app
+from routes import live_routes
+from utils import cache, response_cache
+from utils.memory_cache import MemoryCache
+
+RESUME = "Backend engineer with eight years of Python, FastAPI and PostgreSQL."
+
+
+def test_identical_requests_are_served_from_the_response_cache(monkeypatch):
+    l1 = MemoryCache(max_bytes=1 << 20)
+    monkeypatch.setattr(cache, "get_redis_client", lambda: None)
+    monkeypatch.setattr(cache, "get_memory_cache", lambda: l1)
+    calls = []
+
+    def fake_analyze_live(resume_text, job_description, tier):
+        calls.append((resume_text, job_description, tier))
+        return {"score": len(calls), "tier": tier}
+
+    monkeypatch.setattr(live_routes, "analyze_live", fake_analyze_live)
+    client = TestClient(app)
+
+    first = client.post("/api/live/live-analyze", data={"resume_text": RESUME, "job_description": "Python"})
+    again = client.post("/api/live/live-analyze", data={"resume_text": RESUME + "\n", "job_description": "Python "})
+    other_jd = client.post("/api/live/live-analyze", data={"resume_text": RESUME, "job_description": "Go"})
+
+    assert first.headers[response_cache.CACHE_HEADER] == "MISS"
+    assert again.headers[response_cache.CACHE_HEADER] == "HIT"
+    assert again.json() == first.json() == {"score": 1, "tier": "fast"}
+    assert other_jd.headers[response_cache.CACHE_HEADER] == "MISS"
+    assert len(calls) == 2
+
+
+def test_key_covers_endpoint_tier_file_type_and_pipeline_version(monkeypatch):
+    key = response_cache.response_cache_key("upload", content=b"%PDF", job_description="jd", tier="fast", file_type="pdf")
+
+    assert key.startswith("response:v")
+    assert f":upload:p{response_cache.PIPELINE_VERSION}:fast:pdf:" in key
+    assert key != response_cache.response_cache_key("upload", content=b"%PDF", job_description="jd", tier="accurate", file_type="pdf")
+    assert key != response_cache.response_cache_key("ats", content=b"%PDF", job_description="jd", tier="fast", file_type="pdf")
+    monkeypatch.setattr(response_cache, "PIPELINE_VERSION", response_cache.PIPELINE_VERSION + 1)
+    assert key != response_cache.response_cache_key("upload", content=b"%PDF", job_description="jd", tier="fast", file_type="pdf")
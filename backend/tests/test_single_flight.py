@@ -0,0 +1,65 @@
+# backend/tests/test_single_flight.py
+import asyncio
+import threading
+import time
+
+from utils import cache
+from utils.memory_cache import MemoryCache
+from utils.single_flight import get_single_flight_stats
+
+
+def _memory_only(monkeypatch):
+    monkeypatch.setattr(cache, "get_redis_client", lambda: None)
+    monkeypatch.setattr(cache, "get_memory_cache", lambda: MemoryCache(max_bytes=1 << 20))
+
+
+def test_concurrent_misses_run_the_function_once(monkeypatch):
+    _memory_only(monkeypatch)
+    calls = []
+    release = threading.Event()
+
+    @cache.cached(prefix="test_sf_threads", ttl=60)
+    def slow(jd):
+        calls.append(jd)
+        release.wait(5)
+        return [jd.upper()]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow("python"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    deadline = time.time() + 5
+    while get_single_flight_stats()["test_sf_threads"]["waiting"] < 7 and time.time() < deadline:
+        time.sleep(0.01)
+    assert get_single_flight_stats()["test_sf_threads"]["waiting"] == 7
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["python"]
+    assert results == [["PYTHON"]] * 8
+    assert get_single_flight_stats()["test_sf_threads"] == {"leaders": 1, "coalesced": 7, "in_flight": 0, "waiting": 0}
+
+
+def test_async_waiters_share_the_result_and_the_exception(monkeypatch):
+    _memory_only(monkeypatch)
+    calls = []
+
+    @cache.cached_async(prefix="test_sf_async", ttl=60)
+    async def analyze(text):
+        calls.append(text)
+        await asyncio.sleep(0.05)
+        if text == "bad":
+            raise ValueError("boom")
+        return {"text": text}
+
+    async def main():
+        good = await asyncio.gather(*(analyze("ok") for _ in range(5)))
+        bad = await asyncio.gather(*(analyze("bad") for _ in range(3)), return_exceptions=True)
+        return good, bad
+
+    good, bad = asyncio.run(main())
+
+    assert good == [{"text": "ok"}] * 5
+    assert all(isinstance(e, ValueError) for e in bad)
+    assert calls == ["ok", "bad"]
@@ -0,0 +1,41 @@
+# backend/tests/test_thread_budget.py
+from utils.thread_budget import compute_budget
+
+_VARS = ("HIRESCOPE_CPU_CORES", "WEB_CONCURRENCY", "HIRESCOPE_INFERENCE_THREADS", "OMP_NUM_THREADS",
+         "HIRESCOPE_OCR_WORKERS", "HIRESCOPE_OCR_THREADS", "HIRESCOPE_REQUEST_THREADS_PER_CORE",
+         "HIRESCOPE_MIN_REQUEST_THREADS")
+
+
+def _clear(monkeypatch):
+    for var in _VARS:
+        monkeypatch.delenv(var, raising=False)
+
+
+def test_default_split_of_cores_across_processes(monkeypatch):
+    _clear(monkeypatch)
+    monkeypatch.setenv("HIRESCOPE_CPU_CORES", "16")
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+
+    budget = compute_budget()
+
+    assert budget.process_cores == 8
+    assert budget.inference_threads == 4
+    assert budget.ocr_workers == 2 and budget.ocr_threads == 1
+    assert budget.analysis_threads == (8 - 4 - 2) * 4
+    assert budget.request_threads == 16
+    assert budget.source == "HIRESCOPE_CPU_CORES"
+
+
+def test_explicit_allocations_win_and_stay_within_the_process_share(monkeypatch):
+    _clear(monkeypatch)
+    monkeypatch.setenv("HIRESCOPE_CPU_CORES", "2")
+    monkeypatch.setenv("OMP_NUM_THREADS", "8")
+    monkeypatch.setenv("HIRESCOPE_OCR_WORKERS", "3")
+
+    budget = compute_budget()
+
+    assert budget.inference_threads == 2
+    assert budget.ocr_workers == 3
+    assert budget.analysis_threads >= 4
+    # Probes and admin calls keep headroom beyond the analysis jobs
+    assert budget.request_threads >= 16
@@ -0,0 +1,48 @@
+# backend/tests/test_warmup.py
+from core.warmup import Warmup, _Component
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def _warmup(*components):
+    warmup = Warmup(())
+    warmup.components = list(components)
+    return warmup
+
+
+def test_not_ready_until_finished_and_required_components_loaded():
+    calls = []
+    warmup = _warmup(
+        _Component("model:x", lambda: calls.append("model"), required=True),
+        _Component("rag:x", _fail, required=False),
+    )
+    assert not warmup.ready
+
+    warmup.start().join(timeout=5)
+
+    status = warmup.status()
+    assert status["ready"] and status["finished"]
+    assert calls == ["model"]
+    assert status["components"]["model:x"]["state"] == "ready"
+    assert status["components"]["rag:x"] == {
+        "state": "failed", "required": False, "error": "boom",
+        "seconds": status["components"]["rag:x"]["seconds"],
+    }
+
+
+def test_failed_required_component_is_retried_on_the_next_run():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("not yet")
+
+    warmup = _warmup(_Component("model:x", flaky, required=True))
+    warmup.run()
+    assert not warmup.ready
+
+    warmup.run()
+    assert warmup.ready and len(attempts) == 2
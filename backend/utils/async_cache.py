@@ -0,0 +1,353 @@
+# backend/utils/async_cache.py
+"""
+Asyncio twin of the shared cache (utils.cache), on redis.asyncio.
+
+A synchronous Redis call inside a coroutine stalls the whole event loop for
+a round trip, or for the full socket timeout while Redis is down. Async
+code uses these variants instead: aget_from_cache, aset_in_cache,
+aget_many, aset_many and aget_cache_stats, and cached_async fills through
+fill_async.
+
+Each event loop gets its own connection pool (asyncio connections belong
+to the loop that opened them), with the same settings as the sync pool.
+With the disk backend, the SQLite calls run in a worker thread instead.
+Everything else is shared with utils.cache: L1, key namespaces, the codec,
+the write-behind queue, the circuit breaker and the counters.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils import cache
+from utils.cache_codec import CodecError, encode
+from utils.hot_keys import get_hot_keys
+from utils.memory_cache import get_memory_cache
+
+logger = logging.getLogger(__name__)
+
+# event loop -> asyncio Redis client; reset after fork()
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_clients_pid = None
+_refresh_tasks = set()
+
+
+def get_async_redis_client():
+    """
+    The running loop's pooled asyncio Redis client, or None when Redis is
+    disabled, not installed, or its circuit breaker is open.
+    """
+    global _clients_pid
+    if not cache.REDIS_ENABLED or cache._redis_unavailable:
+        return None
+    loop = asyncio.get_running_loop()
+    if _clients_pid != os.getpid():
+        _clients.clear()
+        _clients_pid = os.getpid()
+    client = _clients.get(loop)
+    if client is None:
+        try:
+            import redis.asyncio as aioredis
+            from redis.asyncio.retry import Retry
+
+            client = _clients[loop] = aioredis.Redis(connection_pool=cache._create_pool(aioredis.ConnectionPool, Retry))
+        except Exception as e:
+            logger.warning(f"⚠️ Async Redis not available, using memory cache: {e}")
+            cache._redis_unavailable = True
+            return None
+    if not cache.get_redis_breaker().allow():
+        return None
+    return client
+
+
+async def close_async_redis():
+    """Close the running loop's pool (call on shutdown)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+        await client.connection_pool.disconnect()
+
+
+async def aget_from_cache(key: str) -> Optional[Any]:
+    """Async get_from_cache: L1, then one pipelined GET + PTTL to Redis"""
+    get_hot_keys().record(key)
+    value = get_memory_cache().get(key)
+    if value is not None:
+        return value
+    return await _aget_shared(key)
+
+
+async def _aget_shared(key: str) -> Optional[Any]:
+    """Async cache._get_shared"""
+    redis_client = get_async_redis_client()
+    if redis_client:
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = await pipe.execute()
+            cache._redis_ok()
+            return cache._promote(key, raw, pttl)
+        except CodecError as e:
+            cache._count("codec_errors")
+            logger.debug(f"Undecodable cache entry {key}: {e}")
+        except Exception as e:
+            cache._redis_failed("get", e)
+    elif cache.get_disk_tier() is not None:
+        # SQLite calls can wait on another process's write: keep them off the loop
+        return await asyncio.to_thread(cache._get_from_disk, key)
+    return None
+
+
+async def aset_in_cache(key: str, value: Any, ttl: int = 3600):
+    """Async set_in_cache"""
+    if cache._queue_for_redis():
+        get_memory_cache().set(key, value, min(ttl, cache.L1_TTL))
+        # Queueing never blocks; the writer thread does the I/O
+        cache._get_write_behind().put(key, value, ttl)
+        return True
+    if cache.get_disk_tier() is not None:
+        return await asyncio.to_thread(cache.set_in_cache, key, value, ttl)
+    if not _redis_configured():
+        get_memory_cache().set(key, value, ttl)
+        return True
+    # Encoded before taking a client, as in set_in_cache
+    try:
+        data = encode(value)
+    except CodecError as e:
+        cache._count("codec_errors")
+        logger.debug(f"Not caching {key} in Redis: {e}")
+        get_memory_cache().set(key, value, ttl)
+        return True
+
+    redis_client = get_async_redis_client()
+    if redis_client:
+        get_memory_cache().set(key, value, min(ttl, cache.L1_TTL))
+        try:
+            await redis_client.set(key, data, ex=ttl)
+            cache._redis_ok()
+            return True
+        except Exception as e:
+            cache._redis_failed("set", e)
+
+    get_memory_cache().set(key, value, ttl)
+    return True
+
+
+def _redis_configured() -> bool:
+    return cache.REDIS_ENABLED and not cache._redis_unavailable
+
+
+async def aget_many(keys: List[str]) -> Dict[str, Any]:
+    """Async get_many: L1, then one pipeline (MGET + PTTLs) for the rest"""
+    hot_keys = get_hot_keys()
+    for key in keys:
+        hot_keys.record(key)
+    found = get_memory_cache().get_many(keys)
+    missing = [key for key in dict.fromkeys(keys) if key not in found]
+    if not missing:
+        return found
+
+    redis_client = get_async_redis_client()
+    if redis_client:
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.mget(missing)
+                for key in missing:
+                    pipe.pttl(key)
+                raws, *pttls = await pipe.execute()
+            cache._redis_ok()
+        except Exception as e:
+            cache._redis_failed("get_many", e)
+            return found
+        found.update(cache._promote_many(zip(missing, raws, pttls)))
+    elif cache.get_disk_tier() is not None:
+        found.update(await asyncio.to_thread(cache._get_many_from_disk, missing))
+    return found
+
+
+async def aset_many(items: Dict[str, Any], ttl: int = 3600):
+    """Async set_many: one pipelined round trip"""
+    if not items:
+        return True
+    l1 = get_memory_cache()
+    if cache._queue_for_redis():
+        l1.set_many(items, min(ttl, cache.L1_TTL))
+        writer = cache._get_write_behind()
+        for key, value in items.items():
+            writer.put(key, value, ttl)
+        return True
+    if cache.get_disk_tier() is not None:
+        return await asyncio.to_thread(cache.set_many, items, ttl)
+    if not _redis_configured():
+        l1.set_many(items, ttl)
+        return True
+
+    encoded, local = cache._encode_many(items)
+    redis_client = get_async_redis_client() if encoded else None
+    if redis_client:
+        l1.set_many(items, min(ttl, cache.L1_TTL))
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key, data in encoded.items():
+                    pipe.set(key, data, ex=ttl)
+                await pipe.execute()
+            cache._redis_ok()
+        except Exception as e:
+            cache._redis_failed("set_many", e)
+            l1.set_many(items, ttl)
+            return True
+        l1.set_many(local, ttl)
+        return True
+
+    l1.set_many(items, ttl)
+    return True
+
+
+async def arefresh_versions():
+    """Reload namespace versions from Redis without blocking the loop"""
+    redis_client = get_async_redis_client()
+    if not redis_client:
+        return
+    try:
+        remote = await redis_client.hgetall(cache.NAMESPACE_VERSIONS_KEY)
+        cache._redis_ok()
+    except Exception as e:
+        cache._redis_failed("versions", e)
+        return
+    cache._apply_versions(remote)
+
+
+def schedule_version_refresh():
+    """Start arefresh_versions on the running loop; keys built meanwhile use the current versions"""
+    task = asyncio.get_running_loop().create_task(arefresh_versions())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _acquire_fill_lock(key: str) -> Optional[str]:
+    """Async cache._acquire_fill_lock: a token, "" without Redis, None if held elsewhere"""
+    redis_client = get_async_redis_client()
+    if not redis_client:
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        acquired = await redis_client.set(f"lock:{key}", token, nx=True, px=int(cache.FILL_LOCK_SECONDS * 1000))
+        cache._redis_ok()
+    except Exception as e:
+        cache._redis_failed("lock", e)
+        return ""
+    if acquired:
+        cache._count("fill_locks_acquired")
+        return token
+    return None
+
+
+async def _release_fill_lock(key: str, token: str):
+    redis_client = get_async_redis_client()
+    if not redis_client:
+        return
+    try:
+        await redis_client.eval(cache._RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        cache._redis_ok()
+    except Exception as e:
+        cache._redis_failed("unlock", e)
+
+
+async def fill_async(
+    key: str, compute: Callable[[], Awaitable[Any]], ttl: int, distributed: bool, soft_ttl: Optional[float] = None
+) -> Any:
+    """Compute and store `key` (run by the single-flight leader of cached_async)"""
+    value = await aget_from_cache(key)
+    if value is not None:
+        return cache._unwrap(value)
+    token = ""
+    if distributed:
+        deadline = time.monotonic() + cache.FILL_LOCK_SECONDS
+        while (token := await _acquire_fill_lock(key)) is None:
+            cache._count("fill_lock_waits")
+            await asyncio.sleep(cache.FILL_LOCK_POLL_SECONDS)
+            value = await aget_from_cache(key)
+            if value is not None:
+                return cache._unwrap(value)
+            if time.monotonic() >= deadline:
+                cache._count("fill_lock_timeouts")
+                token = ""
+                break
+    try:
+        result = await compute()
+        await aset_in_cache(key, cache._wrap(result, soft_ttl), ttl)
+        return result
+    finally:
+        if token:
+            await _release_fill_lock(key, token)
+
+
+async def _refresh(prefix: str, key: str, compute: Callable[[], Awaitable[Any]], ttl: int, soft_ttl: float):
+    """Async cache._refresh"""
+    try:
+        token = await _acquire_fill_lock(key)
+        if token is None:
+            cache._swr_count(prefix, "refreshes_skipped")
+            return
+        try:
+            # Fresh already if another worker refreshed it (see cache._refresh)
+            if not cache._is_stale(await _aget_shared(key)):
+                cache._swr_count(prefix, "refreshes_skipped")
+                return
+            await aset_in_cache(key, cache._wrap(await compute(), soft_ttl), ttl)
+            cache._swr_count(prefix, "refreshes")
+        finally:
+            if token:
+                await _release_fill_lock(key, token)
+    except Exception as e:
+        cache._swr_count(prefix, "refresh_errors")
+        logger.warning(f"⚠️ Background refresh of {key} failed: {e}")
+    finally:
+        cache._refresh_done(key)
+
+
+def schedule_refresh_async(prefix: str, key: str, compute: Callable[[], Awaitable[Any]], ttl: int, soft_ttl: float):
+    """Refresh a stale entry in a task on the running loop (once per key at a time)"""
+    if cache._claim_refresh(key):
+        task = asyncio.get_running_loop().create_task(_refresh(prefix, key, compute, ttl, soft_ttl))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+
+def _pool_stats() -> dict:
+    pools = [client.connection_pool for client in list(_clients.values())]
+    return {
+        'pools': len(pools),
+        'in_use': sum(len(getattr(pool, '_in_use_connections', ())) for pool in pools),
+        'idle': sum(len(getattr(pool, '_available_connections', ())) for pool in pools),
+    }
+
+
+async def aget_cache_stats() -> dict:
+    """Async get_cache_stats"""
+    redis_client = get_async_redis_client()
+    redis_stats = None
+
+    if redis_client:
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.info('stats')
+                pipe.dbsize()
+                pipe.info('memory')
+                info, keys, memory = await pipe.execute()
+            redis_stats = cache._redis_server_stats(info, keys, memory)
+            cache._redis_ok()
+        except Exception as e:
+            cache._redis_failed("stats", e)
+
+    if cache.get_disk_tier() is not None:
+        stats = await asyncio.to_thread(cache._cache_stats, redis_stats)
+    else:
+        stats = cache._cache_stats(redis_stats)
+    stats['async_redis_pool'] = _pool_stats()
+    return stats
@@ -1,132 +1,1064 @@
 # backend/utils/cache.py
-import hashlib
+import asyncio
 import json
 import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import wraps
-from typing import Optional, Any, Callable
-import pickle
+from typing import Optional, Any, Callable, Dict, List, Tuple
+
+from utils.cache_codec import CodecError, decode, encode, hash_arguments, register_type
+from utils.circuit_breaker import OPEN, CircuitBreaker
+from utils.disk_cache import get_disk_cache
+from utils.hot_keys import get_hot_keys
+from utils.memory_cache import get_memory_cache
+from utils.single_flight import AsyncSingleFlight, SingleFlight, get_single_flight_stats
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache as fallback
-_memory_cache = {}
+# Shared tier behind L1: Redis, a SQLite file on local disk shared by the
+# workers of one host (utils.disk_cache), or nothing (each worker's L1 only)
+CACHE_BACKENDS = ("redis", "disk", "memory")
+CACHE_BACKEND = os.getenv("HIRESCOPE_CACHE_BACKEND", "redis").lower()
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    logger.warning(f"⚠️ Unknown HIRESCOPE_CACHE_BACKEND={CACHE_BACKEND!r}, using redis")
+    CACHE_BACKEND = "redis"
+
+# Redis connection settings
+REDIS_ENABLED = CACHE_BACKEND == "redis" and os.getenv("HIRESCOPE_REDIS_ENABLED", "1") != "0"
+REDIS_URL = os.getenv("REDIS_URL")  # overrides host/port/db when set
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0"))
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", "1"))
+
+# Circuit breaker: open after this many consecutive connection failures, then
+# probe again after a delay that doubles on every failed probe
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "3"))
+REDIS_BREAKER_RESET = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "5"))
+REDIS_BREAKER_MAX_RESET = float(os.getenv("REDIS_BREAKER_MAX_RESET_SECONDS", "300"))
+
+# Two-tier cache: L1 is the in-process memory cache; while Redis (L2) is up,
+# L1 keeps entries for at most L1_TTL seconds. With write-behind, L2 writes
+# are queued and flushed by a background thread instead of inline.
+L1_TTL = float(os.getenv("HIRESCOPE_L1_TTL_SECONDS", "60"))
+CACHE_WRITE_BEHIND = os.getenv("HIRESCOPE_CACHE_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("HIRESCOPE_CACHE_WRITE_BEHIND_MAX_PENDING", "10000"))
+INVALIDATION_CHANNEL = os.getenv("HIRESCOPE_CACHE_INVALIDATION_CHANNEL", "hirescope:cache:invalidate")
+
+# Single-flight: concurrent misses on a key share one computation. With
+# SINGLE_FLIGHT_REDIS, workers also coordinate through a Redis lock that
+# expires after FILL_LOCK_SECONDS (so a crashed holder can't block others).
+SINGLE_FLIGHT_REDIS = os.getenv("HIRESCOPE_SINGLE_FLIGHT_REDIS", "0") == "1"
+FILL_LOCK_SECONDS = float(os.getenv("HIRESCOPE_FILL_LOCK_SECONDS", "30"))
+FILL_LOCK_POLL_SECONDS = float(os.getenv("HIRESCOPE_FILL_LOCK_POLL_SECONDS", "0.05"))
+
+# Stale-while-revalidate: stale entries are refreshed on this many threads
+SWR_REFRESH_WORKERS = int(os.getenv("HIRESCOPE_SWR_REFRESH_WORKERS", "2"))
+
+# Background cleanup of invalidated keys
+RECLAIM_SCAN_COUNT = int(os.getenv("HIRESCOPE_RECLAIM_SCAN_COUNT", "500"))
+RECLAIM_PAUSE_SECONDS = float(os.getenv("HIRESCOPE_RECLAIM_PAUSE_SECONDS", "0.01"))
+
+# Identifies this process's own invalidation broadcasts (pid included:
+# pre-forked workers all inherit the master's module state)
+_INSTANCE_ID = uuid.uuid4().hex
+
+def _origin() -> str:
+    return f"{_INSTANCE_ID}:{os.getpid()}"
 
-# Redis client (optional, will fallback to memory cache if not available)
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        _stats[name] = _stats.get(name, 0) + n
+
+# Redis client (optional, will fallback to memory cache if not available).
+# One pooled client per process; the pool reconnects by itself after a fork.
 _redis_client = None
+_redis_pool = None
+_redis_lock = threading.Lock()
+_redis_unavailable = False  # redis package missing or misconfigured
+_redis_connected = False
+_redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=REDIS_BREAKER_FAILURES,
+    reset_timeout=REDIS_BREAKER_RESET,
+    max_reset_timeout=REDIS_BREAKER_MAX_RESET,
+)
+
+def get_redis_breaker() -> CircuitBreaker:
+    return _redis_breaker
+
+
+def _create_pool(pool_class, retry_class):
+    """Connection pool with the shared settings (sync or asyncio classes)"""
+    import redis
+    from redis.backoff import ExponentialBackoff
+
+    options = dict(
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30,
+        # Short in-call retries for a dropped connection; sustained outages
+        # are the circuit breaker's job
+        retry=retry_class(ExponentialBackoff(cap=0.2, base=0.02), REDIS_RETRIES),
+        retry_on_error=[redis.ConnectionError, redis.TimeoutError],
+    )
+    if REDIS_URL:
+        return pool_class.from_url(REDIS_URL, **options)
+    return pool_class(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, password=REDIS_PASSWORD, **options)
+
+
+def _create_redis_client():
+    global _redis_client, _redis_pool
+    import redis
+    from redis.retry import Retry
+
+    _redis_pool = _create_pool(redis.ConnectionPool, Retry)
+    # decode_responses stays off: values are framed binary payloads
+    _redis_client = redis.Redis(connection_pool=_redis_pool)
+
+
+def _redis_target() -> str:
+    return REDIS_URL or f"{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+
+
+def _is_connection_error(e: Exception) -> bool:
+    try:
+        import redis
+        return isinstance(e, (redis.ConnectionError, redis.TimeoutError, OSError))
+    except ImportError:
+        return isinstance(e, OSError)
+
+
+def _redis_ok():
+    global _redis_connected
+    if not _redis_connected:
+        _redis_connected = True
+        logger.info(f"✅ Redis cache connected ({_redis_target()})")
+    _redis_breaker.record_success()
+
+
+def _redis_failed(operation: str, e: Exception):
+    """Log a Redis error; connection problems count against the breaker"""
+    if _is_connection_error(e):
+        _redis_breaker.record_failure(e)
+    else:
+        # The server answered, so the connection itself is healthy
+        _redis_ok()
+    logger.warning(f"Redis {operation} error: {e}")
+
 
 def get_redis_client():
-    """Get Redis client with lazy initialization"""
-    global _redis_client
+    """
+    Get the pooled Redis client, or None when Redis is disabled, not
+    installed, or its circuit breaker is open.
+
+    Callers report every call's outcome through _redis_ok() / _redis_failed(),
+    so a Redis outage costs a few connect timeouts instead of one per call.
+    """
+    if not _redis_configured() or not _redis_breaker.allow():
+        return None
+    return _redis_client
+
+
+def _redis_configured() -> bool:
+    """Whether Redis is the shared tier and its client exists (the breaker is not asked)"""
+    global _redis_unavailable
+    if not REDIS_ENABLED or _redis_unavailable:
+        return False
     if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                try:
+                    _create_redis_client()
+                except Exception as e:
+                    logger.warning(f"⚠️ Redis not available, using memory cache: {e}")
+                    _redis_unavailable = True
+                    return False
+    return True
+
+
+def _queue_for_redis() -> bool:
+    """
+    Whether writes go to the write-behind queue. Only the state is checked:
+    claiming the half-open probe here would leave it unreported, since the
+    writer thread does the I/O (and reports the outcome) later.
+    """
+    return CACHE_WRITE_BEHIND and _redis_configured() and _redis_breaker.state != OPEN
+
+
+def has_shared_tier() -> bool:
+    """Whether L1 sits in front of a shared tier (Redis or the disk cache)"""
+    return _redis_configured() or get_disk_tier() is not None
+
+
+_disk_unavailable = False
+
+def get_disk_tier():
+    """The shared disk cache when HIRESCOPE_CACHE_BACKEND=disk, else None"""
+    global _disk_unavailable
+    if CACHE_BACKEND != "disk" or _disk_unavailable:
+        return None
+    try:
+        return get_disk_cache()
+    except Exception as e:
+        logger.warning(f"⚠️ Disk cache not available, using memory cache: {e}")
+        _disk_unavailable = True
+        return None
+
+
+def _disk_failed(operation: str, e: Exception):
+    _count("disk_errors")
+    logger.warning(f"Disk cache {operation} error: {e}")
+
+
+# --- Namespace versions ----------------------------------------------------
+#
+# Every key embeds the version of its namespace (the key prefix) and a global
+# epoch: "<namespace>:v<epoch>.<version>:...". Invalidating a namespace is a
+# single HINCRBY in Redis, after which no worker reads the old keys again;
+# the reclaimer then deletes them in the background with SCAN/UNLINK.
+
+NAMESPACE_VERSIONS_KEY = "hirescope:cache:versions"
+ALL_NAMESPACES = "*"
+NAMESPACE_VERSION_TTL = float(os.getenv("HIRESCOPE_NAMESPACE_VERSION_TTL", "30"))
+
+_versions = {}
+_versions_loaded_at = None
+_versions_lock = threading.Lock()
+_namespaces_seen = set()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _load_versions(force: bool = False):
+    """Refresh the local copy of namespace versions (every NAMESPACE_VERSION_TTL seconds)"""
+    global _versions_loaded_at
+    now = time.monotonic()
+    if not force and _versions_loaded_at is not None and now - _versions_loaded_at < NAMESPACE_VERSION_TTL:
+        return
+    # Set first, so an outage costs one attempt per interval rather than per key
+    _versions_loaded_at = now
+    disk = get_disk_tier()
+    if disk is not None:
+        # A local read that never waits on writers (WAL)
         try:
-            import redis
-            _redis_client = redis.Redis(
-                host='localhost',
-                port=6379,
-                db=0,
-                decode_responses=False,  # We'll use pickle for complex objects
-                socket_connect_timeout=2,
-                socket_timeout=2
-            )
-            # Test connection
-            _redis_client.ping()
-            logger.info("✅ Redis cache connected")
+            remote = disk.versions()
         except Exception as e:
-            logger.warning(f"⚠️ Redis not available, using memory cache: {e}")
-            _redis_client = None
-    return _redis_client
+            _disk_failed("versions", e)
+            return
+        with _versions_lock:
+            _versions.update(remote)
+        return
+    if _on_event_loop():
+        # Never block the loop: refresh through the async client meanwhile
+        from utils.async_cache import schedule_version_refresh
+        schedule_version_refresh()
+        return
+    redis_client = get_redis_client()
+    if not redis_client:
+        return
+    try:
+        remote = redis_client.hgetall(NAMESPACE_VERSIONS_KEY)
+        _redis_ok()
+    except Exception as e:
+        _redis_failed("versions", e)
+        return
+    _apply_versions(remote)
+
+
+def _apply_versions(remote: dict):
+    with _versions_lock:
+        _versions.update({k.decode(): int(v) for k, v in remote.items()})
+
+
+def namespace_version(namespace: str) -> str:
+    """Version tag embedded in keys of a namespace, e.g. "v0.3" """
+    _load_versions()
+    _namespaces_seen.add(namespace)
+    return f"v{_versions.get(ALL_NAMESPACES, 0)}.{_versions.get(namespace, 0)}"
+
+
+def namespaced_key(namespace: str, *parts: Any) -> str:
+    """Build a key in a namespace, so clear_cache(namespace) invalidates it"""
+    return ":".join([namespace, namespace_version(namespace), *map(str, parts)])
 
 
 def generate_cache_key(prefix: str, *args, **kwargs) -> str:
-    """Generate a consistent cache key from function arguments"""
-    # Create a string representation of all arguments
-    cache_data = {
-        'args': args,
-        'kwargs': sorted(kwargs.items())
-    }
-    cache_str = json.dumps(cache_data, sort_keys=True)
-    
-    # Hash it for a fixed-length key
-    hash_digest = hashlib.md5(cache_str.encode()).hexdigest()
-    return f"{prefix}:{hash_digest}"
+    """
+    Generate a consistent cache key from function arguments.
+    Large strings and numpy arrays are hashed in place (see cache_codec).
+    """
+    return namespaced_key(prefix, hash_arguments(args, kwargs))
 
 
 def get_from_cache(key: str) -> Optional[Any]:
-    """Get value from cache (Redis or memory)"""
+    """
+    Read-through two-tier lookup: the in-process L1 first, then the shared
+    tier (Redis, or the disk cache). An L2 hit is copied into L1 for at most
+    L1_TTL seconds.
+    """
+    get_hot_keys().record(key)
+    l1 = get_memory_cache()
+    value = l1.get(key)
+    if value is not None:
+        return value
+    return _get_shared(key)
+
+
+def _get_shared(key: str) -> Optional[Any]:
+    """The shared tier's copy of key, bypassing L1 (a hit is still copied into L1)"""
     redis_client = get_redis_client()
-    
     if redis_client:
         try:
-            value = redis_client.get(key)
-            if value:
-                return pickle.loads(value)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.pttl(key)
+            raw, pttl = pipe.execute()
+            _redis_ok()
+            return _promote(key, raw, pttl)
+        except CodecError as e:
+            # Written by an older or foreign writer: treat it as a miss
+            _count("codec_errors")
+            logger.debug(f"Undecodable cache entry {key}: {e}")
         except Exception as e:
-            logger.warning(f"Redis get error: {e}")
-    
-    # Fallback to memory cache
-    return _memory_cache.get(key)
+            _redis_failed("get", e)
+        return None
+    return _get_from_disk(key)
+
+
+def _get_from_disk(key: str) -> Optional[Any]:
+    disk = get_disk_tier()
+    if disk is not None:
+        try:
+            data, remaining = disk.get_raw(key) or (None, None)
+            return _promote(key, data, int(remaining * 1000) if remaining else None)
+        except CodecError as e:
+            _count("codec_errors")
+            logger.debug(f"Undecodable cache entry {key}: {e}")
+        except Exception as e:
+            _disk_failed("get", e)
+    return None
+
+
+def _promote(key: str, raw: Optional[bytes], pttl: Optional[int]) -> Optional[Any]:
+    """Decode an L2 reply and copy the value into L1 for what remains of its TTL"""
+    if not raw:
+        _count("l2_misses")
+        return None
+    value = decode(raw)
+    _count("l2_hits")
+    remaining = pttl / 1000.0 if pttl and pttl > 0 else L1_TTL
+    get_memory_cache().set(key, value, min(L1_TTL, remaining))
+    return value
 
 
 def set_in_cache(key: str, value: Any, ttl: int = 3600):
-    """Set value in cache with TTL (Redis or memory)"""
+    """Set value in cache with TTL: L1 always, Redis directly or via write-behind"""
+    if _queue_for_redis():
+        # L1 holds the value only briefly, so other workers' writes show up soon
+        get_memory_cache().set(key, value, min(ttl, L1_TTL))
+        _get_write_behind().put(key, value, ttl)
+        return True
+
+    disk = get_disk_tier()
+    if disk is None and not _redis_configured():
+        # Memory only (LRU within a byte budget, honors the TTL)
+        get_memory_cache().set(key, value, ttl)
+        return True
+    # Encoded before taking a client: a codec error involves no Redis I/O,
+    # so it would leave a half-open breaker's probe unreported
+    try:
+        data = encode(value)
+    except CodecError as e:
+        # Not encodable with the safe codec: keep it in this process only
+        _count("codec_errors")
+        logger.debug(f"Not caching {key} in the shared tier: {e}")
+        get_memory_cache().set(key, value, ttl)
+        return True
+
     redis_client = get_redis_client()
-    
     if redis_client:
+        get_memory_cache().set(key, value, min(ttl, L1_TTL))
         try:
-            serialized = pickle.dumps(value)
-            redis_client.setex(key, ttl, serialized)
+            redis_client.setex(key, ttl, data)
+            _redis_ok()
             return True
         except Exception as e:
-            logger.warning(f"Redis set error: {e}")
-    
-    # Fallback to memory cache
-    _memory_cache[key] = value
+            _redis_failed("set", e)
+
+    if disk is not None:
+        # Other workers write the file too: keep the L1 copy brief
+        get_memory_cache().set(key, value, min(ttl, L1_TTL))
+        try:
+            if disk.set_raw(key, data, ttl):
+                return True
+        except Exception as e:
+            _disk_failed("set", e)
     
-    # Simple memory cache size limit (keep last 1000 items)
-    if len(_memory_cache) > 1000:
-        # Remove oldest 200 items
-        for _ in range(200):
-            _memory_cache.pop(next(iter(_memory_cache)))
+    # Shared tier unreachable: this process only, for the full TTL
+    get_memory_cache().set(key, value, ttl)
     
     return True
 
 
-def clear_cache(pattern: str = None):
-    """Clear cache entries matching pattern"""
+def get_many(keys: List[str]) -> Dict[str, Any]:
+    """
+    get_from_cache for several keys in one round trip per tier: one L1
+    lock acquisition, then a single pipeline (MGET + PTTLs) to Redis or one
+    query to the disk cache for the keys L1 lacks. Returns the keys found.
+    """
+    hot_keys = get_hot_keys()
+    for key in keys:
+        hot_keys.record(key)
+    found = get_memory_cache().get_many(keys)
+    missing = [key for key in dict.fromkeys(keys) if key not in found]
+    if not missing:
+        return found
+
     redis_client = get_redis_client()
-    
     if redis_client:
         try:
-            if pattern:
-                keys = redis_client.keys(f"{pattern}*")
-                if keys:
-                    redis_client.delete(*keys)
-            else:
-                redis_client.flushdb()
-            logger.info(f"✅ Cache cleared: {pattern or 'all'}")
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.mget(missing)
+            for key in missing:
+                pipe.pttl(key)
+            raws, *pttls = pipe.execute()
+            _redis_ok()
         except Exception as e:
-            logger.warning(f"Redis clear error: {e}")
+            _redis_failed("get_many", e)
+            return found
+        found.update(_promote_many(zip(missing, raws, pttls)))
+        return found
+    found.update(_get_many_from_disk(missing))
+    return found
+
+
+def _get_many_from_disk(keys: List[str]) -> Dict[str, Any]:
+    disk = get_disk_tier()
+    if disk is None:
+        return {}
+    try:
+        rows = disk.get_many_raw(keys)
+    except Exception as e:
+        _disk_failed("get_many", e)
+        return {}
+    _count("l2_misses", len(keys) - len(rows))
+    return _promote_many(
+        (key, data, int(remaining * 1000) if remaining else None) for key, (data, remaining) in rows.items()
+    )
+
+
+def _promote_many(replies) -> Dict[str, Any]:
+    """_promote for (key, raw, pttl) replies; an undecodable entry is a miss"""
+    found = {}
+    for key, raw, pttl in replies:
+        try:
+            value = _promote(key, raw, pttl)
+        except CodecError as e:
+            _count("codec_errors")
+            logger.debug(f"Undecodable cache entry {key}: {e}")
+            continue
+        if value is not None:
+            found[key] = value
+    return found
+
+
+def set_many(items: Dict[str, Any], ttl: int = 3600):
+    """set_in_cache for several entries: one L1 lock acquisition, one pipelined round trip"""
+    if not items:
+        return True
+    l1 = get_memory_cache()
+    if _queue_for_redis():
+        l1.set_many(items, min(ttl, L1_TTL))
+        writer = _get_write_behind()
+        for key, value in items.items():
+            writer.put(key, value, ttl)
+        return True
+
+    disk = get_disk_tier()
+    if disk is None and not _redis_configured():
+        l1.set_many(items, ttl)
+        return True
+    # Before taking a client, as in set_in_cache
+    encoded, local = _encode_many(items)
+    redis_client = get_redis_client() if encoded else None
+
+    if redis_client:
+        l1.set_many(items, min(ttl, L1_TTL))
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, data in encoded.items():
+                pipe.setex(key, ttl, data)
+            pipe.execute()
+            _redis_ok()
+        except Exception as e:
+            _redis_failed("set_many", e)
+            l1.set_many(items, ttl)
+            return True
+        # Not encodable with the safe codec: keep those in this process only
+        l1.set_many(local, ttl)
+        return True
+
+    if disk is not None:
+        l1.set_many(items, min(ttl, L1_TTL))
+        try:
+            disk.set_many_raw(encoded, ttl)
+            l1.set_many(local, ttl)
+            return True
+        except Exception as e:
+            _disk_failed("set_many", e)
+
+    l1.set_many(items, ttl)
+    return True
+
+
+def _encode_many(items: Dict[str, Any]) -> Tuple[Dict[str, bytes], Dict[str, Any]]:
+    """(key -> encoded bytes, the items the codec refused)"""
+    encoded, refused = {}, {}
+    for key, value in items.items():
+        try:
+            encoded[key] = encode(value)
+        except CodecError as e:
+            _count("codec_errors")
+            logger.debug(f"Not caching {key} in the shared tier: {e}")
+            refused[key] = value
+    return encoded, refused
+
+
+def clear_cache(pattern: str = None, wait: float = 0) -> dict:
+    """
+    Invalidate a namespace (a cache prefix such as "jd_keywords"), or
+    everything when pattern is None, in O(1): bump its version in Redis and
+    tell every worker. Old keys are deleted later by the background reclaimer.
+    With the disk backend the version lives in the database, and the old
+    entries are deleted right away (a range delete on the key index).
+
+    keys_invalidated counts the entries of the authoritative tier. With Redis
+    it comes from the reclaim run, so it is None unless that run finishes
+    within wait seconds.
+    """
+    namespace = pattern or ALL_NAMESPACES
+    version = None
+    result = {}
+    redis_client = get_redis_client()
+    disk = get_disk_tier()
     
-    # Clear memory cache
-    if pattern:
-        keys_to_delete = [k for k in _memory_cache.keys() if k.startswith(pattern)]
-        for k in keys_to_delete:
-            del _memory_cache[k]
+    if redis_client:
+        try:
+            version = redis_client.hincrby(NAMESPACE_VERSIONS_KEY, namespace, 1)
+            _publish_invalidation(redis_client, pattern, version)
+            _redis_ok()
+        except Exception as e:
+            _redis_failed("clear", e)
+    elif disk is not None:
+        # Other workers pick the new version up within NAMESPACE_VERSION_TTL
+        try:
+            version = disk.incr_version(namespace)
+            result["disk_entries_deleted"] = disk.clear(f"{pattern}:" if pattern else None)
+        except Exception as e:
+            _disk_failed("clear", e)
+
+    with _versions_lock:
+        # Without a shared tier the version is only bumped locally (L1 is the only tier)
+        _versions[namespace] = version if version is not None else _versions.get(namespace, 0) + 1
+    # Unreachable now; drop them to free the memory
+    l1_dropped = get_memory_cache().clear(f"{pattern}:" if pattern else None)
+    if redis_client and version is not None:
+        reclaim = get_reclaimer().schedule(pattern)
+        result["keys_invalidated"] = None
+        if wait > 0:
+            try:
+                run = reclaim.result(timeout=wait)
+                result["keys_invalidated"] = run["reclaimed"] if run else None
+            except Exception:
+                # Still running (or failed); /api/admin/cache/reclaim reports it later
+                pass
     else:
-        _memory_cache.clear()
+        result["keys_invalidated"] = result.get("disk_entries_deleted", l1_dropped)
+    logger.info(f"✅ Cache cleared: {pattern or 'all'} (version {_versions[namespace]})")
+    return {
+        "namespace": namespace,
+        "version": _versions[namespace],
+        "shared": version is not None,
+        "l1_entries_dropped": l1_dropped,
+        **result,
+    }
+
+
+class _Reclaimer:
+    """Deletes keys of superseded namespace versions with SCAN + UNLINK, off the request path"""
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pid = None
+        self._lock = threading.Lock()
+        self.running = None
+        self.totals = {"runs": 0, "scanned": 0, "reclaimed": 0}
+        self.last_run = None
+
+    def schedule(self, pattern: Optional[str]) -> Future:
+        """Queue a cleanup; the future resolves to that run's stats"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, name="cache-reclaimer", daemon=True).start()
+        future = Future()
+        self._queue.put((pattern, future))
+        return future
+
+    def _run(self):
+        while True:
+            pattern, future = self._queue.get()
+            try:
+                future.set_result(self._reclaim(pattern))
+            except Exception as e:
+                self.running = None
+                _redis_failed("reclaim", e)
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
 
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout for scheduled cleanups to finish"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
 
-def cached(prefix: str, ttl: int = 3600):
+    def _namespaces(self, redis_client, pattern: Optional[str]) -> list:
+        if pattern:
+            return [pattern]
+        known = {k.decode() for k in redis_client.hkeys(NAMESPACE_VERSIONS_KEY)} | _namespaces_seen
+        return sorted(known - {ALL_NAMESPACES})
+
+    def _reclaim(self, pattern: Optional[str]) -> Optional[dict]:
+        redis_client = get_redis_client()
+        if not redis_client:
+            return None
+        started = time.perf_counter()
+        run = self.running = {"pattern": pattern or "all", "scanned": 0, "reclaimed": 0}
+        _load_versions(force=True)
+        for namespace in self._namespaces(redis_client, pattern):
+            current = f"{namespace}:{namespace_version(namespace)}:".encode()
+            stale = []
+            for key in redis_client.scan_iter(match=f"{namespace}:*", count=RECLAIM_SCAN_COUNT):
+                run["scanned"] += 1
+                if not key.startswith(current):
+                    stale.append(key)
+                if len(stale) >= RECLAIM_SCAN_COUNT:
+                    run["reclaimed"] += redis_client.unlink(*stale)
+                    stale = []
+                    # Leave room for request traffic between batches
+                    time.sleep(RECLAIM_PAUSE_SECONDS)
+            if stale:
+                run["reclaimed"] += redis_client.unlink(*stale)
+        _redis_ok()
+        run["seconds"] = round(time.perf_counter() - started, 3)
+        self.totals["runs"] += 1
+        self.totals["scanned"] += run["scanned"]
+        self.totals["reclaimed"] += run["reclaimed"]
+        self.last_run, self.running = run, None
+        logger.info(f"🧹 Reclaimed {run['reclaimed']} of {run['scanned']} scanned keys for {run['pattern']} in {run['seconds']}s")
+        return run
+
+    def stats(self) -> dict:
+        return {
+            **self.totals,
+            "pending": self._queue.qsize(),
+            "running": dict(self.running) if self.running else None,
+            "last_run": self.last_run,
+        }
+
+
+_reclaimer = None
+
+def get_reclaimer() -> _Reclaimer:
+    global _reclaimer
+    if _reclaimer is None:
+        with _redis_lock:
+            if _reclaimer is None:
+                _reclaimer = _Reclaimer()
+    return _reclaimer
+
+
+# --- Write-behind to Redis -------------------------------------------------
+
+class _WriteBehind:
+    """Queues L2 writes and flushes them from one thread in pipelined batches"""
+
+    def __init__(self, max_pending: int):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: Any, ttl: int):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((key, value, ttl))
+            _count("write_behind_queued")
+        except queue.Full:
+            # L1 still has the value; only the shared copy is skipped
+            _count("write_behind_dropped")
+
+    def _ensure_thread(self):
+        # Threads don't survive fork(): each worker starts its own writer
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, name="cache-write-behind", daemon=True).start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 256:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(batch):
+        ttls = {key: ttl for key, _, ttl in batch}
+        encoded, _ = _encode_many({key: value for key, value, _ in batch})
+        if not encoded:
+            return
+        redis_client = get_redis_client()
+        if not redis_client:
+            _count("write_behind_dropped", len(batch))
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, data in encoded.items():
+                pipe.setex(key, ttls[key], data)
+            pipe.execute()
+            _redis_ok()
+            _count("write_behind_written", len(encoded))
+        except Exception as e:
+            _redis_failed("write-behind", e)
+            _count("write_behind_dropped", len(batch))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait up to timeout for queued writes to reach Redis"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return not self._queue.unfinished_tasks
+
+
+_write_behind = None
+
+def _get_write_behind() -> _WriteBehind:
+    global _write_behind
+    if _write_behind is None:
+        with _redis_lock:
+            if _write_behind is None:
+                _write_behind = _WriteBehind(WRITE_BEHIND_MAX_PENDING)
+    return _write_behind
+
+
+def flush_cache_writes(timeout: float = 5.0) -> bool:
+    """Flush pending write-behind writes (call on shutdown)"""
+    return _write_behind.flush(timeout) if _write_behind else True
+
+
+# --- Cross-worker L1 invalidation over pub/sub -----------------------------
+
+def _publish_invalidation(redis_client, pattern: Optional[str], version: Optional[int] = None):
+    message = json.dumps({"pattern": pattern, "version": version, "origin": _origin()})
+    redis_client.publish(INVALIDATION_CHANNEL, message)
+    _count("invalidations_sent")
+
+
+def _handle_invalidation(data: bytes):
+    message = json.loads(data)
+    _count("invalidations_received")
+    if message.get("origin") == _origin():
+        return
+    pattern = message.get("pattern")
+    if message.get("version") is not None:
+        # Switch to the new keys right away instead of at the next refresh
+        with _versions_lock:
+            _versions[pattern or ALL_NAMESPACES] = message["version"]
+    get_memory_cache().clear(f"{pattern}:" if pattern else None)
+
+
+def _listen_for_invalidations():
+    subscribed_before = False
+    while True:
+        if _redis_unavailable:
+            return
+        redis_client = get_redis_client()
+        if not redis_client:
+            time.sleep(1.0)
+            continue
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            _redis_ok()
+            if subscribed_before:
+                # Anything cleared while we were disconnected may still be in L1
+                get_memory_cache().clear()
+                _load_versions(force=True)
+            subscribed_before = True
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    _handle_invalidation(message["data"])
+        except Exception as e:
+            _redis_failed("pub/sub", e)
+            time.sleep(1.0)
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+
+_listener_pid = None
+
+def start_cache_invalidation_listener():
+    """Subscribe this worker to L1 invalidations (once per process)"""
+    global _listener_pid
+    if not REDIS_ENABLED or _listener_pid == os.getpid():
+        return
+    with _redis_lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+    threading.Thread(target=_listen_for_invalidations, name="cache-invalidation", daemon=True).start()
+
+
+# --- Single-flight fills --------------------------------------------------
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _acquire_fill_lock(key: str) -> Optional[str]:
+    """
+    Try to become the one worker computing `key`. Returns a token to release,
+    "" when Redis is unavailable (compute without a lock), or None when
+    another worker holds the lock.
+    """
+    redis_client = get_redis_client()
+    if not redis_client:
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        acquired = redis_client.set(f"lock:{key}", token, nx=True, px=int(FILL_LOCK_SECONDS * 1000))
+        _redis_ok()
+    except Exception as e:
+        _redis_failed("lock", e)
+        return ""
+    if acquired:
+        _count("fill_locks_acquired")
+        return token
+    return None
+
+
+def _release_fill_lock(key: str, token: str):
+    redis_client = get_redis_client()
+    if not redis_client:
+        return
+    try:
+        # Only delete our own lock: it may have expired and been re-acquired
+        redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        _redis_ok()
+    except Exception as e:
+        _redis_failed("unlock", e)
+
+
+def _fill(key: str, compute: Callable[[], Any], ttl: int, distributed: bool, soft_ttl: Optional[float] = None) -> Any:
+    """Compute and store `key` (run by the single-flight leader)"""
+    # Another flight may have stored it between our miss and now
+    value = get_from_cache(key)
+    if value is not None:
+        return _unwrap(value)
+    token = ""
+    if distributed:
+        deadline = time.monotonic() + FILL_LOCK_SECONDS
+        while (token := _acquire_fill_lock(key)) is None:
+            # Another worker is computing it: wait for its result
+            _count("fill_lock_waits")
+            time.sleep(FILL_LOCK_POLL_SECONDS)
+            value = get_from_cache(key)
+            if value is not None:
+                return _unwrap(value)
+            if time.monotonic() >= deadline:
+                _count("fill_lock_timeouts")
+                token = ""
+                break
+    try:
+        result = compute()
+        set_in_cache(key, _wrap(result, soft_ttl), ttl)
+        return result
+    finally:
+        if token:
+            _release_fill_lock(key, token)
+
+
+# --- Stale-while-revalidate ----------------------------------------------
+#
+# With a soft_ttl, a cached result is fresh for soft_ttl seconds and kept
+# until the (hard) ttl. A stale hit is served at once, and one background
+# refresh per key recomputes it: per process through _refreshing, across
+# workers through the fill lock.
+
+@dataclass
+class SwrEntry:
+    """A cached result and the time (epoch seconds) until which it is fresh"""
+    value: Any
+    fresh_until: float
+
+
+register_type(SwrEntry, "SwrEntry")
+
+
+def _wrap(value: Any, soft_ttl: Optional[float]) -> Any:
+    return SwrEntry(value, time.time() + soft_ttl) if soft_ttl else value
+
+
+def _unwrap(value: Any) -> Any:
+    return value.value if isinstance(value, SwrEntry) else value
+
+
+def _is_stale(value: Any) -> bool:
+    # A plain value was stored before the prefix had a soft_ttl
+    return not isinstance(value, SwrEntry) or value.fresh_until <= time.time()
+
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+_refresh_pool = None
+_refresh_pool_pid = None
+_swr_stats = {}
+
+
+def _swr_count(prefix: str, field: str):
+    with _stats_lock:
+        counts = _swr_stats.get(prefix)
+        if counts is None:
+            counts = _swr_stats[prefix] = {"stale_served": 0, "refreshes": 0, "refresh_errors": 0, "refreshes_skipped": 0}
+        counts[field] += 1
+
+
+def _claim_refresh(key: str) -> bool:
+    """True for the one caller that should refresh `key` in this process"""
+    with _refresh_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+        return True
+
+
+def _refresh_done(key: str):
+    with _refresh_lock:
+        _refreshing.discard(key)
+
+
+def _get_refresh_pool() -> ThreadPoolExecutor:
+    global _refresh_pool, _refresh_pool_pid
+    # Threads don't survive fork(): each worker starts its own pool
+    if _refresh_pool_pid != os.getpid():
+        with _refresh_lock:
+            if _refresh_pool_pid != os.getpid():
+                _refresh_pool = ThreadPoolExecutor(SWR_REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+                _refresh_pool_pid = os.getpid()
+                _refreshing.clear()
+    return _refresh_pool
+
+
+def _refresh(prefix: str, key: str, compute: Callable[[], Any], ttl: int, soft_ttl: float):
+    try:
+        token = _acquire_fill_lock(key)
+        if token is None:
+            # Another worker is refreshing it
+            _swr_count(prefix, "refreshes_skipped")
+            return
+        try:
+            # Other workers may still hold the stale copy in L1 after one of
+            # them refreshed it: check the shared copy before recomputing
+            if not _is_stale(_get_shared(key)):
+                _swr_count(prefix, "refreshes_skipped")
+                return
+            set_in_cache(key, _wrap(compute(), soft_ttl), ttl)
+            _swr_count(prefix, "refreshes")
+        finally:
+            if token:
+                _release_fill_lock(key, token)
+    except Exception as e:
+        _swr_count(prefix, "refresh_errors")
+        logger.warning(f"⚠️ Background refresh of {key} failed: {e}")
+    finally:
+        _refresh_done(key)
+
+
+def _schedule_refresh(prefix: str, key: str, compute: Callable[[], Any], ttl: int, soft_ttl: float):
+    pool = _get_refresh_pool()
+    if _claim_refresh(key):
+        pool.submit(_refresh, prefix, key, compute, ttl, soft_ttl)
+
+
+def cached(
+    prefix: str,
+    ttl: int = 3600,
+    single_flight: bool = True,
+    distributed: Optional[bool] = None,
+    soft_ttl: Optional[float] = None,
+):
     """
     Decorator for caching function results
     
+    Concurrent misses on the same key share one computation (single_flight).
+    With distributed (default: HIRESCOPE_SINGLE_FLIGHT_REDIS), workers also
+    coordinate through a short Redis lock, and the others wait for the result.
+    
+    With soft_ttl, ttl is the hard expiry: after soft_ttl seconds the result
+    is stale, still served at once, and refreshed in the background.
+    
     Usage:
         @cached(prefix="keywords", ttl=3600)
         def extract_keywords(text):
             # expensive operation
             return keywords
     """
+    distributed = SINGLE_FLIGHT_REDIS if distributed is None else distributed
+
     def decorator(func: Callable) -> Callable:
+        flight = SingleFlight(prefix)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Generate cache key
@@ -136,16 +1068,17 @@ def cached(prefix: str, ttl: int = 3600):
             cached_result = get_from_cache(cache_key)
             if cached_result is not None:
                 logger.debug(f"✅ Cache HIT: {prefix} - {cache_key[:16]}...")
-                return cached_result
+                if soft_ttl and _is_stale(cached_result):
+                    _swr_count(prefix, "stale_served")
+                    _schedule_refresh(prefix, cache_key, lambda: func(*args, **kwargs), ttl, soft_ttl)
+                return _unwrap(cached_result)
             
-            # Cache miss - compute result
+            # Cache miss - compute result (once, however many callers missed)
             logger.debug(f"⚠️ Cache MISS: {prefix} - {cache_key[:16]}...")
-            result = func(*args, **kwargs)
-            
-            # Store in cache
-            set_in_cache(cache_key, result, ttl)
-            
-            return result
+            fill = lambda: _fill(cache_key, lambda: func(*args, **kwargs), ttl, distributed, soft_ttl)
+            if not single_flight:
+                return fill()
+            return flight.do(cache_key, fill)
         
         # Add cache management methods
         wrapper.clear_cache = lambda: clear_cache(prefix)
@@ -156,9 +1089,16 @@ def cached(prefix: str, ttl: int = 3600):
 
 
 # Async version for async functions
-def cached_async(prefix: str, ttl: int = 3600):
+def cached_async(
+    prefix: str,
+    ttl: int = 3600,
+    single_flight: bool = True,
+    distributed: Optional[bool] = None,
+    soft_ttl: Optional[float] = None,
+):
     """
-    Decorator for caching async function results
+    Decorator for caching async function results (same options as cached;
+    stale entries are refreshed by a task on the event loop)
     
     Usage:
         @cached_async(prefix="analysis", ttl=1800)
@@ -166,26 +1106,34 @@ def cached_async(prefix: str, ttl: int = 3600):
             # expensive async operation
             return result
     """
+    distributed = SINGLE_FLIGHT_REDIS if distributed is None else distributed
+
     def decorator(func: Callable) -> Callable:
+        # Redis calls go through the asyncio client, never blocking the loop
+        from utils.async_cache import aget_from_cache, fill_async, schedule_refresh_async
+
+        flight = AsyncSingleFlight(prefix)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = generate_cache_key(prefix, *args, **kwargs)
             
             # Try to get from cache
-            cached_result = get_from_cache(cache_key)
+            cached_result = await aget_from_cache(cache_key)
             if cached_result is not None:
                 logger.debug(f"✅ Cache HIT: {prefix} - {cache_key[:16]}...")
-                return cached_result
+                if soft_ttl and _is_stale(cached_result):
+                    _swr_count(prefix, "stale_served")
+                    schedule_refresh_async(prefix, cache_key, lambda: func(*args, **kwargs), ttl, soft_ttl)
+                return _unwrap(cached_result)
             
             # Cache miss - compute result
             logger.debug(f"⚠️ Cache MISS: {prefix} - {cache_key[:16]}...")
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
-            set_in_cache(cache_key, result, ttl)
-            
-            return result
+            fill = lambda: fill_async(cache_key, lambda: func(*args, **kwargs), ttl, distributed, soft_ttl)
+            if not single_flight:
+                return await fill()
+            return await flight.do(cache_key, fill)
         
         wrapper.clear_cache = lambda: clear_cache(prefix)
         wrapper.cache_key = lambda *args, **kwargs: generate_cache_key(prefix, *args, **kwargs)
@@ -194,28 +1142,155 @@ def cached_async(prefix: str, ttl: int = 3600):
     return decorator
 
 
+def _batch_keys(prefix: str, items: List[Any], args, kwargs) -> Tuple[List[str], Dict[str, Any]]:
+    """Per-item keys, and the distinct keys each with its item"""
+    keys = [generate_cache_key(prefix, item, *args, **kwargs) for item in items]
+    return keys, dict(zip(keys, items))
+
+
+def _merge_batch(prefix: str, keys: List[str], found: Dict[str, Any], missing: List[str], results) -> Tuple[List[Any], Dict[str, Any]]:
+    """The results in item order, and the computed entries worth caching"""
+    results = list(results)
+    if len(results) != len(missing):
+        raise ValueError(f"{prefix}: batch function returned {len(results)} results for {len(missing)} items")
+    computed = dict(zip(missing, results))
+    found.update(computed)
+    _count("batch_hits", len(keys) - len(missing))
+    _count("batch_misses", len(missing))
+    fresh = {key: value for key, value in computed.items() if value is not None and not isinstance(value, BaseException)}
+    return [found[key] for key in keys], fresh
+
+
+def cached_batch(prefix: str, ttl: int = 3600):
+    """
+    Decorator for functions that map a list of items to a list of results
+    (same length, same order). Each item is cached on its own key: a call
+    looks them all up with get_many, passes only the missing items to the
+    function, in one call, and stores the new results with set_many. The
+    other arguments are part of every item's key. None results aren't cached,
+    nor are exceptions returned in place of a result (a per-item failure).
+    
+    Usage:
+        @cached_batch(prefix="embeddings", ttl=86400)
+        def embed_texts(texts, tier="fast"):
+            return model.encode(texts)
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(items, *args, **kwargs):
+            keys, by_key = _batch_keys(prefix, list(items), args, kwargs)
+            found = get_many(keys)
+            missing = [key for key in by_key if key not in found]
+            results = []
+            if missing:
+                logger.debug(f"⚠️ Cache MISS: {prefix} - {len(missing)}/{len(keys)} items")
+                results = func([by_key[key] for key in missing], *args, **kwargs)
+            ordered, fresh = _merge_batch(prefix, keys, found, missing, results)
+            set_many(fresh, ttl)
+            return ordered
+
+        wrapper.clear_cache = lambda: clear_cache(prefix)
+        wrapper.cache_key = lambda item, *args, **kwargs: generate_cache_key(prefix, item, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cached_batch_async(prefix: str, ttl: int = 3600):
+    """cached_batch for async functions, through the asyncio client"""
+    def decorator(func: Callable) -> Callable:
+        from utils.async_cache import aget_many, aset_many
+
+        @wraps(func)
+        async def wrapper(items, *args, **kwargs):
+            keys, by_key = _batch_keys(prefix, list(items), args, kwargs)
+            found = await aget_many(keys)
+            missing = [key for key in by_key if key not in found]
+            results = []
+            if missing:
+                logger.debug(f"⚠️ Cache MISS: {prefix} - {len(missing)}/{len(keys)} items")
+                results = await func([by_key[key] for key in missing], *args, **kwargs)
+            ordered, fresh = _merge_batch(prefix, keys, found, missing, results)
+            await aset_many(fresh, ttl)
+            return ordered
+
+        wrapper.clear_cache = lambda: clear_cache(prefix)
+        wrapper.cache_key = lambda item, *args, **kwargs: generate_cache_key(prefix, item, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def get_cache_stats() -> dict:
     """Get cache statistics"""
     redis_client = get_redis_client()
+    redis_stats = None
     
+    if redis_client:
+        try:
+            redis_stats = _redis_server_stats(
+                redis_client.info('stats'), redis_client.dbsize(), redis_client.info('memory')
+            )
+            _redis_ok()
+        except Exception as e:
+            _redis_failed("stats", e)
+
+    return _cache_stats(redis_stats)
+
+
+def _redis_server_stats(info: dict, keys: int, memory: dict) -> dict:
+    return {
+        'backend': 'redis',
+        'redis_available': True,
+        'redis_keys': keys,
+        'redis_hits': info.get('keyspace_hits', 0),
+        'redis_misses': info.get('keyspace_misses', 0),
+        'redis_memory': memory.get('used_memory_human', 'N/A')
+    }
+
+
+def _cache_stats(redis_stats: Optional[dict]) -> dict:
+    """Everything reported by get_cache_stats, given what Redis said (None if unreachable)"""
+    # cache_snapshot builds on this module
+    from utils.cache_snapshot import get_snapshot_stats
+
     stats = {
         'backend': 'memory',
-        'memory_items': len(_memory_cache),
-        'redis_available': False
+        'memory_items': len(get_memory_cache()),
+        'memory': get_memory_cache().stats(),
+        'redis_available': False,
+        'redis_target': _redis_target() if REDIS_ENABLED else None,
     }
-    
-    if redis_client:
+    stats.update(redis_stats or {})
+    disk = get_disk_tier()
+    if disk is not None:
         try:
-            info = redis_client.info('stats')
-            stats.update({
-                'backend': 'redis',
-                'redis_available': True,
-                'redis_keys': redis_client.dbsize(),
-                'redis_hits': info.get('keyspace_hits', 0),
-                'redis_misses': info.get('keyspace_misses', 0),
-                'redis_memory': redis_client.info('memory').get('used_memory_human', 'N/A')
-            })
+            stats.update({'backend': 'disk', 'disk': disk.stats()})
         except Exception as e:
-            logger.warning(f"Redis stats error: {e}")
+            _disk_failed("stats", e)
+
+    with _stats_lock:
+        stats['tiers'] = {
+            'l1_ttl_seconds': L1_TTL,
+            'write_behind': CACHE_WRITE_BEHIND,
+            'write_behind_pending': _write_behind.pending() if _write_behind else 0,
+            'invalidation_listener': _listener_pid == os.getpid(),
+            **_stats,
+        }
+    stats['single_flight'] = get_single_flight_stats()
+    with _stats_lock:
+        stats['stale_while_revalidate'] = {
+            'refreshing': len(_refreshing),
+            'prefixes': {prefix: dict(counts) for prefix, counts in _swr_stats.items()},
+        }
+    stats['hot_keys'] = get_hot_keys().stats()
+    stats['snapshot'] = get_snapshot_stats()
+    stats['namespaces'] = {ns: namespace_version(ns) for ns in sorted(_namespaces_seen.copy())}
+    stats['reclaim'] = get_reclaimer().stats()
+    stats['redis_breaker'] = _redis_breaker.stats()
+    if _redis_pool is not None:
+        stats['redis_pool'] = {
+            'max_connections': _redis_pool.max_connections,
+            'in_use': len(getattr(_redis_pool, '_in_use_connections', ())),
+            'idle': len(getattr(_redis_pool, '_available_connections', ())),
+        }
     
     return stats
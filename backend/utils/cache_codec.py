@@ -0,0 +1,354 @@
+# backend/utils/cache_codec.py
+"""
+Serialization of cache values and derivation of cache keys.
+
+Values written to Redis are framed as
+
+    b"HSC" | format version (1 byte) | codec id (1 byte) | compression id (1 byte) | payload
+
+The default codec is msgpack. Numpy arrays and scalars are encoded natively,
+tuples and sets keep their type, and dataclasses and enums are encoded only
+if they are on an allowlist. Decoding never runs arbitrary code. Payloads
+above a size threshold are zstd-compressed when `zstandard` is installed.
+Pickle is used only when msgpack is missing or HIRESCOPE_CACHE_CODEC=pickle.
+Reading pickle also has to be enabled, since a shared Redis is not a
+trusted source.
+
+Configuration:
+  HIRESCOPE_CACHE_CODEC               msgpack | pickle (default msgpack when installed)
+  HIRESCOPE_CACHE_ALLOW_PICKLE        1 to decode pickle payloads (default: only when pickle is the codec)
+  HIRESCOPE_CACHE_COMPRESS_MIN_BYTES  compress payloads at least this large (default 4096, 0 = never)
+  HIRESCOPE_CACHE_COMPRESS_LEVEL      zstd level (default 3)
+"""
+
+import dataclasses
+import enum
+import functools
+import hashlib
+import importlib
+import logging
+import operator
+import os
+import pickle
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+MAGIC = b"HSC"
+FORMAT_VERSION = 1
+_HEADER_SIZE = len(MAGIC) + 3
+
+CODEC_PICKLE = 0
+CODEC_MSGPACK = 1
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+
+CACHE_CODEC = os.getenv("HIRESCOPE_CACHE_CODEC", "msgpack" if MSGPACK_AVAILABLE else "pickle")
+ALLOW_PICKLE = os.getenv("HIRESCOPE_CACHE_ALLOW_PICKLE", "1" if CACHE_CODEC == "pickle" else "0") == "1"
+COMPRESS_MIN_BYTES = int(os.getenv("HIRESCOPE_CACHE_COMPRESS_MIN_BYTES", "4096"))
+COMPRESS_LEVEL = int(os.getenv("HIRESCOPE_CACHE_COMPRESS_LEVEL", "3"))
+
+# msgpack extension type codes
+_EXT_NDARRAY = 1
+_EXT_TUPLE = 2
+_EXT_SET = 3
+_EXT_DATACLASS = 4
+_EXT_ENUM = 5
+
+# Types that may be stored and rebuilt, by short tag (written into payloads)
+_ALLOWED_TYPES = {
+    "WeightedKeyword": "core.weighted_matching.WeightedKeyword",
+    "RequirementType": "core.weighted_matching.RequirementType",
+    "SkillLevel": "core.skill_detection.SkillLevel",
+}
+_TAGS = {path: tag for tag, path in _ALLOWED_TYPES.items()}
+_resolved_types: Dict[bytes, type] = {}
+
+
+class CodecError(ValueError):
+    """A value can't be encoded, or a payload can't (or must not) be decoded"""
+
+
+def register_type(cls: type, tag: Optional[str] = None):
+    """Allow a dataclass or Enum to be stored in and rebuilt from the cache"""
+    tag = tag or cls.__qualname__
+    if _ALLOWED_TYPES.get(tag, _type_name(cls)) != _type_name(cls):
+        raise ValueError(f"cache codec tag {tag!r} is already used by {_ALLOWED_TYPES[tag]}")
+    _ALLOWED_TYPES[tag] = _type_name(cls)
+    _TAGS[_type_name(cls)] = tag
+    _resolved_types[tag.encode()] = cls
+    _encoder.cache_clear()
+    return cls
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple:
+    return tuple(f.name for f in dataclasses.fields(cls))
+
+
+def _resolve_type(tag: bytes) -> type:
+    cls = _resolved_types.get(tag)
+    if cls is None:
+        path = _ALLOWED_TYPES.get(tag.decode(errors="replace"))
+        if path is None:
+            raise CodecError(f"type {tag!r} is not allowed in cache payloads")
+        module_name, _, qualname = path.rpartition(".")
+        cls = _resolved_types[tag] = getattr(importlib.import_module(module_name), qualname)
+    return cls
+
+
+# --- msgpack -----------------------------------------------------------------
+#
+# Non-native values are packed in a single pass as an array whose first item
+# is an extension "marker" naming what the rest is: [marker, *items]. On
+# decode, ext_hook turns the marker back into a _Marker and list_hook
+# rebuilds the value once its array is complete.
+
+class _Marker:
+    __slots__ = ("code", "data")
+
+    def __init__(self, code: int, data: bytes):
+        self.code = code
+        self.data = data
+
+
+def _packer():
+    packer = getattr(_local, "packer", None)
+    if packer is None:
+        # Building a Packer costs more than packing a small value
+        packer = _local.packer = msgpack.Packer(default=_default, strict_types=True, use_bin_type=True)
+    return packer
+
+
+_local = threading.local()
+_TUPLE_MARKER = msgpack.ExtType(_EXT_TUPLE, b"") if MSGPACK_AVAILABLE else None
+_SET_MARKER = msgpack.ExtType(_EXT_SET, b"") if MSGPACK_AVAILABLE else None
+
+def _pack(value: Any) -> bytes:
+    packer = _packer()
+    try:
+        return packer.pack(value)
+    except BaseException:
+        packer.reset()
+        raise
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_Marker, list_hook=_list_hook, raw=False, strict_map_key=False)
+
+
+def _default(obj: Any):
+    return _encoder(type(obj))(obj)
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder(cls: type) -> Callable[[Any], Any]:
+    """How to turn instances of cls into msgpack-native values (looked up once per type)"""
+    if issubclass(cls, np.ndarray):
+        return _encode_array
+    if issubclass(cls, np.generic):
+        return lambda obj: obj.item()
+    if issubclass(cls, tuple):
+        return lambda obj: [_TUPLE_MARKER, *obj]
+    if issubclass(cls, (set, frozenset)):
+        return lambda obj: [_SET_MARKER, *obj]
+    if issubclass(cls, enum.Enum) or dataclasses.is_dataclass(cls):
+        tag = _TAGS.get(_type_name(cls))
+        if tag is None:
+            return _refuse
+        if issubclass(cls, enum.Enum):
+            marker = msgpack.ExtType(_EXT_ENUM, tag.encode())
+            return lambda obj: [marker, obj.value]
+        marker = msgpack.ExtType(_EXT_DATACLASS, tag.encode())
+        getter = operator.attrgetter(*_field_names(cls))
+        if len(_field_names(cls)) == 1:
+            return lambda obj: [marker, getter(obj)]
+        return lambda obj: [marker, *getter(obj)]
+    # Subclasses of builtins are strict-typed out of msgpack's fast path
+    for base in (bool, str, int, float, bytes, list, dict):
+        if issubclass(cls, base):
+            return base
+    return _refuse
+
+
+def _encode_array(array: np.ndarray):
+    if array.dtype.hasobject:
+        raise CodecError("object arrays can't be cached")
+    array = np.ascontiguousarray(array)
+    return [msgpack.ExtType(_EXT_NDARRAY, array.dtype.str.encode()), list(array.shape), memoryview(array).cast("B")]
+
+
+def _refuse(obj: Any):
+    raise CodecError(f"can't encode {_type_name(type(obj))}; register it with register_type()")
+
+
+def _list_hook(items: list):
+    if not items or type(items[0]) is not _Marker:
+        return items
+    marker = items[0]
+    if marker.code == _EXT_TUPLE:
+        return tuple(items[1:])
+    if marker.code == _EXT_SET:
+        return set(items[1:])
+    if marker.code == _EXT_NDARRAY:
+        dtype = np.dtype(marker.data.decode())
+        if dtype.hasobject:
+            raise CodecError("object arrays can't be decoded")
+        _, shape, buffer = items
+        return np.frombuffer(buffer, dtype=dtype).reshape(shape).copy()
+    if marker.code == _EXT_ENUM:
+        cls = _resolve_type(marker.data)
+        # Direct member lookup skips Enum.__call__'s slow path
+        member = cls._value2member_map_.get(items[1])
+        return member if member is not None else cls(items[1])
+    if marker.code == _EXT_DATACLASS:
+        # Fields were written in definition order, which is __init__'s order
+        return _resolve_type(marker.data)(*items[1:])
+    raise CodecError(f"unknown extension type {marker.code}")
+
+
+# --- Framing -----------------------------------------------------------------
+
+_COMPRESS_SAMPLE = 4 * 1024
+
+def _zstd():
+    # zstandard's (de)compressor objects aren't thread-safe: one pair per thread
+    pair = getattr(_local, "zstd", None)
+    if pair is None:
+        pair = _local.zstd = (zstandard.ZstdCompressor(level=COMPRESS_LEVEL), zstandard.ZstdDecompressor())
+    return pair
+
+
+def _compressible(payload: bytes) -> bool:
+    """Skip zstd for large payloads whose first slice barely shrinks (e.g. float embeddings)"""
+    if len(payload) <= 16 * _COMPRESS_SAMPLE:
+        return True
+    sample = memoryview(payload)[:_COMPRESS_SAMPLE]
+    return len(_zstd()[0].compress(sample)) < _COMPRESS_SAMPLE * 0.8
+
+
+def encode(value: Any, codec: Optional[str] = None) -> bytes:
+    """Serialize a cache value into a framed payload"""
+    codec = codec or CACHE_CODEC
+    if codec == "msgpack" and MSGPACK_AVAILABLE:
+        codec_id = CODEC_MSGPACK
+        try:
+            payload = _pack(value)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise CodecError(str(e)) from e
+    else:
+        codec_id = CODEC_PICKLE
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    compression = COMPRESSION_NONE
+    if ZSTD_AVAILABLE and 0 < COMPRESS_MIN_BYTES <= len(payload) and _compressible(payload):
+        compressed = _zstd()[0].compress(payload)
+        if len(compressed) < len(payload) * 0.9:
+            payload, compression = compressed, COMPRESSION_ZSTD
+    return MAGIC + bytes((FORMAT_VERSION, codec_id, compression)) + payload
+
+
+def decode(data: bytes) -> Any:
+    """Deserialize a framed payload; raises CodecError for anything untrusted or unknown"""
+    if len(data) < _HEADER_SIZE or data[:len(MAGIC)] != MAGIC:
+        raise CodecError("not a framed cache payload")
+    version, codec_id, compression = data[len(MAGIC):_HEADER_SIZE]
+    if version != FORMAT_VERSION:
+        raise CodecError(f"unsupported cache format version {version}")
+    payload = memoryview(data)[_HEADER_SIZE:]
+
+    if compression == COMPRESSION_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise CodecError("payload is zstd-compressed but zstandard is not installed")
+        payload = _zstd()[1].decompress(payload)
+    elif compression != COMPRESSION_NONE:
+        raise CodecError(f"unknown compression {compression}")
+
+    if codec_id == CODEC_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise CodecError("payload is msgpack but msgpack is not installed")
+        try:
+            return _unpack(payload)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(str(e)) from e
+    if codec_id == CODEC_PICKLE:
+        if not ALLOW_PICKLE:
+            raise CodecError("pickle payloads are disabled (HIRESCOPE_CACHE_ALLOW_PICKLE)")
+        return pickle.loads(payload)
+    raise CodecError(f"unknown codec {codec_id}")
+
+
+# --- Cache keys --------------------------------------------------------------
+
+# Strings are hashed in slices of this many characters, so a large JD is
+# never copied into one big JSON string first
+_HASH_CHUNK = 1 << 16
+
+
+def _feed(h, value: Any):
+    """Feed a type-tagged, unambiguous encoding of value into hash h"""
+    if value is None or isinstance(value, (bool, int, float)) and not isinstance(value, enum.Enum):
+        h.update(b"v%s;" % repr(value).encode())
+    elif isinstance(value, str):
+        h.update(b"s%d:" % len(value))
+        for start in range(0, len(value), _HASH_CHUNK):
+            h.update(value[start:start + _HASH_CHUNK].encode("utf-8", "surrogatepass"))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        h.update(b"b%d:" % len(value))
+        h.update(value)
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        h.update(b"a%s%s:" % (array.dtype.str.encode(), repr(array.shape).encode()))
+        h.update(memoryview(array).cast("B"))
+    elif isinstance(value, np.generic):
+        _feed(h, value.item())
+    elif isinstance(value, enum.Enum):
+        h.update(b"e%s:" % _type_name(type(value)).encode())
+        _feed(h, value.value)
+    elif isinstance(value, dict):
+        h.update(b"d%d:" % len(value))
+        for key in sorted(value, key=repr):
+            _feed(h, key)
+            _feed(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(b"l%d:" % len(value))
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, (set, frozenset)):
+        _feed(h, sorted(value, key=repr))
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        h.update(b"c%s:" % _type_name(type(value)).encode())
+        _feed(h, {f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+    else:
+        raise TypeError(f"can't derive a cache key from {type(value).__name__}")
+
+
+def hash_arguments(args: Iterable[Any], kwargs: Dict[str, Any]) -> str:
+    """Stable 128-bit hex digest of positional and keyword arguments"""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, list(args))
+    _feed(h, dict(kwargs))
+    return h.hexdigest()
@@ -0,0 +1,178 @@
+# backend/utils/cache_snapshot.py
+"""
+Warm start for the in-process cache across restarts.
+
+On shutdown, the hottest keys (utils.hot_keys) that are still in L1 are
+written to a snapshot file with their absolute expiry times, hottest first
+until the size cap. During startup warmup they are loaded back into L1.
+The shared tiers (Redis, the disk cache) already outlive a restart; the
+snapshot is what keeps the memory-only backend from starting cold. With a
+shared tier, restored entries are kept for at most L1_TTL, like any L1 copy.
+
+A snapshot is discarded whole when its format, codec or pipeline version
+differs from the running code, or when it is older than the maximum age.
+Single entries are skipped when they have expired since, or when their
+namespace was cleared (the version embedded in the key no longer matches).
+
+Configuration:
+  HIRESCOPE_CACHE_SNAPSHOT                  0 disables saving and restoring (default 1)
+  HIRESCOPE_CACHE_SNAPSHOT_PATH             file (default <disk cache dir>/hot-entries.snapshot)
+  HIRESCOPE_CACHE_SNAPSHOT_MB               size cap of the encoded entries (default 32)
+  HIRESCOPE_CACHE_SNAPSHOT_MAX_AGE_SECONDS  older snapshots are ignored (default 86400)
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from utils.cache import L1_TTL, has_shared_tier, namespace_version
+from utils.cache_codec import FORMAT_VERSION, CodecError, decode, encode
+from utils.disk_cache import DISK_CACHE_DIR
+from utils.hot_keys import get_hot_keys
+from utils.memory_cache import get_memory_cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ENABLED = os.getenv("HIRESCOPE_CACHE_SNAPSHOT", "1") != "0"
+SNAPSHOT_PATH = os.getenv("HIRESCOPE_CACHE_SNAPSHOT_PATH", os.path.join(DISK_CACHE_DIR, "hot-entries.snapshot"))
+SNAPSHOT_MAX_MB = float(os.getenv("HIRESCOPE_CACHE_SNAPSHOT_MB", "32"))
+SNAPSHOT_MAX_AGE = float(os.getenv("HIRESCOPE_CACHE_SNAPSHOT_MAX_AGE_SECONDS", "86400"))
+
+SNAPSHOT_FORMAT = 1
+
+_last = {"save": None, "restore": None}
+
+
+def _pipeline_version() -> int:
+    from core.pipeline import PIPELINE_VERSION
+    return PIPELINE_VERSION
+
+
+def save_cache_snapshot(path: str = SNAPSHOT_PATH, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Write the hottest L1 entries to `path` (call on shutdown)"""
+    if not SNAPSHOT_ENABLED:
+        return {"saved": 0, "reason": "disabled"}
+    max_bytes = int(SNAPSHOT_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    started = time.perf_counter()
+    l1 = get_memory_cache()
+    now = time.time()
+    entries, size, skipped = [], 0, 0
+
+    for key, hits in get_hot_keys().hottest():
+        entry = l1.peek(key)
+        if entry is None:
+            continue
+        value, remaining = entry
+        try:
+            data = encode(value)
+        except CodecError:
+            skipped += 1
+            continue
+        if size + len(data) > max_bytes:
+            # A smaller, colder entry may still fit
+            skipped += 1
+            continue
+        entries.append([key, now + remaining if remaining is not None else None, hits, data])
+        size += len(data)
+
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "codec": FORMAT_VERSION,
+        "pipeline": _pipeline_version(),
+        "created_at": now,
+        "entries": entries,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Workers shut down together: write aside, then swap in atomically
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode(snapshot))
+    os.replace(tmp_path, path)
+
+    result = {"saved": len(entries), "bytes": size, "skipped": skipped, "seconds": round(time.perf_counter() - started, 3)}
+    _last["save"] = result
+    logger.info(f"💾 Cache snapshot saved: {len(entries)} entries, {size / 1024:.0f}KB")
+    return result
+
+
+def _discard_reason(snapshot: Any, now: float) -> Optional[str]:
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return "unknown snapshot format"
+    if snapshot.get("codec") != FORMAT_VERSION:
+        return "codec version changed"
+    if snapshot.get("pipeline") != _pipeline_version():
+        return "pipeline version changed"
+    if now - snapshot.get("created_at", 0) > SNAPSHOT_MAX_AGE:
+        return "snapshot too old"
+    return None
+
+
+def restore_cache_snapshot(path: str = SNAPSHOT_PATH) -> Dict[str, Any]:
+    """Load a snapshot's still-valid entries into L1 (run by the startup warmup)"""
+    if not SNAPSHOT_ENABLED:
+        return {"restored": 0, "reason": "disabled"}
+    if not os.path.exists(path):
+        return {"restored": 0, "reason": "no snapshot"}
+    started = time.perf_counter()
+    now = time.time()
+    try:
+        with open(path, "rb") as f:
+            snapshot = decode(f.read())
+    except (OSError, CodecError) as e:
+        snapshot, reason = None, f"unreadable: {e}"
+    else:
+        reason = _discard_reason(snapshot, now)
+    if reason:
+        logger.info(f"🗑️ Cache snapshot discarded ({reason})")
+        _last["restore"] = {"restored": 0, "reason": reason}
+        return _last["restore"]
+
+    l1 = get_memory_cache()
+    hot_keys = get_hot_keys()
+    # With a shared tier, L1 holds entries for at most L1_TTL (as in
+    # set_in_cache), so other workers' rewrites of a key show up soon
+    shared = has_shared_tier()
+    restored, expired, stale = 0, 0, 0
+    for key, expires_at, hits, data in snapshot["entries"]:
+        ttl = expires_at - now if expires_at is not None else None
+        if ttl is not None and ttl <= 0:
+            expired += 1
+            continue
+        namespace, _, rest = key.partition(":")
+        if rest.split(":", 1)[0] != namespace_version(namespace):
+            stale += 1
+            continue
+        try:
+            value = decode(data)
+        except CodecError:
+            stale += 1
+            continue
+        if shared:
+            ttl = min(ttl, L1_TTL) if ttl is not None else L1_TTL
+        if l1.set(key, value, ttl):
+            # Carry the counts over, so a quiet run doesn't lose the hot set
+            hot_keys.record(key, hits)
+            restored += 1
+
+    result = {
+        "restored": restored,
+        "expired": expired,
+        "stale": stale,
+        "age_seconds": round(now - snapshot["created_at"], 1),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    _last["restore"] = result
+    logger.info(f"✅ Cache snapshot restored: {restored} entries ({expired} expired, {stale} stale)")
+    return result
+
+
+def get_snapshot_stats() -> Dict[str, Any]:
+    return {
+        "enabled": SNAPSHOT_ENABLED,
+        "path": SNAPSHOT_PATH,
+        "last_save": _last["save"],
+        "last_restore": _last["restore"],
+    }
@@ -0,0 +1,133 @@
+# backend/utils/circuit_breaker.py
+"""
+Circuit breaker for optional backends (Redis).
+
+closed     calls go through; consecutive failures are counted
+open       calls are skipped until the retry delay has passed
+half-open  one probe call goes through; success closes the breaker,
+           failure re-opens it with the delay doubled (up to a maximum).
+           A probe that reports no outcome within reset_timeout is
+           given up on, and the next caller probes instead
+
+Callers ask `allow()` before touching the backend and report the outcome
+with `record_success()` / `record_failure()`.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open breaker with exponential backoff"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 300.0,
+        backoff_factor: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.backoff_factor = backoff_factor
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CLOSED
+        self._failures = 0
+        self._retry_delay = reset_timeout
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._probe_started_at: Optional[float] = None
+
+        self.total_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self._retry_delay:
+                self._state = HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether the caller may use the backend now (half-open admits one probe)"""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                now = self._clock()
+                if not self._probe_in_flight or now - self._probe_started_at >= self.reset_timeout:
+                    self._probe_in_flight = True
+                    self._probe_started_at = now
+                    return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"✅ Circuit '{self.name}' closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._retry_delay = self.reset_timeout
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            if error is not None:
+                self.last_error = str(error)
+            if self._state == HALF_OPEN:
+                # The probe failed: back off further before the next one
+                self._retry_delay = min(self._retry_delay * self.backoff_factor, self.max_reset_timeout)
+                self._open()
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        logger.warning(
+            f"⚠️ Circuit '{self.name}' open after {self._failures} failure(s), "
+            f"retrying in {self._retry_delay:.0f}s: {self.last_error}"
+        )
+
+    def reset(self):
+        self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self._opened_at + self._retry_delay - self._clock()), 1)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "total_failures": self.total_failures,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected,
+                "retry_delay_seconds": self._retry_delay,
+                "retry_in_seconds": retry_in,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,335 @@
+# backend/utils/disk_cache.py
+"""
+Shared cache backend on local disk: one SQLite database in WAL mode.
+
+A stand-in for Redis on hosts that have none (Spaces, Render free tier,
+docker-compose). Every worker process on the host opens the same file, so
+an entry computed by one worker is a hit for the others, and entries
+survive restarts. WAL lets readers proceed while one process writes;
+writers wait up to busy_timeout for each other.
+
+Entries carry an absolute expiry time (wall clock, shared by processes).
+Expired rows are skipped on read and deleted by a sweep that set() runs at
+most every sweep_interval seconds. When the stored bytes exceed max_bytes,
+the least recently read entries are deleted down to 90% of the budget and
+the freed pages are returned to the filesystem.
+
+Configuration:
+  HIRESCOPE_DISK_CACHE_DIR             directory of the database (default ~/.cache/hirescope/cache)
+  HIRESCOPE_DISK_CACHE_MB              size budget (default 512)
+  HIRESCOPE_DISK_CACHE_SWEEP_SECONDS   expiry sweep interval (default 300)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DISK_CACHE_DIR = os.getenv(
+    "HIRESCOPE_DISK_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "hirescope", "cache"),
+)
+DISK_CACHE_MB = float(os.getenv("HIRESCOPE_DISK_CACHE_MB", "512"))
+DISK_CACHE_SWEEP_SECONDS = float(os.getenv("HIRESCOPE_DISK_CACHE_SWEEP_SECONDS", "300"))
+
+# Reads only refresh an entry's recency when it is older than this, so hits
+# rarely need a write
+_ACCESS_RESOLUTION = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+    BEGIN UPDATE totals SET bytes = bytes + new.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+    BEGIN UPDATE totals SET bytes = bytes - old.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+    BEGIN UPDATE totals SET bytes = bytes - old.size + new.size; END;
+CREATE TABLE IF NOT EXISTS versions (namespace TEXT PRIMARY KEY, version INTEGER NOT NULL);
+"""
+
+
+_UPSERT = (
+    "INSERT INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+    "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at"
+)
+
+
+class DiskCache:
+    """Process- and thread-safe key/value store with TTLs and a byte budget"""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        sweep_interval: float = 300.0,
+        busy_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.sweep_interval = sweep_interval
+        self.busy_timeout = busy_timeout
+        self._clock = clock
+        # One connection per thread. SQLite handles must not be used across
+        # fork(): a child abandons the inherited ones and opens its own
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _instances.add(self)
+        db = self._db()
+        # auto_vacuum only takes effect before the first table exists
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        db.executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode = WAL")
+            # Durable enough for a cache, and no fsync per write
+            db.execute("PRAGMA synchronous = NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+            with self._connections_lock:
+                self._connections.append(db)
+        return db
+
+    def close(self):
+        """Close every connection this process opened (other threads' included)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+        self._local = threading.local()
+
+    def _abandon_connections(self):
+        # Runs in a forked child. Closing an inherited handle could checkpoint
+        # or delete the parent's WAL, so they are kept open and never used
+        _abandoned.extend(self._connections)
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._local = threading.local()
+
+    def get_raw(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(stored bytes, seconds left or None for no expiry), or None on a miss"""
+        now = self._clock()
+        row = self._db().execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            self.misses += 1
+            return None
+        if now - row[2] > _ACCESS_RESOLUTION:
+            self._db().execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return row[0], (row[1] - now if row[1] is not None else None)
+
+    def get_many_raw(self, keys: List[str]) -> Dict[str, Tuple[bytes, Optional[float]]]:
+        """get_raw for several keys in one query; only the keys found are returned"""
+        now = self._clock()
+        db = self._db()
+        found, touched = {}, []
+        # Stay under SQLite's limit on bound parameters
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = db.execute(
+                f"SELECT key, value, expires_at, accessed_at FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for key, value, expires_at, accessed_at in rows:
+                if expires_at is not None and expires_at <= now:
+                    continue
+                found[key] = value, (expires_at - now if expires_at is not None else None)
+                if now - accessed_at > _ACCESS_RESOLUTION:
+                    touched.append((now, key))
+        if touched:
+            db.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?", touched)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_raw(self, key: str, data: bytes, ttl: Optional[float] = None) -> bool:
+        """Store bytes for ttl seconds (None = no expiry); False if larger than the budget"""
+        if len(data) > self.max_bytes:
+            return False
+        now = self._clock()
+        expires_at = now + ttl if ttl is not None and ttl > 0 else None
+        db = self._db()
+        db.execute(_UPSERT, (key, sqlite3.Binary(data), len(data) + len(key), expires_at, now))
+        self._after_write(db, now)
+        return True
+
+    def set_many_raw(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> int:
+        """set_raw for several entries in one transaction; returns how many were stored"""
+        now = self._clock()
+        expires_at = now + ttl if ttl is not None and ttl > 0 else None
+        rows = [
+            (key, sqlite3.Binary(data), len(data) + len(key), expires_at, now)
+            for key, data in items.items() if len(data) <= self.max_bytes
+        ]
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(_UPSERT, rows)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._after_write(db, now)
+        return len(rows)
+
+    def _after_write(self, db: sqlite3.Connection, now: float):
+        if now >= self._next_sweep:
+            self.expire()
+        if self._stored_bytes(db) > self.max_bytes:
+            self.compact()
+
+    def delete(self, key: str) -> bool:
+        return self._db().execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        """Delete every entry, or those whose key starts with prefix; returns the count"""
+        db = self._db()
+        if prefix is None:
+            return db.execute("DELETE FROM entries").rowcount
+        # A range on the primary key instead of LIKE, which can't use the index
+        return db.execute(
+            "DELETE FROM entries WHERE key >= ? AND key < ?", (prefix, prefix + "\U0010ffff")
+        ).rowcount
+
+    def expire(self) -> int:
+        """Delete expired entries now; returns the count"""
+        now = self._clock()
+        self._next_sweep = now + self.sweep_interval
+        count = self._db().execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self.expirations += count
+        return count
+
+    def compact(self) -> int:
+        """Delete the least recently read entries down to 90% of the budget; returns the count"""
+        db = self._db()
+        evicted = 0
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have compacted while we waited for the lock
+            excess = self._stored_bytes(db) - int(self.max_bytes * 0.9)
+            if excess > 0:
+                victims = []
+                for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                db.executemany("DELETE FROM entries WHERE key = ?", victims)
+                evicted = len(victims)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        # Give the freed pages back to the filesystem
+        db.execute("PRAGMA incremental_vacuum")
+        self.evictions += evicted
+        if evicted:
+            logger.info(f"🧹 Disk cache compacted: {evicted} entries evicted")
+        return evicted
+
+    @staticmethod
+    def _stored_bytes(db: sqlite3.Connection) -> int:
+        return db.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+
+    def incr_version(self, namespace: str) -> int:
+        """Bump a namespace version shared by every process; returns the new version"""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT INTO versions VALUES (?, 1) ON CONFLICT (namespace) DO UPDATE SET version = version + 1",
+                (namespace,),
+            )
+            version = db.execute("SELECT version FROM versions WHERE namespace = ?", (namespace,)).fetchone()[0]
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return version
+
+    def versions(self) -> Dict[str, int]:
+        return dict(self._db().execute("SELECT namespace, version FROM versions").fetchall())
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        db = self._db()
+        lookups = self.hits + self.misses
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "path": self.path,
+            "items": len(self),
+            "bytes": self._stored_bytes(db),
+            "max_bytes": self.max_bytes,
+            "file_bytes": page_size * db.execute("PRAGMA page_count").fetchone()[0],
+            # Counters are this process's; the entries are shared
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_instances: "weakref.WeakSet[DiskCache]" = weakref.WeakSet()
+_abandoned: List[sqlite3.Connection] = []
+
+def _after_fork_in_child():
+    for instance in list(_instances):
+        instance._abandon_connections()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+# Singleton instance
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+def get_disk_cache() -> DiskCache:
+    """Get or create the process's handle on the shared disk cache"""
+    global _disk_cache
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = DiskCache(
+                    os.path.join(DISK_CACHE_DIR, "cache.sqlite3"),
+                    max_bytes=int(DISK_CACHE_MB * 1024 * 1024),
+                    sweep_interval=DISK_CACHE_SWEEP_SECONDS,
+                )
+                logger.info(f"✅ Disk cache ready ({_disk_cache.path}, {DISK_CACHE_MB:.0f}MB budget)")
+    return _disk_cache
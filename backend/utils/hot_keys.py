@@ -0,0 +1,107 @@
+# backend/utils/hot_keys.py
+"""
+Heavy-hitter tracking of cache keys, per key prefix.
+
+Each prefix (the cache namespace, e.g. "jd_keywords") gets a space-saving
+counter (Metwally et al.): it keeps at most `capacity` keys, and a new key
+replaces the one with the lowest count, inheriting that count as its error
+bound. Any key requested more often than 1/capacity of the lookups is
+guaranteed to be in the list, whatever the length of the stream. The cache
+snapshot (utils.cache_snapshot) uses it to pick the entries worth keeping
+across a restart.
+
+Configuration:
+  HIRESCOPE_HOT_KEYS_PER_PREFIX   keys tracked per prefix (default 256)
+"""
+
+import heapq
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+HOT_KEYS_PER_PREFIX = int(os.getenv("HIRESCOPE_HOT_KEYS_PER_PREFIX", "256"))
+
+
+class SpaceSaving:
+    """Approximate top-k counts of a stream in O(capacity) memory (not thread-safe)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._counts: Dict[str, List[int]] = {}  # item -> [count, error]
+        # One (count, item) per tracked item; counts here may lag behind
+        # _counts, never lead, so the heap is repaired lazily at the top
+        self._heap: List[Tuple[int, str]] = []
+
+    def offer(self, item: str, count: int = 1):
+        entry = self._counts.get(item)
+        if entry is not None:
+            entry[0] += count
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[item] = [count, 0]
+            heapq.heappush(self._heap, (count, item))
+            return
+        while True:
+            floor, victim = self._heap[0]
+            actual = self._counts[victim][0]
+            if actual == floor:
+                break
+            heapq.heapreplace(self._heap, (actual, victim))
+        del self._counts[victim]
+        self._counts[item] = [floor + count, floor]
+        heapq.heapreplace(self._heap, (floor + count, item))
+
+    def top(self, n: int = None) -> List[Tuple[str, int, int]]:
+        """(item, count, error) by descending count; count - error is a lower bound"""
+        ranked = sorted(((item, c, e) for item, (c, e) in self._counts.items()), key=lambda t: -t[1])
+        return ranked[:n] if n is not None else ranked
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+class HotKeys:
+    """Thread-safe space-saving counters per key prefix"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._counters: Dict[str, SpaceSaving] = {}
+
+    def record(self, key: str, count: int = 1):
+        prefix = key.split(":", 1)[0]
+        with self._lock:
+            counter = self._counters.get(prefix)
+            if counter is None:
+                counter = self._counters[prefix] = SpaceSaving(self.capacity)
+            counter.offer(key, count)
+
+    def hottest(self) -> List[Tuple[str, int]]:
+        """Every tracked (key, count), hottest first across prefixes"""
+        with self._lock:
+            ranked = [(key, count) for counter in self._counters.values() for key, count, _ in counter.top()]
+        return sorted(ranked, key=lambda t: -t[1])
+
+    def stats(self, top: int = 5) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                prefix: {
+                    "tracked": len(counter),
+                    "top": [{"key": key, "count": count, "error": error} for key, count, error in counter.top(top)],
+                }
+                for prefix, counter in self._counters.items()
+            }
+
+
+# Singleton instance
+_hot_keys = None
+_hot_keys_lock = threading.Lock()
+
+def get_hot_keys() -> HotKeys:
+    """Get or create the process-wide hot-key tracker"""
+    global _hot_keys
+    if _hot_keys is None:
+        with _hot_keys_lock:
+            if _hot_keys is None:
+                _hot_keys = HotKeys(HOT_KEYS_PER_PREFIX)
+    return _hot_keys
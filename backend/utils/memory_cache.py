@@ -0,0 +1,214 @@
+# backend/utils/memory_cache.py
+"""
+In-process cache backend: LRU within a byte budget, with per-entry TTLs.
+
+Each entry is charged its pickled size, so a batch result counts for what
+it weighs rather than as one item. Expired entries are dropped when they
+are read (lazy) and by a sweep that runs from set() at most every
+sweep_interval seconds (periodic), so no background thread is needed and
+the cache is safe to carry across fork().
+
+Configuration:
+  HIRESCOPE_MEMORY_CACHE_MB              total budget (default 128)
+  HIRESCOPE_MEMORY_CACHE_MAX_ENTRY_MB    largest single entry (default: an eighth of the budget)
+  HIRESCOPE_MEMORY_CACHE_SWEEP_SECONDS   expiry sweep interval (default 60)
+"""
+
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CACHE_MB = float(os.getenv("HIRESCOPE_MEMORY_CACHE_MB", "128"))
+MEMORY_CACHE_MAX_ENTRY_MB = float(os.getenv("HIRESCOPE_MEMORY_CACHE_MAX_ENTRY_MB", str(MEMORY_CACHE_MB / 8)))
+MEMORY_CACHE_SWEEP_SECONDS = float(os.getenv("HIRESCOPE_MEMORY_CACHE_SWEEP_SECONDS", "60"))
+
+_MISSING = object()
+
+# Fixed per-entry charge for the key, the bookkeeping tuple and the dict slot
+_ENTRY_OVERHEAD = 160
+
+
+def entry_size(key: str, value: Any) -> int:
+    """Bytes charged against the budget for one entry"""
+    try:
+        value_size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        value_size = sys.getsizeof(value)
+    return _ENTRY_OVERHEAD + len(key) + value_size
+
+
+class MemoryCache:
+    """Thread-safe LRU cache bounded by total bytes, with TTL expiry"""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_entry_bytes: Optional[int] = None,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = int(max_bytes)
+        self.max_entry_bytes = int(max_entry_bytes or max_bytes)
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, size, expires_at); order is least to most recently used
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._next_sweep = clock() + sweep_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._lookup(key, self._clock(), default)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """The entries found among keys, under a single lock acquisition"""
+        with self._lock:
+            now = self._clock()
+            found = {}
+            for key in keys:
+                value = self._lookup(key, now, _MISSING)
+                if value is not _MISSING:
+                    found[key] = value
+            return found
+
+    def _lookup(self, key: str, now: float, default: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[2] is not None and entry[2] <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """(value, seconds left or None for no expiry) without counting a lookup or refreshing recency"""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self._clock()
+            if entry is None or (entry[2] is not None and entry[2] <= now):
+                return None
+            return entry[0], (entry[2] - now if entry[2] is not None else None)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store value for ttl seconds (None = no expiry); False if it is too large to keep"""
+        size = entry_size(key, value)
+        with self._lock:
+            return self._insert(key, value, size, ttl, self._clock())
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> int:
+        """Store several values under a single lock acquisition; returns how many were kept"""
+        # Sized outside the lock: pickling is the expensive part
+        sized = [(key, value, entry_size(key, value)) for key, value in items.items()]
+        with self._lock:
+            now = self._clock()
+            return sum(self._insert(key, value, size, ttl, now) for key, value, size in sized)
+
+    def _insert(self, key: str, value: Any, size: int, ttl: Optional[float], now: float) -> bool:
+        if now >= self._next_sweep:
+            self._sweep(now)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_entry_bytes:
+            self.rejected += 1
+            return False
+        expires_at = now + ttl if ttl is not None and ttl > 0 else None
+        self._entries[key] = (value, size, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        """Drop every entry, or those whose key starts with prefix; returns the count"""
+        with self._lock:
+            if prefix is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return count
+            keys = [k for k in self._entries if k.startswith(prefix)]
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def expire(self) -> int:
+        """Drop expired entries now; returns the count"""
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _sweep(self, now: float) -> int:
+        expired = [k for k, (_, _, expires_at) in self._entries.items() if expires_at is not None and expires_at <= now]
+        for k in expired:
+            self._remove(k)
+        self.expirations += len(expired)
+        self._next_sweep = now + self.sweep_interval
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "items": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejected": self.rejected,
+            }
+
+
+# Singleton instance
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+def get_memory_cache() -> MemoryCache:
+    """Get or create the process-wide memory cache"""
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                _memory_cache = MemoryCache(
+                    max_bytes=int(MEMORY_CACHE_MB * 1024 * 1024),
+                    max_entry_bytes=int(MEMORY_CACHE_MAX_ENTRY_MB * 1024 * 1024),
+                    sweep_interval=MEMORY_CACHE_SWEEP_SECONDS,
+                )
+                logger.info(f"✅ Memory cache ready ({MEMORY_CACHE_MB:.0f}MB budget)")
+    return _memory_cache
@@ -0,0 +1,66 @@
+# backend/utils/process_memory.py
+"""
+Per-process memory accounting from /proc/<pid>/smaps_rollup.
+
+RSS alone double-counts pages that forked workers still share with their
+parent. smaps_rollup splits resident memory into shared pages (mapped by
+more than one process) and private ("unique") pages, and PSS divides each
+shared page between the processes mapping it. Summed over all workers, PSS
+is the real footprint.
+"""
+
+import os
+from typing import Dict, Iterable, List, Union
+
+_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_clean_bytes",
+    "Shared_Dirty": "shared_dirty_bytes",
+    "Private_Clean": "private_clean_bytes",
+    "Private_Dirty": "private_dirty_bytes",
+    "Swap": "swap_bytes",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """Resident memory of one process split into shared and unique bytes"""
+    stats = {key: 0 for key in _FIELDS.values()}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                key = _FIELDS.get(parts[0].rstrip(":")) if parts else None
+                if key and len(parts) >= 2:
+                    stats[key] = int(parts[1]) * 1024  # values are in kB
+    except (OSError, ValueError, IndexError):
+        # No smaps_rollup (non-Linux or kernel < 4.14): report plain RSS only
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                stats["rss_bytes"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass
+        stats["pid"] = os.getpid() if pid == "self" else int(pid)
+        stats["detailed"] = False
+        return stats
+
+    stats["shared_bytes"] = stats["shared_clean_bytes"] + stats["shared_dirty_bytes"]
+    stats["unique_bytes"] = stats["private_clean_bytes"] + stats["private_dirty_bytes"]
+    stats["pid"] = os.getpid() if pid == "self" else int(pid)
+    stats["detailed"] = True
+    return stats
+
+
+def memory_report(pids: Iterable[int]) -> Dict[str, object]:
+    """Per-process breakdown plus totals for a group of processes (e.g. server workers)"""
+    processes: List[Dict[str, int]] = [process_memory(pid) for pid in pids]
+    return {
+        "processes": processes,
+        "total_rss_bytes": sum(p["rss_bytes"] for p in processes),
+        "total_pss_bytes": sum(p["pss_bytes"] for p in processes),
+        "total_unique_bytes": sum(p.get("unique_bytes", 0) for p in processes),
+    }
+
+
+def format_bytes(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f}MB"
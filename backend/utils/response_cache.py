@@ -0,0 +1,125 @@
+# backend/utils/response_cache.py
+"""
+Content-addressed cache of whole analysis responses.
+
+The same resume and JD always produce the same analysis, so the upload,
+live and ATS endpoints cache their JSON responses under a key built from
+what determines the output:
+
+    response:<namespace version>:<endpoint>:p<PIPELINE_VERSION>:<tier>:<file type>:<file/text hash>:<JD hash>
+
+Entries live in the shared two-tier cache (utils.cache; async routes use
+the a* variants, via utils.async_cache), so a pair analysed
+by one worker is a hit on every worker, and clear_cache("response") drops
+all of them. Responses carry an X-HireScope-Cache header: HIT, MISS or
+BYPASS (cache disabled).
+
+Configuration:
+  HIRESCOPE_RESPONSE_CACHE            0 disables the response cache (default 1)
+  HIRESCOPE_RESPONSE_TTL_UPLOAD       seconds (default 86400)
+  HIRESCOPE_RESPONSE_TTL_LIVE         seconds (default 900; live text changes constantly)
+  HIRESCOPE_RESPONSE_TTL_ATS          seconds (default 86400)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+from core.pipeline import PIPELINE_VERSION
+from utils.async_cache import aget_from_cache, aset_in_cache
+from utils.cache import get_from_cache, namespaced_key, set_in_cache
+from utils.common import hash_bytes
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("HIRESCOPE_RESPONSE_CACHE", "1") != "0"
+RESPONSE_CACHE_TTLS = {
+    "upload": int(os.getenv("HIRESCOPE_RESPONSE_TTL_UPLOAD", "86400")),
+    "live": int(os.getenv("HIRESCOPE_RESPONSE_TTL_LIVE", "900")),
+    "ats": int(os.getenv("HIRESCOPE_RESPONSE_TTL_ATS", "86400")),
+}
+CACHE_HEADER = "X-HireScope-Cache"
+KEY_PREFIX = "response"
+
+_counts: Dict[str, Dict[str, int]] = {endpoint: {"hits": 0, "misses": 0} for endpoint in RESPONSE_CACHE_TTLS}
+_counts_lock = threading.Lock()
+
+
+def _hash_text(text: Optional[str]) -> str:
+    # Surrounding whitespace never changes the analysis
+    return hashlib.sha256((text or "").strip().encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def response_cache_key(
+    endpoint: str,
+    *,
+    content: Optional[bytes] = None,
+    text: Optional[str] = None,
+    job_description: Optional[str] = None,
+    tier: str = "-",
+    file_type: str = "-",
+) -> str:
+    """Key for a response to `endpoint` on this file (or text) and JD"""
+    if endpoint not in RESPONSE_CACHE_TTLS:
+        raise ValueError(f"Unknown response cache endpoint: {endpoint}")
+    source_hash = hash_bytes(content) if content is not None else _hash_text(text)
+    return namespaced_key(
+        KEY_PREFIX, endpoint, f"p{PIPELINE_VERSION}", tier, file_type, source_hash, _hash_text(job_description)
+    )
+
+
+def file_type_of(filename: Optional[str]) -> str:
+    """The parser is chosen by extension, so it is part of the key"""
+    _, ext = os.path.splitext((filename or "").lower())
+    return ext.lstrip(".") or "-"
+
+
+def _record(endpoint: str, response: Optional[Dict[str, Any]]):
+    with _counts_lock:
+        _counts[endpoint]["hits" if response is not None else "misses"] += 1
+
+
+def get_cached_response(endpoint: str, key: str) -> Optional[Dict[str, Any]]:
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    response = get_from_cache(key)
+    _record(endpoint, response)
+    return response
+
+
+def cache_response(endpoint: str, key: str, response: Dict[str, Any]):
+    if RESPONSE_CACHE_ENABLED:
+        set_in_cache(key, response, RESPONSE_CACHE_TTLS[endpoint])
+
+
+async def aget_cached_response(endpoint: str, key: str) -> Optional[Dict[str, Any]]:
+    """get_cached_response for async routes (no blocking Redis call)"""
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    response = await aget_from_cache(key)
+    _record(endpoint, response)
+    return response
+
+
+async def acache_response(endpoint: str, key: str, response: Dict[str, Any]):
+    if RESPONSE_CACHE_ENABLED:
+        await aset_in_cache(key, response, RESPONSE_CACHE_TTLS[endpoint])
+
+
+def json_response(content: Dict[str, Any], hit: bool) -> JSONResponse:
+    status = "BYPASS" if not RESPONSE_CACHE_ENABLED else "HIT" if hit else "MISS"
+    return JSONResponse(content, headers={CACHE_HEADER: status})
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    with _counts_lock:
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "pipeline_version": PIPELINE_VERSION,
+            "ttl_seconds": dict(RESPONSE_CACHE_TTLS),
+            "endpoints": {endpoint: dict(counts) for endpoint, counts in _counts.items()},
+        }
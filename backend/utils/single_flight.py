@@ -0,0 +1,132 @@
+# backend/utils/single_flight.py
+"""
+Single-flight call coalescing.
+
+When several callers miss the cache on the same key at once, only the
+first one (the leader) runs the computation. The others wait for it and
+receive its result, or its exception. SingleFlight serves threads and
+AsyncSingleFlight serves coroutines; both keep counters per name (the
+cache prefix) for the stats endpoint.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _counter(name: str) -> Dict[str, int]:
+    with _stats_lock:
+        if name not in _stats:
+            _stats[name] = {"leaders": 0, "coalesced": 0, "in_flight": 0, "waiting": 0}
+        return _stats[name]
+
+
+def _bump(counts: Dict[str, int], field: str, delta: int = 1):
+    with _stats_lock:
+        counts[field] += delta
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Per name: leader calls, coalesced waiters, calls in flight and callers waiting now"""
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key across threads"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._counts = _counter(name)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            _bump(self._counts, "coalesced")
+            _bump(self._counts, "waiting")
+            try:
+                call.done.wait()
+            finally:
+                _bump(self._counts, "waiting", -1)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        _bump(self._counts, "leaders")
+        _bump(self._counts, "in_flight")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            _bump(self._counts, "in_flight", -1)
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent awaits with the same key within an event loop"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[tuple, asyncio.Future] = {}
+        self._counts = _counter(name)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        future = self._calls.get(flight_key)
+        if future is not None:
+            _bump(self._counts, "coalesced")
+            _bump(self._counts, "waiting")
+            try:
+                # shield: a cancelled waiter must not cancel the leader's result
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            finally:
+                _bump(self._counts, "waiting", -1)
+            # The leader itself was cancelled: take over
+            return await self.do(key, fn)
+
+        future = self._calls[flight_key] = loop.create_future()
+        _bump(self._counts, "leaders")
+        _bump(self._counts, "in_flight")
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so an unawaited failure isn't logged as "never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._calls[flight_key]
+            _bump(self._counts, "in_flight", -1)
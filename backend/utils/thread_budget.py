@@ -0,0 +1,260 @@
+# backend/utils/thread_budget.py
+"""
+Central CPU thread budget.
+
+Torch intra-op threads, numpy's BLAS pool, Tesseract processes and the
+request thread pools all default to "one thread per core" on their own, so
+under concurrent load they oversubscribe the same cores many times over.
+This module splits the cores available to the process between inference,
+OCR and request handling once, at startup, and applies the limits to each
+library.
+
+Configuration (all optional):
+  HIRESCOPE_CPU_CORES                 cores to budget for (default: cgroup quota / affinity)
+  WEB_CONCURRENCY                     server processes sharing those cores (default 1)
+  HIRESCOPE_INFERENCE_THREADS         torch / onnxruntime / BLAS threads (default: half the cores)
+  HIRESCOPE_OCR_WORKERS               concurrent Tesseract processes (default: a quarter of the cores)
+  HIRESCOPE_OCR_THREADS               OpenMP threads per Tesseract process (default 1)
+  HIRESCOPE_REQUEST_THREADS_PER_CORE  in-process analysis threads per remaining core (default 4)
+  HIRESCOPE_MIN_REQUEST_THREADS       floor for the shared request pools (default 16)
+
+In-process analysis jobs run on their own pool (analysis_threads), so probes,
+admin calls and cache I/O on the shared request pools never queue behind them.
+"""
+
+import logging
+import math
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Native thread pools that size themselves from the environment when first loaded
+_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "RAYON_NUM_THREADS",
+)
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    if not value:
+        return None
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(f"⚠️ Ignoring non-integer {name}={value!r}")
+        return None
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota imposed by the container (cgroup v2, then v1), if any"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cores() -> int:
+    """Cores this process may actually use: affinity mask capped by the cgroup quota"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cores = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cores = min(cores, max(1, math.ceil(limit)))
+    return max(1, cores)
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    """How one server process divides its share of the cores"""
+    cores: int
+    processes: int
+    process_cores: int
+    inference_threads: int
+    ocr_workers: int
+    ocr_threads: int
+    analysis_threads: int
+    request_threads: int
+    source: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def compute_budget() -> ThreadBudget:
+    """Derive the budget from the environment and the detected core count"""
+    configured = _env_int("HIRESCOPE_CPU_CORES")
+    cores = configured or available_cores()
+    processes = _env_int("WEB_CONCURRENCY") or 1
+    process_cores = max(1, cores // processes)
+
+    # An explicit OMP_NUM_THREADS is honoured as the inference allocation
+    inference = _env_int("HIRESCOPE_INFERENCE_THREADS") or _env_int("OMP_NUM_THREADS") \
+        or max(1, process_cores // 2)
+    ocr_workers = _env_int("HIRESCOPE_OCR_WORKERS") or max(1, process_cores // 4)
+    ocr_threads = _env_int("HIRESCOPE_OCR_THREADS") or 1
+    # Analysis threads mostly wait on the embedding scheduler, OCR or I/O, so
+    # several of them share each core left over after inference and OCR
+    remaining = max(1, process_cores - inference - ocr_workers * ocr_threads)
+    per_core = _env_int("HIRESCOPE_REQUEST_THREADS_PER_CORE") or 4
+    analysis_threads = max(4, remaining * per_core)
+    # The shared pools only serve short sync endpoints and cache I/O
+    request_threads = max(_env_int("HIRESCOPE_MIN_REQUEST_THREADS") or 16, analysis_threads)
+
+    return ThreadBudget(
+        cores=cores,
+        processes=processes,
+        process_cores=process_cores,
+        inference_threads=min(inference, process_cores),
+        ocr_workers=ocr_workers,
+        ocr_threads=ocr_threads,
+        analysis_threads=analysis_threads,
+        request_threads=request_threads,
+        source="HIRESCOPE_CPU_CORES" if configured else "detected",
+    )
+
+
+# Singleton budget, applied once per process
+_budget: Optional[ThreadBudget] = None
+_applied_pid: Optional[int] = None
+_budget_lock = threading.Lock()
+_ocr_semaphore: Optional[threading.BoundedSemaphore] = None
+
+def get_thread_budget() -> ThreadBudget:
+    """Get (computing on first use) the process-wide thread budget"""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = compute_budget()
+    return _budget
+
+
+def apply_torch_threads():
+    """Pin torch's intra-op pool to the inference allocation (no-op if torch isn't loaded)"""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return
+    threads = get_thread_budget().inference_threads
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+    try:
+        # Only settable before the first inter-op parallel call
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def _apply_blas_threads(threads: int):
+    """Limit BLAS pools numpy already initialized (env vars are too late for those)"""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    try:
+        threadpool_limits(limits=threads)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not limit BLAS threads: {e}")
+
+
+def apply_thread_budget() -> ThreadBudget:
+    """
+    Apply the budget to this process: native thread-pool env vars, BLAS and
+    torch. Idempotent, and re-applied after fork since pools are per process.
+    """
+    global _applied_pid
+    budget = get_thread_budget()
+    with _budget_lock:
+        if _applied_pid == os.getpid():
+            return budget
+        _applied_pid = os.getpid()
+
+    for var in _THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(budget.inference_threads))
+    _apply_blas_threads(budget.inference_threads)
+    apply_torch_threads()
+    logger.info(
+        f"✅ Thread budget: {budget.process_cores}/{budget.cores} cores -> "
+        f"inference={budget.inference_threads}, ocr={budget.ocr_workers}x{budget.ocr_threads}, "
+        f"analysis={budget.analysis_threads}, requests={budget.request_threads}"
+    )
+    return budget
+
+
+async def apply_request_limits():
+    """Size the event loop's shared worker pools to the request allocation (call from the loop)"""
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    import anyio.to_thread
+
+    threads = get_thread_budget().request_threads
+    # run_in_threadpool / sync endpoints go through anyio's limiter,
+    # asyncio.to_thread through the loop's default executor
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=threads, thread_name_prefix="hirescope-request")
+    )
+
+
+def ocr_semaphore() -> threading.BoundedSemaphore:
+    """Process-wide cap on concurrently running Tesseract processes"""
+    global _ocr_semaphore
+    if _ocr_semaphore is None:
+        with _budget_lock:
+            if _ocr_semaphore is None:
+                _ocr_semaphore = threading.BoundedSemaphore(get_thread_budget().ocr_workers)
+    return _ocr_semaphore
+
+
+def get_thread_budget_stats() -> Dict[str, Any]:
+    """Configured allocation plus what the libraries actually report"""
+    budget = get_thread_budget()
+    effective: Dict[str, Any] = {}
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        effective["torch_threads"] = torch.get_num_threads()
+        effective["torch_interop_threads"] = torch.get_num_interop_threads()
+    try:
+        from threadpoolctl import threadpool_info
+        effective["blas"] = [
+            {"library": p.get("internal_api"), "threads": p.get("num_threads")}
+            for p in threadpool_info()
+        ]
+    except ImportError:
+        pass
+    try:
+        import anyio.to_thread
+        effective["request_thread_limit"] = anyio.to_thread.current_default_thread_limiter().total_tokens
+    except Exception:
+        # Only readable from inside the event loop
+        pass
+    return {
+        **budget.as_dict(),
+        "applied": _applied_pid == os.getpid(),
+        "env": {var: os.environ.get(var) for var in _THREAD_ENV_VARS},
+        "effective": effective,
+    }
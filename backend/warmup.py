@@ -17,35 +17,29 @@ def warmup_models():
     """Pre-load all models to ensure they're cached and ready"""
     try:
         logger.info("Starting model warmup...")
-        
-        # 1. Load sentence-transformers model
-        logger.info("Loading sentence-transformers model...")
-        from sentence_transformers import SentenceTransformer
-        model = SentenceTransformer('all-mpnet-base-v2')
-        logger.info(f"✓ Sentence-transformers model loaded successfully")
-        
-        # 2. Test embedding generation
+
+        # Same components, in the same order, as the app's startup warmup
+        from core.warmup import get_warmup
+        warmup = get_warmup()
+        warmup.run()
+        for name, info in warmup.status()["components"].items():
+            mark = "✓" if info["state"] == "ready" else "✗"
+            logger.info(f"{mark} {name}: {info['state']} ({info.get('seconds', 0):.2f}s) {info.get('error', '')}")
+
+        # Test embedding generation
         logger.info("Testing embedding generation...")
-        test_text = ["This is a test sentence"]
-        embeddings = model.encode(test_text)
+        from core.embedding_store import embed_texts
+        embeddings = embed_texts(["This is a test sentence"])
         logger.info(f"✓ Embeddings generated successfully: shape={embeddings.shape}")
-        
-        # 3. Load spaCy model
-        logger.info("Loading spaCy model...")
-        import spacy
-        nlp = spacy.load('en_core_web_sm')
-        logger.info("✓ spaCy model loaded successfully")
-        
-        # 4. Test spaCy processing
-        logger.info("Testing spaCy processing...")
-        doc = nlp("Test document")
-        logger.info(f"✓ spaCy processing successful")
-        
+
         logger.info("=" * 60)
-        logger.info("✓ All models warmed up successfully!")
+        if warmup.ready:
+            logger.info("✓ All models warmed up successfully!")
+        else:
+            logger.error("✗ Required components failed to load")
         logger.info("=" * 60)
-        return True
-        
+        return warmup.ready
+
     except Exception as e:
         logger.error(f"✗ Warmup failed: {e}")
         import traceback